@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import csv
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import django_env
+
+django_env.setup()
+
+import numpy as np
+from django.db import transaction
+from omnitor.models import FinalData
+from services import columnar
+from services.export import export
+
+ROWS = 50000
+START = datetime(2025, 1, 1)
+
+
+def fill():
+    rng = np.random.default_rng(0)
+    with transaction.atomic():
+        FinalData.objects.bulk_create([
+            FinalData(
+                timestamp=START + timedelta(seconds=i), air_temperature=22.0 + rng.normal(),
+                air_humidity=60.0 + rng.normal(), co2=450.0 + rng.normal(), ph_final=6.5 + rng.normal() / 10,
+                ec_final=1.2 + rng.normal() / 100, weight_final=8200.0 + i / 100,
+            )
+            for i in range(ROWS)
+        ], batch_size=5000)
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - began)
+    return best, result
+
+
+def decode_ndjson(data):
+    """ 브라우저가 하는 일과 같은 것: 한 줄씩 JSON 파싱 """
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def decode_csv(data):
+    return [[float(v) if v else None for v in row[1:]] for row in list(csv.reader(io.StringIO(data.decode())))[1:]]
+
+
+if __name__ == '__main__':
+    fill()
+    end = START + timedelta(seconds=ROWS)
+    print(f"{ROWS} rows of FinalData, all channels")
+    print("format       bytes      gzip bytes   decode ms")
+    for fmt, decode in (('ndjson', decode_ndjson), ('csv', decode_csv), ('columns', columnar.decode)):
+        data = b"".join(export(FinalData, START, end, fmt=fmt))
+        packed = gzip.compress(data)
+        seconds, _ = timed(lambda: decode(data))
+        print(f"{fmt:<10} {len(data):>10} {len(packed):>14} {seconds * 1000:>10.1f}")
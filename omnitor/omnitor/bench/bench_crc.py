@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import struct
+import random
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # bench 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+from devices.crc import crc16_modbus, verify_frames
+
+
+def crc16_modbus_bitwise(data: bytes) -> int:
+    """ 기존 ArduinoSerial.crc16_modbus 구현 (바이트당 8번 시프트) """
+    crc = 0xFFFF
+    for pos in data:
+        crc ^= pos
+        for _ in range(8):
+            if (crc & 0x0001) != 0:
+                crc >>= 1
+                crc ^= 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+def make_frame(values):
+    payload = struct.pack("<9f", *values)
+    header = bytes([0xAA, 0x55, len(payload)])
+    crc = crc16_modbus_bitwise(header + payload)
+    return header + payload + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+
+
+def bench(label, func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed / repeat * 1e6:10.2f} us/call")
+    return elapsed
+
+
+def main(frame_count=1000, repeat=20):
+    random.seed(0)
+    frames = [make_frame([random.uniform(0, 100) for _ in range(9)]) for _ in range(frame_count)]
+    stream = b"".join(frames)
+    frame_size = len(frames[0])
+    offsets = list(range(0, len(stream), frame_size))
+    command = bytes([0xAA, 0x55, 4]) + struct.pack("<i", 3)
+
+    # 두 구현 결과가 같은지 먼저 확인
+    for frame in frames[:50]:
+        assert crc16_modbus(frame[:-2]) == crc16_modbus_bitwise(frame[:-2])
+    assert all(verify_frames(stream, offsets))
+
+    print(f"frames={frame_count} frame_size={frame_size}B repeat={repeat}")
+    old = bench("bitwise, command (7B)", lambda: crc16_modbus_bitwise(command), repeat * 1000)
+    new = bench("table, command (7B)", lambda: crc16_modbus(command), repeat * 1000)
+    print(f"  -> x{old / new:.1f}")
+
+    old = bench("bitwise, per frame loop", lambda: [crc16_modbus_bitwise(f[:-2]) == (f[-2] | f[-1] << 8) for f in frames], repeat)
+    new = bench("table, per frame loop", lambda: [crc16_modbus(f[:-2]) == (f[-2] | f[-1] << 8) for f in frames], repeat)
+    print(f"  -> x{old / new:.1f}")
+    batch = bench("table, verify_frames batch", lambda: verify_frames(stream, offsets), repeat)
+    print(f"  -> x{old / batch:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import struct
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # bench 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+import serial
+from devices.arduino import ArduinoSerial
+from devices.crc import crc16_modbus
+
+
+def make_frame(values):
+    payload = struct.pack("<9f", *values)
+    header = bytes([0xAA, 0x55, len(payload)])
+    crc = crc16_modbus(header + payload)
+    return header + payload + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+
+
+def run(event_driven, idle_seconds, frame_count):
+    """ pty 쌍에 ArduinoSerial read 스레드를 붙여 유휴 CPU와 프레임 지연을 측정 """
+    master_fd, slave_fd = os.openpty()
+    arduino = ArduinoSerial(event_driven=event_driven)
+    arduino.ser = serial.Serial(os.ttyname(slave_fd), arduino.baudrate, timeout=arduino.timeout)
+    arduino.running = True
+    arduino.read_thread = threading.Thread(target=arduino.read_loop, daemon=True)
+    arduino.read_thread.start()
+
+    # 유휴 CPU: 아무 데이터도 보내지 않고 프로세스 CPU 시간을 잼
+    time.sleep(0.2)
+    cpu_start = time.process_time()
+    time.sleep(idle_seconds)
+    idle_cpu = (time.process_time() - cpu_start) / idle_seconds * 100
+
+    # 프레임 지연: master에 프레임을 쓴 시각 ~ read 스레드가 패킷을 받은 시각
+    arduino.drain()
+    latencies = []
+    for i in range(frame_count):
+        sent = time.monotonic()
+        os.write(master_fd, make_frame([float(i)] * 9))
+        time.sleep(0.05)
+        for ts, _ in arduino.drain():
+            latencies.append((ts - sent) * 1000)
+
+    arduino.stop()
+    os.close(master_fd)
+    os.close(slave_fd)
+
+    latencies.sort()
+    mode = "event (select)" if event_driven else "poll (10ms sleep)"
+    print(f"{mode:<18} idle CPU {idle_cpu:5.2f}%  "
+          f"latency median {latencies[len(latencies) // 2]:.2f}ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.2f}ms  "
+          f"max {latencies[-1]:.2f}ms  (frames {len(latencies)}/{frame_count})")
+
+
+if __name__ == '__main__':
+    run(event_driven=False, idle_seconds=5, frame_count=100)
+    run(event_driven=True, idle_seconds=5, frame_count=100)
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # bench 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+from devices.simulator import SoilSimulator
+from devices.soil import SoilSensor
+from devices.soil_bus import SoilBus
+
+PORT = "/tmp/omnitor-bench-soil"
+
+
+def registers_for(count):
+    return {address: [200 + address, 350, 800, 65] for address in range(1, count + 1)}
+
+
+# 센서 1개당 목표: 초당 2회 (4800 baud 버스 한 번 왕복은 약 55ms)
+POLL_INTERVAL = 0.5
+
+
+def run_bus(count, seconds):
+    sim = SoilSimulator(PORT, registers=registers_for(count)).start()
+    bus = SoilBus(addresses=range(1, count + 1), port=PORT, poll_interval=POLL_INTERVAL)
+    bus.start()
+    time.sleep(seconds)
+    bus.stop()
+    sim.stop()
+    return bus.reads / seconds, bus.failures
+
+
+def run_per_instance(count, seconds):
+    """ 기존 방식: 센서마다 SoilSensor 인스턴스가 같은 포트를 따로 열고 각자 폴링 """
+    sim = SoilSimulator(PORT, registers=registers_for(count)).start()
+    sensors = []
+    for address in range(1, count + 1):
+        sensor = SoilSensor(port=PORT, poll_interval=POLL_INTERVAL, max_backoff=1.0)
+        sensor.slave_address = address
+        sensor.start()
+        sensors.append(sensor)
+    time.sleep(seconds)
+    for sensor in sensors:
+        sensor.stop()
+    sim.stop()
+    return sum(s.reads for s in sensors) / seconds, sum(s.failures for s in sensors)
+
+
+if __name__ == '__main__':
+    seconds = 6
+    print(f"target {1 / POLL_INTERVAL:.0f} reads/s per probe")
+    print("probes  bus reads/s (fail)   per-instance reads/s (fail)")
+    for count in (1, 2, 4, 8, 16):
+        bus_rate, bus_fail = run_bus(count, seconds)
+        inst_rate, inst_fail = run_per_instance(count, seconds)
+        print(f"{count:>6}  {bus_rate:10.1f} ({bus_fail:3d})   {inst_rate:10.1f} ({inst_fail:3d})")
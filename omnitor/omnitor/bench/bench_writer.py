@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import django_env
+
+django_env.setup()
+
+from django.db import connection
+from omnitor.models import RawData
+from services.batch_writer import BatchWriter
+
+# 목표 속도로 넣으므로 BatchWriter 측정은 실제로 이 시간만큼 걸림
+SIM_SECONDS = int(os.environ.get("OMNITOR_BENCH_SECONDS", "10"))
+
+
+def make_row(ts, i):
+    return RawData(
+        timestamp=ts, air_temperature=22.0 + i % 10, air_humidity=60.0, co2=450, insolation=100.0,
+        weight_raw=82000, ph_raw=2.5, ec_raw=1.2, water_temperature=18.0, tip_count=i // 600,
+        soil_temperature=20.0, soil_humidity=35.0, soil_ec=800, soil_ph=6.5,
+    )
+
+
+def run_per_row(rate):
+    """ 기존 sensor_loop 방식: 행마다 create 후 connection.close() """
+    start = datetime.now()
+    count = rate * SIM_SECONDS
+    began = time.perf_counter()
+    for i in range(count):
+        row = make_row(start + timedelta(seconds=i / rate), i)
+        row.save(force_insert=True)
+        connection.close()
+    return time.perf_counter() - began, count
+
+
+def run_batched(rate):
+    """
+    BatchWriter 실제 경로: start() 후 목표 속도로 put() (큐 -> 쓰기 스레드 -> max_delay(1초)마다 bulk_create),
+    stop()이 남은 행을 모두 저장하고 돌아온 뒤 저장된 행 수를 셈
+    -> (put 시작부터 stop() 반환까지 초, 저장된 행 수, stop() 에 걸린 초, flush 횟수)
+    """
+    writer = BatchWriter(RawData, max_rows=1000, max_delay=1.0)
+    start = datetime.now()
+    count = rate * SIM_SECONDS
+    before = RawData.objects.count()
+    writer.start()
+    began = time.perf_counter()
+    for i in range(count):
+        delay = began + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        writer.put(make_row(start + timedelta(seconds=i / rate), i))
+    stopping = time.perf_counter()
+    writer.stop()
+    ended = time.perf_counter()
+    written = RawData.objects.count() - before
+    return ended - began, written, ended - stopping, writer.flushes
+
+
+if __name__ == '__main__':
+    print(f"{SIM_SECONDS}s of samples, SQLite file DB")
+    print("rate    per-row create+close (as fast as possible)   BatchWriter put() at rate")
+    for rate in (1, 10, 100):
+        old, count = run_per_row(rate)
+        elapsed, written, drain, flushes = run_batched(rate)
+        print(f"{rate:>3} Hz  {old * 1000 / count:7.3f} ms/row {count / old:8.0f} rows/s   "
+              f"{written}/{count} rows in {elapsed:.2f}s, {flushes} flushes, stop() {drain * 1000:.0f} ms")
+    print(f"total rows: {RawData.objects.count()}")
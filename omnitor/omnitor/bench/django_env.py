@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # bench 폴더
+root_dir = os.path.dirname(current_dir) # omnitor 앱 폴더 ('devices', 'services')
+project_dir = os.path.dirname(root_dir) # 'omnitor' 패키지가 보이는 폴더
+
+sys.path.append(root_dir)
+sys.path.append(project_dir)
+
+
+def setup(db_path=None):
+    """
+    벤치마크용 Django 환경: 임시 SQLite 파일에 omnitor 모델 테이블을 만들어 둠
+    (실제 settings 모듈 없이 실행하기 위함)
+    """
+    import django
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="omnitor-bench-"), "db.sqlite3")
+
+    settings.configure(
+        INSTALLED_APPS=["omnitor"],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": db_path}},
+        USE_TZ=False,
+        DEFAULT_AUTO_FIELD="django.db.models.AutoField",
+    )
+    django.setup()
+
+    from django.apps import apps
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config("omnitor").get_models():
+            editor.create_model(model)
+    return db_path
@@ -1,16 +1,36 @@
+import os
 import serial
 import threading
 import queue
 import time
 import struct
 import serial.tools.list_ports
-from dataclasses import dataclass
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from threading import Lock
+from typing import Optional
+
+from devices.crc import crc16_modbus
+from devices.framer import PacketFramer
+from devices.samples import SampleRing
 
 
 PACKET_HEADER_1 = 0xAA
 PACKET_HEADER_2 = 0x55
 
+# 아두이노 명령 코드
+CMD_SESSION_RESET = 0  # 펌웨어의 lastSeq를 이 명령의 seq로 맞춤 (start() 때 한 번)
+CMD_CAMERA_UNLOCK = 1
+CMD_CAMERA_LOCK = 2
+CMD_ROTATE_LEFT = 3
+CMD_ROTATE_RIGHT = 4
+
+# 명령 payload: seq(uint16) + command(int32) / ACK payload: seq(uint16) + status(uint8)
+COMMAND_PAYLOAD_FORMAT = "<Hi"
+ACK_PAYLOAD_FORMAT = "<HB"
+ACK_PAYLOAD_SIZE = struct.calcsize(ACK_PAYLOAD_FORMAT)
+ACK_OK = 0
+
 @dataclass
 class DataPacket:
   air_temperature: float
@@ -26,11 +46,31 @@ class DataPacket:
 @dataclass
 class CommandPacket:
   command: int
+  seq: Optional[int] = None
+
+@dataclass
+class PendingCommand:
+  """ ACK를 기다리는 명령 (seq 기준) """
+  seq: int
+  command: int
+  packet: bytes
+  timeout: float
+  retries: int
+  future: Future = field(default_factory=Future)
+  deadline: Optional[float] = None  # None이면 아직 타이머 시작 전 (앞 명령 ACK 대기 중)
+  after: Optional[int] = None       # 타이머 시작을 기다리는 앞 명령의 seq (시작되면 None)
+  prev: Optional[int] = None        # 배치에서 바로 앞 명령의 seq
+  attempts: int = 0
 
 class ArduinoSerial:
-    def __init__(self, baudrate=9600, timeout=1):
+    def __init__(self, baudrate=9600, timeout=1, sample_capacity=1024, event_driven=True,
+                 command_timeout=3.0, command_retries=2, port=None):
+        # port를 지정하면 자동 탐색 대신 그 경로를 사용 (시뮬레이터 등)
+        self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        # True: 바이트가 들어올 때까지 select로 대기 / False: 10ms 간격 in_waiting 폴링 (기존 방식)
+        self.event_driven = event_driven
         self.ser = None
         self.read_thread = None
         self.write_thread = None
@@ -38,12 +78,28 @@ class ArduinoSerial:
         self.running = False
         self.current_data = None
         self.lock = Lock()
+        self.framer = PacketFramer(crc_func=crc16_modbus)
+        self.samples = SampleRing(sample_capacity)
+
+        # ACK 기반 명령 채널
+        self.command_timeout = command_timeout
+        self.command_retries = command_retries
+        self.pending = {}
+        self.command_lock = Lock()
+        self._seq = 0
+        self.session = None  # CMD_SESSION_RESET 의 Future (start() 에서 보냄)
 
     def get_current_data(self):
       with self.lock:
         return self.current_data
 
+    def drain(self, max_items=None):
+      """ 마지막 drain 이후 수신한 모든 패킷을 [(monotonic_ts, DataPacket), ...] 순서대로 반환 """
+      return self.samples.drain(max_items)
+
     def find_port(self):
+        if self.port:
+            return self.port
         ports = serial.tools.list_ports.comports()
         for port in ports:
             if "Arduino" in port.description:
@@ -65,34 +121,69 @@ class ArduinoSerial:
             print(f"[Arduino] 연결 실패: {e}")
             return False
 
+    def _read_chunk(self):
+        """ 수신된 바이트를 반환, timeout 동안 아무것도 없으면 b"" """
+        if self.event_driven:
+            # pyserial read()는 내부에서 fd를 select로 기다림
+            # 첫 바이트가 오거나 timeout / cancel_read() 가 호출될 때만 깨어남
+            chunk = self.ser.read(1)
+            if chunk:
+                waiting = self.ser.in_waiting
+                if waiting:
+                    chunk += self.ser.read(waiting)
+            return chunk
+
+        if self.ser.in_waiting > 0:
+            return self.ser.read(self.ser.in_waiting)
+        time.sleep(0.01)
+        return b""
+
     def read_loop(self):
-        buffer = []
+        self.framer.reset()
         while self.running:
             try:
-                if self.ser.in_waiting > 0:
-                  chunk = self.ser.read(self.ser.in_waiting)
-                  buffer.extend(chunk)
-                  # 계속 패킷 추출
-                  while True:
-                      payload = self.extract_packet(buffer)
-                      if payload is None:
-                          break
-                      with self.lock :
-                        self.current_data = self.parse_packet(payload)
-                else:
-                  time.sleep(0.01)
+                chunk = self._read_chunk()
+                if not chunk:
+                  continue
+                now = time.monotonic()
+                self.framer.feed(chunk)
+                # 계속 패킷 추출
+                while True:
+                    payload = self.extract_packet()
+                    if payload is None:
+                        break
+                    if len(payload) == ACK_PAYLOAD_SIZE:
+                        self._handle_ack(payload)
+                        continue
+                    data = self.parse_packet(payload)
+                    self.samples.push(data, now)
+                    with self.lock :
+                      self.current_data = data
             except Exception as e:
-                print(f"[Arduino] Write 오류: {e}")
+                if not self.running:
+                    break
+                print(f"[Arduino] Read 오류: {e}")
+                self.framer.reset()
                 self._reconnect()
 
     def write_loop(self):
         while self.running:
             try:
-                msg = self.write_queue.get()
-                if self.ser and self.ser.is_open:
-                    self.ser.write(msg)
-                time.sleep(0.01)
+                try:
+                    # 대기 중인 명령의 타임아웃 시각까지만 블록 (없으면 무한 대기)
+                    msg = self.write_queue.get(timeout=self._next_deadline_wait())
+                except queue.Empty:
+                    msg = b""
+                if msg is None:  # stop() 이 넣는 종료 신호
+                    break
+                if msg:
+                    if self.ser and self.ser.is_open:
+                        self.ser.write(msg)
+                    time.sleep(0.01)
+                self._check_timeouts()
             except Exception as e:
+                if not self.running:
+                    break
                 print(f"[Arduino] Write 오류: {e}")
                 self._reconnect()
 
@@ -105,7 +196,7 @@ class ArduinoSerial:
                 pass
         time.sleep(2)
 
-        while not self.connect():
+        while self.running and not self.connect():
             print("[Arduino] 재연결 실패 — 2초 후 재시도")
             time.sleep(2)
 
@@ -121,84 +212,192 @@ class ArduinoSerial:
 
         self.read_thread.start()
         self.write_thread.start()
+
+        # 포트를 열어도 Pro Micro(32u4)는 리셋되지 않아 이전 프로세스의 lastSeq를 기억함
+        # seq는 0부터 다시 세므로 먼저 세션을 맞추지 않으면 새 명령이 '이미 실행한 명령'으로 무시됨
+        # (재연결 때는 보내지 않음: 같은 프로세스 안에서는 seq가 이어지고, 재전송 중인 명령이 있을 수 있음)
+        self.session = self.command(CMD_SESSION_RESET)
     
-    def command(self, command: int):
-      self.write_queue.put(self.encode_command_packet(CommandPacket(command=command)))
+    def command(self, command: int, timeout=None, retries=None) -> Future:
+      """
+      명령을 보내고, 아두이노가 실행을 마치고 ACK를 보내면 완료되는 Future를 반환
+      timeout 안에 ACK가 없으면 같은 seq로 retries 번 재전송 후 TimeoutError
+      """
+      return self.command_batch([(command, timeout, retries)])[0]
+
+    def command_batch(self, commands) -> list:
+      """
+      여러 명령(모션 스크립트)을 한 번의 write로 보내고 명령별 Future 리스트를 반환
+
+      commands: 명령 코드 또는 (command, timeout, retries) 튜플의 리스트
+      아두이노는 순서대로 실행하므로 각 명령의 타임아웃은 앞 명령의 ACK를 받은 시점부터 잼
+      앞 명령이 실패하면 뒤 명령들도 같은 예외로 실패 처리됨
+      """
+      entries = []
+      with self.command_lock:
+          prev_seq = None
+          for item in commands:
+              if isinstance(item, tuple):
+                  command, timeout, retries = item
+              else:
+                  command, timeout, retries = item, None, None
+
+              seq = self._seq
+              self._seq = (self._seq + 1) & 0xFFFF
+              entry = PendingCommand(
+                  seq=seq,
+                  command=command,
+                  packet=self.encode_command_packet(CommandPacket(command=command, seq=seq)),
+                  timeout=self.command_timeout if timeout is None else timeout,
+                  retries=self.command_retries if retries is None else retries,
+                  after=prev_seq,
+                  prev=prev_seq,
+              )
+              self.pending[seq] = entry
+              entries.append(entry)
+              prev_seq = seq
+
+          if entries:
+              entries[0].deadline = time.monotonic() + entries[0].timeout
+              entries[0].attempts = 1
+
+      self.write_queue.put(b"".join(entry.packet for entry in entries))
+      return [entry.future for entry in entries]
+
+    def _handle_ack(self, payload):
+      seq, status = struct.unpack(ACK_PAYLOAD_FORMAT, payload)
+      with self.command_lock:
+          entry = self.pending.pop(seq, None)
+          if entry is None:
+              return  # 재전송에 대한 중복 ACK
+          nxt = self._arm_next(seq) if status == ACK_OK else None
+
+          # 아두이노는 순서대로 실행하므로 ACK가 유실된 앞 명령들도 이미 끝난 것
+          done = []
+          prev = entry.prev
+          while prev in self.pending:
+              earlier = self.pending.pop(prev)
+              done.append(earlier)
+              prev = earlier.prev
+
+      for earlier in done:
+          if not earlier.future.done():
+              earlier.future.set_result(earlier.seq)
+
+      if status == ACK_OK:
+          entry.future.set_result(seq)
+      else:
+          self._fail(entry, RuntimeError(f"명령 {entry.command} 실패 (status={status})"))
+
+      if nxt is not None:
+          self.write_queue.put(b"")  # 새 타임아웃을 반영하도록 write 스레드 깨우기
+
+    def _arm_next(self, seq):
+      """ seq 다음 배치 명령의 타임아웃 시작 (command_lock 안에서 호출) """
+      for entry in self.pending.values():
+          if entry.after == seq:
+              entry.after = None
+              entry.deadline = time.monotonic() + entry.timeout
+              entry.attempts = max(entry.attempts, 1)
+              return entry
+      return None
+
+    def _fail(self, entry, error):
+      """ 명령과 그 뒤에 이어진 배치 명령들을 모두 실패 처리 """
+      failed = [entry]
+      with self.command_lock:
+          seq = entry.seq
+          while True:
+              nxt = next((e for e in self.pending.values() if e.after == seq), None)
+              if nxt is None:
+                  break
+              del self.pending[nxt.seq]
+              failed.append(nxt)
+              seq = nxt.seq
+      for item in failed:
+          if not item.future.done():
+              item.future.set_exception(error)
+
+    def _next_deadline_wait(self):
+      with self.command_lock:
+          deadlines = [e.deadline for e in self.pending.values() if e.deadline is not None]
+      if not deadlines:
+          return None
+      return max(0.0, min(deadlines) - time.monotonic())
+
+    def _check_timeouts(self):
+      now = time.monotonic()
+      expired = []
+      with self.command_lock:
+          for entry in list(self.pending.values()):
+              if entry.deadline is None or entry.deadline > now:
+                  continue
+              if entry.attempts <= entry.retries:
+                  # 같은 seq로 재전송 (아두이노는 중복 seq면 실행하지 않고 ACK만 다시 보냄)
+                  entry.attempts += 1
+                  entry.deadline = now + entry.timeout
+                  print(f"[Arduino] 명령 {entry.command} ACK 없음, 재전송 ({entry.attempts - 1}/{entry.retries})")
+                  if self.ser and self.ser.is_open:
+                      self.ser.write(entry.packet)
+              else:
+                  del self.pending[entry.seq]
+                  expired.append(entry)
+
+      for entry in expired:
+          self._fail(entry, TimeoutError(f"명령 {entry.command} ACK 타임아웃"))
 
     def write(self, msg):
         self.write_queue.put(msg)
 
     def stop(self):
         self.running = False
-        if self.ser and self.ser.is_open:
-            self.ser.close()
-        print("[Arduino] 종료됨")
-
-    def extract_packet(self,buffer: bytearray):
-      # 최소 헤더(2) + length(1) + CRC(2)
-      if len(buffer) < 5:
-          return None
-
-      # HEADER1 위치 찾기
-      while len(buffer) >= 2 and (buffer[0] != PACKET_HEADER_1 or buffer[1] != PACKET_HEADER_2):
-          buffer.pop(0)
-
-      # HEADER 찾지 못한 경우
-      if len(buffer) < 3:
-          return None
-
-      length = buffer[2]   # payload size (32 bytes expected)
-
-      needed = 3 + length + 2  # header2 + length + payload + crc
-
-      if len(buffer) < needed:
-          return None  # not enough data
 
-      # 이제 패킷 전체가 있음
-      packet = bytes(buffer[:needed])
-      del buffer[:needed]  # 사용한 데이터 삭제
+        # 대기 중인 스레드 깨우기: read는 cancel_read(), write는 종료 신호
+        if self.ser and self.ser.is_open and hasattr(self.ser, "cancel_read"):
+            try:
+                self.ser.cancel_read()
+            except Exception:
+                pass
+        if self.write_thread and self.write_thread.is_alive():
+            self.write_queue.put(None)
 
-      # CRC 검증
-      payload = packet[3:3+length]
-      recv_crc = packet[3+length] | (packet[4+length-1] << 8)
+        for thread in (self.read_thread, self.write_thread):
+            if thread and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=self.timeout + 1)
 
-      calc_crc = self.crc16_modbus(packet[:3] + payload)
+        with self.command_lock:
+            leftover = list(self.pending.values())
+            self.pending.clear()
+        for entry in leftover:
+            if not entry.future.done():
+                entry.future.set_exception(RuntimeError("Arduino 연결 종료"))
 
-      if recv_crc != calc_crc:
-          print("[Parse] CRC mismatch")
-          return None
+        if self.ser and self.ser.is_open:
+            self.ser.close()
+        print("[Arduino] 종료됨")
 
-      return payload
+    def extract_packet(self):
+      """ 프레이머에서 완성된 패킷의 payload(memoryview)를 하나 꺼냄, 없으면 None """
+      return self.framer.extract_packet()
 
     def parse_packet(self, packet: bytes) -> DataPacket:
       floats = struct.unpack("<9f", packet)  # little endian
       return DataPacket(*floats)
     
-    def crc16_modbus(data: bytes) -> int:
-      crc = 0xFFFF
-      for pos in data:
-          crc ^= pos
-          for _ in range(8):
-              if (crc & 0x0001) != 0:
-                  crc >>= 1
-                  crc ^= 0xA001
-              else:
-                  crc >>= 1
-      return crc
-      
-    def encode_command_packet(packet: CommandPacket, self) -> bytes:
-      PACKET_HEADER_1 = 0xAA
-      PACKET_HEADER_2 = 0x55
-
-      # payload = int32 (4 bytes)
-      payload = struct.pack("<i", packet.command)  # little-endian 32bit int
-      length = len(payload)  # ALWAYS 4
+    def encode_command_packet(self, packet: CommandPacket) -> bytes:
+      if packet.seq is None:
+          # payload = int32 (4 bytes)
+          payload = struct.pack("<i", packet.command)  # little-endian 32bit int
+      else:
+          # payload = seq uint16 + int32 (6 bytes)
+          payload = struct.pack(COMMAND_PAYLOAD_FORMAT, packet.seq, packet.command)
+      length = len(payload)
 
       # 패킷 구조: [H1][H2][LEN][PAYLOAD][CRC(2B)]
       header = bytes([PACKET_HEADER_1, PACKET_HEADER_2, length])
 
       crc_input = header + payload
-      crc = self.crc16_modbus(crc_input)
+      crc = crc16_modbus(crc_input)
 
       crc_bytes = bytes([crc & 0xFF, (crc >> 8) & 0xFF])
 
@@ -213,5 +412,5 @@ class SerialSingleton:
     def instance(cls) -> ArduinoSerial:
         with cls._lock:
             if cls._instance is None:
-                cls._instance = ArduinoSerial()
+                cls._instance = ArduinoSerial(port=os.environ.get("OMNITOR_ARDUINO_PORT"))
             return cls._instance
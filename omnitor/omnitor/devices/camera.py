@@ -1,9 +1,9 @@
 import os
 import cv2
 from datetime import datetime
-from models import JournalEntry
 
-save_path = JournalEntry.cam_image_path
+# 농장 일지 사진 저장 위치 (static/omnitor/journal_images)
+save_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "omnitor", "journal_images")
 
 # Caemera resolution settings
 IMAGE_WIDTH = 8000
@@ -14,18 +14,18 @@ def decode_fourcc(val):
     return "".join([chr((int(val) >> 8 * i) & 0xFF) for i in range(4)])
 
 
-def capture_image(save_path: str) -> bool:
+def capture_image(save_path: str, suffix: str = "") -> bool:
     print(f"[{datetime.now()}] Job triggered: Starting picture capture...")
     cap = None
     try:
         os.makedirs(save_path, exist_ok=True)
-        filename = f"{datetime.now().strftime('%Y-%m-%d')}.jpg"
+        filename = f"{datetime.now().strftime('%Y-%m-%d')}{suffix}.jpg"
         full_path = os.path.join(save_path, filename)
         
         cap = cv2.VideoCapture(0)
         if not cap.isOpened():
             print("Error: Cannot open camera. Check connection or other processes.")
-            return
+            return False
             
         fourcc = cv2.VideoWriter_fourcc(*'MJPG')
         cap.set(cv2.CAP_PROP_FOURCC, fourcc)
@@ -48,11 +48,14 @@ def capture_image(save_path: str) -> bool:
         if ret:
             cv2.imwrite(full_path, frame)
             print(f"Success! Picture saved to: {full_path}")
+            return True
         else:
             print("Error: Failed to capture final image from the camera.")
+            return False
 
     except Exception as e:
         print(f"An unexpected error occurred during capture: {e}")
+        return False
     finally:
         if cap is not None and cap.isOpened():
             cap.release()
@@ -0,0 +1,56 @@
+# CRC16-Modbus (poly 0xA001 반사형, 초기값 0xFFFF)
+# 아두이노 패킷과 Modbus RTU 프레임 모두 같은 CRC를 사용
+
+
+def _make_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = _make_table()
+
+
+def crc16_modbus(data, crc=0xFFFF) -> int:
+    """ 256 엔트리 테이블로 바이트당 한 번의 조회로 CRC 계산 (bytes, bytearray, memoryview 모두 가능) """
+    table = CRC16_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
+
+
+def verify_frames(buffer, offsets):
+    """
+    buffer 안의 [H1][H2][LEN][PAYLOAD][CRC(2B)] 프레임 여러 개를 한 번에 검증
+
+    offsets: 각 프레임의 헤더 시작 위치 목록
+    반환: offsets와 같은 순서의 bool 리스트 (버퍼 밖으로 잘린 프레임은 False)
+    """
+    table = CRC16_TABLE
+    # bytes 순회가 memoryview 순회보다 빠르므로 한 번만 복사해 둠
+    data = buffer if isinstance(buffer, bytes) else bytes(buffer)
+    size = len(data)
+    results = []
+
+    for pos in offsets:
+        if pos + 3 > size:
+            results.append(False)
+            continue
+        crc_end = pos + 3 + data[pos + 2]
+        if crc_end + 2 > size:
+            results.append(False)
+            continue
+
+        crc = 0xFFFF
+        for b in data[pos:crc_end]:
+            crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+        results.append(crc == (data[crc_end] | (data[crc_end + 1] << 8)))
+
+    return results
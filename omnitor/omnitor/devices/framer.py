@@ -0,0 +1,125 @@
+from devices.crc import crc16_modbus
+
+
+PACKET_HEADER = b"\xAA\x55"
+
+# 헤더(2) + length(1) + CRC(2)
+PACKET_OVERHEAD = 5
+
+
+class PacketFramer:
+    """
+    미리 할당된 bytearray 위에서 [H1][H2][LEN][PAYLOAD][CRC(2B)] 패킷을 잘라내는 프레이머
+
+    - 헤더는 bytearray.find 로 한 번에 찾고, 앞쪽 쓰레기 바이트는 인덱스 이동만으로 버림
+    - payload는 복사 없이 memoryview로 반환 (다음 feed() 전까지만 유효)
+    - 버퍼 뒤쪽 공간이 모자랄 때만 남은 데이터를 앞으로 한 번에 당겨옴
+    """
+
+    def __init__(self, crc_func=crc16_modbus, capacity=4096):
+        self.crc_func = crc_func
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0  # 아직 처리하지 않은 데이터 시작 위치
+        self._end = 0    # 데이터 끝 위치
+
+        # 통계
+        self.packets = 0
+        self.crc_errors = 0
+        self.length_errors = 0
+        self.discarded_bytes = 0
+        self.overflow_bytes = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def reset(self):
+        self._start = 0
+        self._end = 0
+
+    def _compact(self):
+        pending = self._end - self._start
+        if pending and self._start:
+            self._buf[0:pending] = self._view[self._start:self._end]
+        self._start = 0
+        self._end = pending
+
+    def feed(self, data):
+        """ 수신한 바이트를 버퍼 뒤에 추가 (이전에 반환한 payload view는 무효가 됨) """
+        size = len(data)
+        if size == 0:
+            return
+
+        # 버퍼보다 큰 덩어리는 마지막 capacity 바이트만 의미가 있음
+        if size >= self.capacity:
+            self.overflow_bytes += len(self) + size - self.capacity
+            self._buf[:] = data[size - self.capacity:]
+            self._start = 0
+            self._end = self.capacity
+            return
+
+        if self._start == self._end:
+            self.reset()
+
+        if self._end + size > self.capacity:
+            self._compact()
+            # 그래도 모자라면 가장 오래된 바이트부터 버림
+            overflow = self._end + size - self.capacity
+            if overflow > 0:
+                self.overflow_bytes += overflow
+                self._start = overflow
+                self._compact()
+
+        self._buf[self._end:self._end + size] = data
+        self._end += size
+
+    def extract_packet(self):
+        """
+        완성된 패킷 하나의 payload(memoryview)를 반환, 더 꺼낼 패킷이 없으면 None
+        CRC가 맞지 않는 프레임은 건너뛰고 다음 헤더에서 다시 동기화함
+        """
+        buf = self._buf
+        view = self._view
+
+        while self._end - self._start >= PACKET_OVERHEAD:
+            pos = buf.find(PACKET_HEADER, self._start, self._end)
+            if pos < 0:
+                # 마지막 바이트가 0xAA면 다음 청크의 0x55와 이어질 수 있으므로 남겨둠
+                keep = 1 if buf[self._end - 1] == PACKET_HEADER[0] else 0
+                self.discarded_bytes += self._end - self._start - keep
+                self._start = self._end - keep
+                return None
+
+            if pos != self._start:
+                self.discarded_bytes += pos - self._start
+                self._start = pos
+
+            if self._end - pos < 3:
+                return None
+
+            length = buf[pos + 2]
+            needed = PACKET_OVERHEAD + length
+            if needed > self.capacity:
+                # 버퍼에 다 들어갈 수 없는 길이 = 깨진 헤더, 기다리면 뒤의 정상 패킷까지 밀려나므로 바로 재동기화
+                self.length_errors += 1
+                self.discarded_bytes += 1
+                self._start = pos + 1
+                continue
+            if self._end - pos < needed:
+                return None
+
+            crc_end = pos + 3 + length
+            recv_crc = buf[crc_end] | (buf[crc_end + 1] << 8)
+            if self.crc_func(view[pos:crc_end]) != recv_crc:
+                # 노이즈 속 가짜 헤더일 수 있으니 헤더 1바이트만 버리고 재동기화
+                self.crc_errors += 1
+                self.discarded_bytes += 1
+                self._start = pos + 1
+                continue
+
+            self._start = pos + needed
+            self.packets += 1
+            return view[pos + 3:crc_end]
+
+        return None
@@ -0,0 +1,79 @@
+import time
+
+
+class SampleRing:
+    """
+    (monotonic_ts, item) 를 순서대로 담는 고정 크기 링 버퍼
+
+    - 생산자(read 스레드) 1개, 소비자 1개를 가정하며 락을 쓰지 않음
+    - 가득 차면 가장 오래된 샘플을 덮어쓰고, 소비자가 drain() 할 때 잃어버린 개수를 overflows에 집계
+    - 각 슬롯에 일련번호를 같이 저장해서 읽는 도중 덮어쓰인 슬롯을 걸러냄
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0  # 지금까지 push 된 총 개수 (다음 쓰기 일련번호)
+        self._tail = 0  # 소비자가 다음에 읽을 일련번호
+        self._latest = None
+
+        # 통계
+        self.pushed = 0
+        self.drained = 0
+        self.overflows = 0
+
+    def __len__(self):
+        return min(self._head - self._tail, self.capacity)
+
+    def push(self, item, ts=None):
+        if ts is None:
+            ts = time.monotonic()
+        seq = self._head
+        entry = (seq, ts, item)
+        self._slots[seq % self.capacity] = entry
+        self._latest = entry
+        # 슬롯을 다 쓴 뒤에 head를 올려야 소비자가 반쯤 쓰인 슬롯을 보지 않음
+        self._head = seq + 1
+        self.pushed += 1
+
+    def latest(self):
+        """ 가장 최근 (ts, item), 없으면 None """
+        entry = self._latest
+        if entry is None:
+            return None
+        return entry[1], entry[2]
+
+    def drain(self, max_items=None):
+        """ 아직 읽지 않은 샘플을 오래된 순서대로 [(ts, item), ...] 로 반환 """
+        head = self._head
+        start = self._tail
+        if head - start > self.capacity:
+            self.overflows += head - self.capacity - start
+            start = head - self.capacity
+
+        end = head
+        if max_items is not None:
+            end = min(head, start + max_items)
+
+        result = []
+        slots = self._slots
+        capacity = self.capacity
+        for seq in range(start, end):
+            entry = slots[seq % capacity]
+            if entry[0] != seq:
+                # 읽는 사이에 생산자가 덮어씀
+                self.overflows += 1
+                continue
+            result.append((entry[1], entry[2]))
+
+        self._tail = end
+        self.drained += len(result)
+        return result
+
+    def stats(self):
+        return {
+            'pushed': self.pushed,
+            'drained': self.drained,
+            'overflows': self.overflows,
+            'pending': len(self),
+        }
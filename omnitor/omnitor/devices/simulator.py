@@ -0,0 +1,396 @@
+import os
+import sys
+import pty
+import tty
+import math
+import time
+import errno
+import random
+import select
+import struct
+import argparse
+import threading
+
+if __name__ == '__main__':
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from devices.crc import crc16_modbus
+from devices.framer import PacketFramer
+
+
+class PtyDevice:
+    """
+    pty 쌍의 slave 쪽을 고정 경로(symlink)로 노출하는 가상 시리얼 장치
+
+    ArduinoSerial(port=...) / SoilSensor(port=...) 에 link_path를 넘기면 실제 보드 대신 붙음
+    disconnect() 는 pty를 닫고 새로 만들어 같은 경로로 다시 연결함 (USB 재연결 흉내)
+    """
+
+    name = "Sim"
+
+    def __init__(self, link_path, speed=1.0, seed=None):
+        self.link_path = link_path
+        self.speed = speed
+        self.random = random.Random(seed)
+        self.master_fd = None
+        self.slave_fd = None
+        self.running = False
+        self.thread = None
+        self.online = threading.Event()
+
+        # 통계
+        self.frames_sent = 0
+        self.faults = {'crc': 0, 'garbage': 0, 'disconnect': 0, 'drop': 0}
+
+    @property
+    def port(self):
+        return self.link_path
+
+    def _open(self):
+        self.master_fd, self.slave_fd = pty.openpty()
+        # echo / 개행 변환이 없도록 raw 모드 (클라이언트가 열기 전에도)
+        tty.setraw(self.slave_fd)
+        tmp_link = f"{self.link_path}.tmp"
+        if os.path.lexists(tmp_link):
+            os.unlink(tmp_link)
+        os.symlink(os.ttyname(self.slave_fd), tmp_link)
+        os.replace(tmp_link, self.link_path)
+        self.online.set()
+
+    def _close(self):
+        self.online.clear()
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.master_fd = None
+        self.slave_fd = None
+
+    def disconnect(self, duration=2.0):
+        """ duration 초 동안 장치를 뽑았다가 다시 연결 """
+        self.faults['disconnect'] += 1
+        print(f"[{self.name}] 연결 끊김 ({duration:.1f}s)")
+        self._close()
+        if os.path.lexists(self.link_path):
+            os.unlink(self.link_path)
+        self._sleep(duration)
+        if self.running:
+            self._open()
+            print(f"[{self.name}] 재연결: {self.link_path} -> {os.ttyname(self.slave_fd)}")
+
+    def _sleep(self, seconds):
+        """ speed 배속을 적용한 대기 """
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def _write(self, data):
+        try:
+            os.write(self.master_fd, data)
+        except (OSError, TypeError):
+            pass
+
+    def _read(self, timeout):
+        """ timeout 동안 클라이언트가 보낸 바이트를 읽음, 없으면 b"" """
+        fd = self.master_fd
+        if fd is None:
+            time.sleep(timeout)
+            return b""
+        try:
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if ready:
+                return os.read(fd, 1024)
+        except OSError as e:
+            if e.errno not in (errno.EIO, errno.EBADF):
+                raise
+        return b""
+
+    def _garbage(self, max_len=16):
+        self.faults['garbage'] += 1
+        return bytes(self.random.randrange(256) for _ in range(self.random.randint(1, max_len)))
+
+    def start(self):
+        self._open()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        print(f"[{self.name}] 시작: {self.link_path} -> {os.ttyname(self.slave_fd)}")
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        self._close()
+        if os.path.lexists(self.link_path):
+            os.unlink(self.link_path)
+
+    def run(self):
+        raise NotImplementedError
+
+
+def synthetic_arduino_values(t):
+    """ t(초) 시점의 합성 센서 값 (하루 주기 사인파 + 약간의 잡음) """
+    day = math.sin(2 * math.pi * t / 86400)
+    return [
+        22.0 + 6.0 * day,          # air_temperature
+        60.0 - 15.0 * day,         # air_humidity
+        450.0 + 50.0 * day,        # co2
+        max(0.0, 300.0 * day),     # insolation
+        82000.0 + 50.0 * math.sin(t / 60),  # weight_raw
+        2.5 + 0.01 * math.sin(t / 7),       # ph_voltage
+        1.2 + 0.01 * math.sin(t / 11),      # ec_voltage
+        18.0 + 2.0 * day,          # water_temperature
+        float(int(t // 600)),      # tip_count
+    ]
+
+
+def load_recorded_values(path):
+    """ 펌웨어 CSV 출력(9개 값, 콤마 구분) 로그에서 값 리스트를 읽음, 형식이 다른 줄은 건너뜀 """
+    rows = []
+    with open(path) as f:
+        for line in f:
+            parts = line.strip().split(",")
+            if len(parts) != 9:
+                continue
+            try:
+                rows.append([float(v) for v in parts])
+            except ValueError:
+                continue
+    return rows
+
+
+def encode_frame(payload, corrupt=False):
+    header = bytes([0xAA, 0x55, len(payload)])
+    crc = crc16_modbus(header + payload)
+    if corrupt:
+        crc ^= 0x0001
+    return header + payload + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+
+
+class ArduinoSimulator(PtyDevice):
+    """
+    ArduinoSerial 이 기대하는 0xAA 0x55 + CRC 프레임으로 DataPacket을 주기적으로 보내고
+    명령 패킷에는 command_duration 만큼 걸린 뒤 ACK를 보냄
+
+    values: None이면 합성 데이터, 리스트면 순서대로 반복 재생 (load_recorded_values 참고)
+    """
+
+    name = "SimArduino"
+
+    def __init__(self, link_path="/tmp/omnitor-arduino", period=1.0, speed=1.0, values=None,
+                 crc_error_rate=0.0, garbage_rate=0.0, disconnect_every=None, disconnect_duration=2.0,
+                 command_duration=0.5, seed=None):
+        super().__init__(link_path, speed=speed, seed=seed)
+        self.period = period
+        self.values = values
+        self.crc_error_rate = crc_error_rate
+        self.garbage_rate = garbage_rate
+        self.disconnect_every = disconnect_every
+        self.disconnect_duration = disconnect_duration
+        self.command_duration = command_duration
+        self.framer = PacketFramer()
+        self.commands = []
+        self.last_seq = None
+
+    def next_frame(self, index):
+        if self.values:
+            values = self.values[index % len(self.values)]
+        else:
+            values = synthetic_arduino_values(index * self.period)
+        return struct.pack("<9f", *values)
+
+    def _handle_commands(self, data):
+        self.framer.feed(data)
+        while True:
+            payload = self.framer.extract_packet()
+            if payload is None:
+                break
+            if len(payload) != 6:
+                continue
+            seq, command = struct.unpack("<Hi", payload)
+            if command == 0:
+                # CMD_SESSION_RESET: 펌웨어처럼 lastSeq만 맞추고 실행하지 않음
+                self.last_seq = seq
+            elif self.last_seq is None or 0 < (seq - self.last_seq) & 0xFFFF < 0x8000:
+                # 펌웨어와 같은 uint16 순환 비교 (lastSeq 이하면 이미 실행한 명령으로 보고 ACK만)
+                self.commands.append(command)
+                self.last_seq = seq
+                self._sleep(self.command_duration)
+            self._write(encode_frame(struct.pack("<HB", seq, 0)))
+
+    def run(self):
+        index = 0
+        interval = self.period / self.speed
+        next_send = time.monotonic()
+        next_disconnect = None
+        if self.disconnect_every:
+            next_disconnect = next_send + self.disconnect_every / self.speed
+
+        while self.running:
+            now = time.monotonic()
+            if next_disconnect is not None and now >= next_disconnect:
+                self.disconnect(self.disconnect_duration)
+                self.framer.reset()
+                next_send = next_disconnect = time.monotonic()
+                next_disconnect += self.disconnect_every / self.speed
+                continue
+
+            if now >= next_send:
+                if self.garbage_rate and self.random.random() < self.garbage_rate:
+                    self._write(self._garbage())
+                corrupt = bool(self.crc_error_rate) and self.random.random() < self.crc_error_rate
+                if corrupt:
+                    self.faults['crc'] += 1
+                self._write(encode_frame(self.next_frame(index), corrupt=corrupt))
+                self.frames_sent += 1
+                index += 1
+                next_send += interval
+                # 많이 밀렸으면 따라잡지 않고 현재 시각 기준으로 다시 맞춤
+                if next_send < now - interval:
+                    next_send = now + interval
+
+            data = self._read(max(0.0, next_send - time.monotonic()))
+            if data:
+                self._handle_commands(data)
+
+
+class SoilSimulator(PtyDevice):
+    """
+    SoilSensor(minimalmodbus)가 읽는 Modbus RTU 슬레이브 흉내 (function code 3만 지원)
+
+    registers: {slave_address: [레지스터 값, ...]}, None이면 주소 1에 합성 값
+    turnaround: 요청을 받고 응답을 시작할 때까지 걸리는 시간 (실제 센서 기준, 초)
+    no_response_rate: 응답하지 않을 확률 (클라이언트 timeout 유발)
+    """
+
+    name = "SimSoil"
+
+    def __init__(self, link_path="/tmp/omnitor-soil", speed=1.0, registers=None, baudrate=4800,
+                 turnaround=0.02, crc_error_rate=0.0, garbage_rate=0.0, no_response_rate=0.0,
+                 disconnect_every=None, disconnect_duration=2.0, seed=None):
+        super().__init__(link_path, speed=speed, seed=seed)
+        self.registers = registers
+        self.baudrate = baudrate
+        self.turnaround = turnaround
+        self.crc_error_rate = crc_error_rate
+        self.garbage_rate = garbage_rate
+        self.no_response_rate = no_response_rate
+        self.disconnect_every = disconnect_every
+        self.disconnect_duration = disconnect_duration
+        self.started_at = time.monotonic()
+        self.requests = 0
+
+    def read_registers(self, address, start, count):
+        if self.registers is None:
+            if address != 1:
+                return None
+            t = (time.monotonic() - self.started_at) * self.speed
+            day = math.sin(2 * math.pi * t / 86400)
+            values = [int(200 + 30 * day), int(350 - 40 * day), int(800 + 50 * day), int(65 + 3 * day)]
+        else:
+            values = self.registers.get(address)
+            if values is None:
+                return None
+        if start + count > len(values):
+            return None
+        return values[start:start + count]
+
+    def _respond(self, request):
+        address, function, start, count = struct.unpack(">BBHH", request[:6])
+        recv_crc = request[6] | (request[7] << 8)
+        if crc16_modbus(request[:6]) != recv_crc or function != 3:
+            return
+        values = self.read_registers(address, start, count)
+        if values is None:
+            return  # 없는 슬레이브는 응답하지 않음
+
+        if self.no_response_rate and self.random.random() < self.no_response_rate:
+            self.faults['drop'] += 1
+            return
+
+        body = struct.pack(">BBB", address, function, 2 * count) + struct.pack(f">{count}H", *values)
+        crc = crc16_modbus(body)
+        if self.crc_error_rate and self.random.random() < self.crc_error_rate:
+            self.faults['crc'] += 1
+            crc ^= 0x0001
+        response = body + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+
+        # 응답 지연 + 전송 시간 (10비트/바이트)
+        self._sleep(self.turnaround + len(response) * 10 / self.baudrate)
+        if self.garbage_rate and self.random.random() < self.garbage_rate:
+            self._write(self._garbage(4))
+        self._write(response)
+        self.frames_sent += 1
+
+    def run(self):
+        buffer = bytearray()
+        next_disconnect = None
+        if self.disconnect_every:
+            next_disconnect = time.monotonic() + self.disconnect_every / self.speed
+
+        while self.running:
+            if next_disconnect is not None and time.monotonic() >= next_disconnect:
+                self.disconnect(self.disconnect_duration)
+                buffer.clear()
+                next_disconnect = time.monotonic() + self.disconnect_every / self.speed
+                continue
+
+            data = self._read(0.1)
+            if not data:
+                # 프레임 사이 침묵 구간: 남은 조각은 버림
+                buffer.clear()
+                continue
+            buffer += data
+            while len(buffer) >= 8:
+                request = bytes(buffer[:8])
+                del buffer[:8]
+                self.requests += 1
+                self._respond(request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arduino / 토양 센서 pty 시뮬레이터")
+    parser.add_argument("--arduino", default="/tmp/omnitor-arduino", help="아두이노 포트 경로 (빈 문자열이면 끔)")
+    parser.add_argument("--soil", default="/tmp/omnitor-soil", help="토양 센서 포트 경로 (빈 문자열이면 끔)")
+    parser.add_argument("--period", type=float, default=1.0, help="아두이노 패킷 주기 (초)")
+    parser.add_argument("--speed", type=float, default=1.0, help="실제 시간 대비 배속")
+    parser.add_argument("--replay", help="재생할 펌웨어 CSV 로그 파일")
+    parser.add_argument("--crc-error-rate", type=float, default=0.0)
+    parser.add_argument("--garbage-rate", type=float, default=0.0)
+    parser.add_argument("--no-response-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-every", type=float, default=None, help="N초(시뮬레이션 시간)마다 연결 끊기")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    devices = []
+    if args.arduino:
+        values = load_recorded_values(args.replay) if args.replay else None
+        devices.append(ArduinoSimulator(
+            args.arduino, period=args.period, speed=args.speed, values=values,
+            crc_error_rate=args.crc_error_rate, garbage_rate=args.garbage_rate,
+            disconnect_every=args.disconnect_every, seed=args.seed,
+        ).start())
+    if args.soil:
+        devices.append(SoilSimulator(
+            args.soil, speed=args.speed,
+            crc_error_rate=args.crc_error_rate, garbage_rate=args.garbage_rate,
+            no_response_rate=args.no_response_rate,
+            disconnect_every=args.disconnect_every, seed=args.seed,
+        ).start())
+
+    try:
+        while True:
+            time.sleep(5)
+            for device in devices:
+                print(f"[{device.name}] sent={device.frames_sent} faults={device.faults}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for device in devices:
+            device.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
+import os
 import serial
 import time
+import threading
 import minimalmodbus
 import serial.tools.list_ports
 from dataclasses import dataclass
@@ -14,63 +16,106 @@ class SoilData:
     soil_ph: float
 
 
+@dataclass
+class SoilReading:
+    """ 백그라운드 스레드가 마지막으로 읽은 값과 읽은 시각(monotonic) """
+    data: SoilData
+    timestamp: float
+
+    @property
+    def age(self) -> float:
+        """ 읽은 지 몇 초 지났는지 """
+        return time.monotonic() - self.timestamp
+
+
 class SoilSensor:
-    def __init__(self):
+    def __init__(self, port=None, poll_interval=1.0, stale_after=10.0, max_backoff=60.0):
         self.instrument = None
         self.lock = Lock()
-        self.port = None
+        # port를 지정하면 자동 탐색 대신 그 경로를 사용 (시뮬레이터 등)
+        self.port_override = port
+        self.port = None  # 마지막으로 연결에 성공한 포트 (재연결 시 먼저 시도)
 
         self.slave_address = 1
-        self.baudrate = 4800 
+        self.baudrate = 4800
         self.bytesize = 8
         self.parity = serial.PARITY_NONE
         self.stopbits = 1
         self.timeout = 1.0
 
+        # 백그라운드 수집 스레드
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after  # 이보다 오래된 값은 read()에서 None
+        self.max_backoff = max_backoff
+        self.poll_thread = None
+        self.running = False
+        self.stop_event = threading.Event()
+        self.latest = None
+
+        # 통계
+        self.reads = 0
+        self.failures = 0
+        self.connects = 0
+
     def find_port(self):
+        if self.port_override:
+            return self.port_override
         ports = serial.tools.list_ports.comports()
         for port in ports:
             if ("FT232" in port.description or "UART" in port.description or "USB" in port.description) and "Arduino" not in port.description:
                 return port.device
         return None
-    
-    def start(self):
+
+    def connect(self, rescan=False):
+        """ 캐시된 포트로 먼저 연결하고, 없거나 rescan이면 포트를 다시 찾음 """
         with self.lock:
             if self.instrument:
                 return True
-            
-            self.port = self.find_port()
-            if not self.port:
+
+            port = None if rescan else self.port
+            if not port:
+                port = self.find_port()
+            if not port:
                 return False
-            
+
             try:
-                print(f"[Soil] 포트 연결: {self.port}")
-                self.instrument = minimalmodbus.Instrument(self.port, self.slave_address)
-                self.instrument.serial.baudrate = self.baudrate
-                self.instrument.serial.bytesize = self.bytesize
-                self.instrument.serial.parity = self.parity
-                self.instrument.serial.stopbits = self.stopbits
-                self.instrument.serial.timeout = self.timeout
-                self.instrument.mode = minimalmodbus.MODE_RTU
+                print(f"[Soil] 포트 연결: {port}")
+                instrument = minimalmodbus.Instrument(port, self.slave_address)
+                instrument.serial.baudrate = self.baudrate
+                instrument.serial.bytesize = self.bytesize
+                instrument.serial.parity = self.parity
+                instrument.serial.stopbits = self.stopbits
+                instrument.serial.timeout = self.timeout
+                instrument.mode = minimalmodbus.MODE_RTU
+                self.instrument = instrument
+                self.port = port
                 return True
-            
+
             except Exception as e:
                 print(f"[Soil] 초기화 실패: {e}")
                 self.instrument = None
                 return False
 
-    def read(self):
+    def _close(self):
+        if self.instrument:
+            try:
+                self.instrument.serial.close()
+            except:
+                pass
+        self.instrument = None
+
+    def read_now(self):
+        """ Modbus로 직접 한 번 읽음 (블로킹, 실패 시 None) — 보통은 read()를 사용 """
         with self.lock:
             if not self.instrument:
-                if not self.connect():
-                    return None
-            
+                return None
+
             try:
                 values = self.instrument.read_registers(0, 4, functioncode=3)
-                soil_temperature = values[0] / 10.0 
+                soil_temperature = values[0] / 10.0
                 soil_humidity = values[1] / 10.0
                 soil_ec = values[2]
-                soil_ph = values[3] / 10.0         
+                soil_ph = values[3] / 10.0
 
                 return SoilData(
                     soil_temperature=soil_temperature,
@@ -78,20 +123,79 @@ class SoilSensor:
                     soil_ec=int(soil_ec),
                     soil_ph=soil_ph
                 )
-            
+
             except Exception as e:
-                self.instrument.serial.close()
-                self.instrument = None
+                print(f"[Soil] 읽기 실패: {e}")
+                self._close()
                 return None
-            
-        
+
+    def poll_loop(self):
+        backoff = 1.0
+        failed_connects = 0
+        next_poll = time.monotonic()
+
+        while self.running:
+            if not self.instrument:
+                # 캐시된 포트로 몇 번 실패하면 포트를 다시 탐색
+                if not self.connect(rescan=failed_connects >= 3):
+                    failed_connects += 1
+                    print(f"[Soil] 연결 실패 — {backoff:.0f}초 후 재시도")
+                    if self.stop_event.wait(backoff):
+                        break
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                self.connects += 1
+                failed_connects = 0
+                next_poll = time.monotonic()
+
+            data = self.read_now()
+            if data is None:
+                self.failures += 1
+                if self.stop_event.wait(backoff):
+                    break
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            self.reads += 1
+            self.latest = SoilReading(data=data, timestamp=time.monotonic())
+            backoff = 1.0
+
+            next_poll += self.poll_interval
+            wait = next_poll - time.monotonic()
+            if wait < 0:
+                next_poll = time.monotonic()
+                wait = 0
+            if self.stop_event.wait(wait):
+                break
+
+    def start(self):
+        if self.running:
+            return True
+        self.running = True
+        self.stop_event.clear()
+        self.poll_thread = threading.Thread(target=self.poll_loop, daemon=True)
+        self.poll_thread.start()
+        return True
+
+    def get_current_data(self):
+        """ 마지막 SoilReading (data, timestamp, age), 한 번도 못 읽었으면 None — I/O 없음 """
+        return self.latest
+
+    def read(self):
+        """ 마지막으로 읽은 SoilData, stale_after보다 오래됐으면 None — I/O 없음 """
+        reading = self.latest
+        if reading is None or reading.age > self.stale_after:
+            return None
+        return reading.data
+
     def stop(self):
-        if self.instrument:
-                try:
-                    self.instrument.serial.close()
-                except:
-                    pass
-                    self.instrument = None
+        self.running = False
+        self.stop_event.set()
+        if self.poll_thread and self.poll_thread is not threading.current_thread():
+            # 진행 중인 Modbus 요청은 timeout 안에 끝남
+            self.poll_thread.join(timeout=self.timeout + 1)
+        with self.lock:
+            self._close()
 
 
 class SoilSensorSingleton:
@@ -102,5 +206,5 @@ class SoilSensorSingleton:
     def instance(cls):
         with cls._lock:
             if cls._instance is None:
-                cls._instance = SoilSensor()
+                cls._instance = SoilSensor(port=os.environ.get("OMNITOR_SOIL_PORT"))
             return cls._instance
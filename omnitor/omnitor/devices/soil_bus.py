@@ -0,0 +1,209 @@
+import time
+import threading
+import minimalmodbus
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Optional
+
+from devices.soil import SoilData, SoilReading, SoilSensor
+
+# 기본 레지스터 맵: 이름 -> (레지스터 주소, 나눌 값)
+DEFAULT_REGISTER_MAP = {
+    'soil_temperature': (0, 10.0),
+    'soil_humidity': (1, 10.0),
+    'soil_ec': (2, 1.0),
+    'soil_ph': (3, 10.0),
+}
+
+
+def merge_register_ranges(registers, max_gap=2):
+    """
+    읽을 레지스터 주소들을 연속 구간 [(start, count), ...] 으로 묶음
+    사이가 max_gap 이하로 비어 있으면 왕복을 한 번 줄이기 위해 같이 읽음
+    """
+    ranges = []
+    for reg in sorted(set(registers)):
+        if ranges and reg - (ranges[-1][0] + ranges[-1][1]) <= max_gap:
+            start = ranges[-1][0]
+            ranges[-1] = (start, reg - start + 1)
+        else:
+            ranges.append((reg, 1))
+    return ranges
+
+
+@dataclass
+class SoilProbe:
+    """ 버스에 달린 토양 센서 한 개 (Modbus 슬레이브 주소 기준) """
+    address: int
+    register_map: dict = field(default_factory=lambda: dict(DEFAULT_REGISTER_MAP))
+    ranges: list = field(default_factory=list)
+
+    # 실패 시 몇 사이클 건너뛸지 (지수 백오프)
+    failures: int = 0
+    skip_cycles: int = 0
+    reads: int = 0
+
+    # 이 센서를 한 번 읽는 데 걸리는 버스 왕복 시간 합 (지수 이동 평균, 초)
+    rtt: Optional[float] = None
+
+    def __post_init__(self):
+        if not self.ranges:
+            self.ranges = merge_register_ranges(reg for reg, _ in self.register_map.values())
+
+    def decode(self, registers):
+        values = {name: registers[reg] / scale for name, (reg, scale) in self.register_map.items()}
+        values['soil_ec'] = int(values['soil_ec'])
+        return SoilData(**values)
+
+
+class SoilBus(SoilSensor):
+    """
+    하나의 RS-485 포트(시리얼 핸들)를 공유하는 여러 토양 센서를 라운드로빈으로 읽는 스케줄러
+
+    - 슬레이브마다 연속된 레지스터는 한 번의 function 3 요청으로 묶어서 읽음
+    - 응답 왕복 시간(EWMA)에 맞춰 요청 timeout을 줄여서, 없는 센서 때문에 사이클이 늘어나지 않게 함
+    - 사이클(모든 센서 1회) 간격은 센서별 왕복 시간 합 * cycle_margin (min_interval ~ poll_interval 사이)
+      이라서 버스가 빠르면 더 자주 읽고, 센서가 늘어나도 버스가 감당할 수 있는 만큼만 읽음
+    - 결과는 센서 주소별 SoilReading으로 게시
+    """
+
+    def __init__(self, addresses=(1,), port=None, poll_interval=1.0, stale_after=10.0, max_backoff=60.0,
+                 min_timeout=0.05, max_skip_cycles=32, min_interval=0.2, cycle_margin=2.0):
+        super().__init__(port=port, poll_interval=poll_interval, stale_after=stale_after, max_backoff=max_backoff)
+        self.probes = [SoilProbe(address) if isinstance(address, int) else address for address in addresses]
+        self.slave_address = self.probes[0].address
+        self.min_timeout = min_timeout
+        self.max_skip_cycles = max_skip_cycles
+        self.min_interval = min_interval
+        self.cycle_margin = cycle_margin
+        self.readings = {}
+        self.readings_lock = Lock()
+
+        # 버스 왕복 시간 (지수 이동 평균, 초)
+        self.rtt = None
+        self.cycles = 0
+        self.cycle_time = None
+        self.period = poll_interval
+
+    def _request_timeout(self):
+        """ 평소 왕복 시간의 4배, 최소 min_timeout, 최대 설정 timeout """
+        if self.rtt is None:
+            return self.timeout
+        return min(self.timeout, max(self.min_timeout, self.rtt * 4))
+
+    def _update_rtt(self, elapsed):
+        self.rtt = elapsed if self.rtt is None else 0.8 * self.rtt + 0.2 * elapsed
+
+    def _cycle_period(self):
+        """ 다음 사이클까지 간격: 이번에 읽을 센서들의 왕복 시간 합 * cycle_margin, min_interval ~ poll_interval """
+        turnaround = sum(p.rtt for p in self.probes if p.rtt is not None and not p.skip_cycles)
+        if not turnaround:
+            return self.poll_interval
+        return min(self.poll_interval, max(self.min_interval, turnaround * self.cycle_margin))
+
+    def _read_probe(self, probe):
+        """ 센서 하나를 읽어 SoilData 반환, 응답이 없으면 None (포트 오류는 예외) """
+        registers = {}
+        with self.lock:
+            if not self.instrument:
+                return None
+            self.instrument.address = probe.address
+            self.instrument.serial.timeout = self._request_timeout()
+            turnaround = 0.0
+            for start, count in probe.ranges:
+                began = time.monotonic()
+                try:
+                    values = self.instrument.read_registers(start, count, functioncode=3)
+                except minimalmodbus.ModbusException:
+                    return None
+                elapsed = time.monotonic() - began
+                self._update_rtt(elapsed)
+                turnaround += elapsed
+                registers.update(zip(range(start, start + count), values))
+        probe.rtt = turnaround if probe.rtt is None else 0.8 * probe.rtt + 0.2 * turnaround
+        return probe.decode(registers)
+
+    def poll_cycle(self):
+        """ 모든 센서를 한 번씩 읽음 (백오프 중인 센서는 건너뜀) """
+        for probe in self.probes:
+            if not self.running:
+                return
+            if probe.skip_cycles:
+                probe.skip_cycles -= 1
+                continue
+
+            data = self._read_probe(probe)
+            if data is None:
+                probe.failures += 1
+                self.failures += 1
+                probe.skip_cycles = min(2 ** (probe.failures - 1), self.max_skip_cycles) - 1
+                continue
+
+            probe.failures = 0
+            probe.reads += 1
+            self.reads += 1
+            with self.readings_lock:
+                self.readings[probe.address] = SoilReading(data=data, timestamp=time.monotonic())
+
+    def poll_loop(self):
+        backoff = 1.0
+        failed_connects = 0
+
+        while self.running:
+            if not self.instrument:
+                if not self.connect(rescan=failed_connects >= 3):
+                    failed_connects += 1
+                    print(f"[SoilBus] 연결 실패 — {backoff:.0f}초 후 재시도")
+                    if self.stop_event.wait(backoff):
+                        break
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                self.connects += 1
+                failed_connects = 0
+
+            began = time.monotonic()
+            try:
+                self.poll_cycle()
+            except Exception as e:
+                # 응답 없음이 아닌 포트 자체 오류 -> 다시 연결
+                print(f"[SoilBus] 버스 오류: {e}")
+                with self.lock:
+                    self._close()
+                # 어댑터가 빠진 경우 등 다시 연결해도 바로 실패할 수 있으므로 soil.py 처럼 기다렸다가 재시도
+                # (backoff는 사이클이 한 번 성공해야 1초로 돌아감)
+                if self.stop_event.wait(backoff):
+                    break
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = 1.0
+            self.cycles += 1
+            self.cycle_time = time.monotonic() - began
+            self.period = self._cycle_period()
+            if self.stop_event.wait(max(0.0, self.period - self.cycle_time)):
+                break
+
+    def get_current_data(self, address=None):
+        """ 센서 주소별 마지막 SoilReading, address가 없으면 {address: SoilReading} 전체 """
+        with self.readings_lock:
+            if address is None:
+                return dict(self.readings)
+            return self.readings.get(address)
+
+    def read(self, address=None):
+        """ 센서의 마지막 SoilData (stale_after보다 오래됐으면 None), address 기본값은 첫 센서 """
+        reading = self.get_current_data(self.probes[0].address if address is None else address)
+        if reading is None or reading.age > self.stale_after:
+            return None
+        return reading.data
+
+    def stats(self):
+        return {
+            'cycles': self.cycles,
+            'cycle_time': self.cycle_time,
+            'period': self.period,
+            'rtt': self.rtt,
+            'reads': self.reads,
+            'failures': self.failures,
+            'probes': {p.address: {'reads': p.reads, 'failures': p.failures, 'rtt': p.rtt} for p in self.probes},
+        }
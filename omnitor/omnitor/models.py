@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import datetime
 
 
@@ -12,6 +13,9 @@ class FarmJournal(models.Model):
     notes = models.TextField(blank=True, null=True)
     camtime = models.TimeField(default=datetime.time(00, 00))
 
+    # 저장할 때마다 갱신 (일지 조회 응답의 ETag / Last-Modified)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
     def __str__(self):
         return f"농장 일지: {self.date}"
 
@@ -22,7 +26,9 @@ class RawData(models.Model):
     """ 센서 raw 데이터 모델 (아두이노 & 토양 포함)
         타임스탬프, 온도, 습도, CO2, 일사량, 수온, 무게(raw), pH(raw), EC(raw), 티핑게이지 카운트 """
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # 수집 시각을 그대로 저장하도록 auto_now_add 대신 default 사용 (bulk_create 시에도 덮어쓰지 않음)
+    # 시간 구간 조회 / 재계산이 전체 테이블을 훑지 않도록 인덱스
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     
     # 환경 센서
     air_temperature = models.FloatField(null=True, blank=True)
@@ -54,7 +60,8 @@ class FinalData(models.Model):
 
     """ 최종 보정된 센서 데이터 모델 """
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # 원본 RawData와 같은 수집 시각을 저장하도록 default 사용
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     
     # 환경 센서
     air_temperature = models.FloatField(null=True, blank=True)
@@ -107,7 +114,56 @@ class CalibrationSettings(models.Model):
     ec_slope = models.FloatField(default=0)
     ec_intercept = models.FloatField(default=0)
 
+    # 보정 값을 저장할 때마다 1씩 증가 (프로세스별 보정 계수 캐시 무효화용)
+    version = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return "보정 설정"
     
     
+# ===== 그래프용 롤업 (FinalData 분/시간/일 집계) =====
+
+# 롤업하는 FinalData 항목 (실수 값 센서 채널 전부)
+ROLLUP_FIELDS = [f.name for f in FinalData._meta.fields if isinstance(f, models.FloatField)]
+
+
+class FinalDataRollup(models.Model):
+
+    """ 한 버킷(분/시간/일) 동안의 FinalData 항목별 count / sum / min / max
+        timestamp는 버킷 시작 시각, 평균은 sum / count """
+
+    timestamp = models.DateTimeField(unique=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self._meta.verbose_name}: {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
+
+
+for _field in ROLLUP_FIELDS:
+    FinalDataRollup.add_to_class(f"{_field}_count", models.IntegerField(default=0))
+    FinalDataRollup.add_to_class(f"{_field}_sum", models.FloatField(default=0))
+    FinalDataRollup.add_to_class(f"{_field}_min", models.FloatField(null=True, blank=True))
+    FinalDataRollup.add_to_class(f"{_field}_max", models.FloatField(null=True, blank=True))
+
+
+class FinalDataMinute(FinalDataRollup):
+    resolution = 60
+
+    class Meta:
+        verbose_name = "1분 롤업"
+
+
+class FinalDataHour(FinalDataRollup):
+    resolution = 3600
+
+    class Meta:
+        verbose_name = "1시간 롤업"
+
+
+class FinalDataDay(FinalDataRollup):
+    resolution = 86400
+
+    class Meta:
+        verbose_name = "1일 롤업"
@@ -0,0 +1,252 @@
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+from itertools import islice
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
+    django.setup()
+
+import numpy as np
+from django.db import connection, transaction
+
+from omnitor.models import RawData, FinalData
+from services import downsample
+
+# 날짜별 압축 컬럼 파일을 두는 곳: <ARCHIVE_DIR>/<모델 이름>/<YYYY-MM-DD>.npz
+ARCHIVE_DIR = os.environ.get("OMNITOR_ARCHIVE_DIR", os.path.join(root_dir, "archive"))
+
+# 이 일수보다 오래된 행은 보관 파일로 옮기고 DB에서 지움
+RETENTION_DAYS = int(os.environ.get("OMNITOR_RETENTION_DAYS", "90"))
+
+ARCHIVED_MODELS = [RawData, FinalData]
+
+# 파일 안의 timestamps: 이 시각부터의 마이크로초 (int64, naive 로컬 시각)
+EPOCH = datetime(1970, 1, 1)
+US_PER_SEC = 1_000_000
+
+
+def channels(model):
+    """ 보관하는 채널 (timestamp를 뺀 실수 값 필드) """
+    return [f.name for f in model._meta.fields if f.get_internal_type() == 'FloatField']
+
+
+def to_us(timestamps):
+    return np.array([(ts - EPOCH) // timedelta(microseconds=1) for ts in timestamps], dtype=np.int64)
+
+
+def from_us(values):
+    return [EPOCH + timedelta(microseconds=int(v)) for v in values]
+
+
+class DayArchive:
+    """
+    한 모델의 날짜별 보관 파일 (np.savez_compressed)
+    파일마다 timestamps (int64 µs) 와 채널별 float32 배열 하나씩 (None은 NaN)
+    """
+
+    def __init__(self, model, directory=ARCHIVE_DIR):
+        self.model = model
+        self.fields = channels(model)
+        self.directory = os.path.join(directory, model._meta.model_name)
+
+    def path(self, day):
+        return os.path.join(self.directory, f"{day.isoformat()}.npz")
+
+    def days(self):
+        """ 보관 파일이 있는 날짜 목록 (오름차순) """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(datetime.strptime(name[:-4], "%Y-%m-%d").date() for name in names if name.endswith(".npz"))
+
+    def load(self, day):
+        """ (timestamps µs int64, {채널: float32 배열}) — 파일이 없으면 None """
+        try:
+            with np.load(self.path(day)) as data:
+                return data['timestamps'], {field: data[field] for field in self.fields if field in data}
+        except FileNotFoundError:
+            return None
+
+    def save(self, day, timestamps, columns):
+        """
+        같은 날짜 파일이 이미 있으면 합쳐서 timestamp 순으로 다시 씀 (임시 파일 + os.replace)
+        파일을 쓰고 DB에서 지우기 전에 죽었다가 다시 옮기는 경우를 위해 같은 timestamp는 새 값으로 대체
+        """
+        old = self.load(day)
+        if old is not None:
+            keep = ~np.isin(old[0], timestamps)
+            timestamps = np.concatenate([old[0][keep], timestamps])
+            columns = {
+                f: np.concatenate([old[1].get(f, np.full(len(old[0]), np.nan, np.float32))[keep], columns[f]])
+                for f in self.fields
+            }
+        order = np.argsort(timestamps, kind='stable')
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.path(day)}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, timestamps=timestamps[order],
+                                **{field: columns[field][order].astype(np.float32) for field in self.fields})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path(day))
+        return len(timestamps)
+
+    def query_range(self, start, end, fields=None):
+        """
+        [start, end) 의 보관된 행 (timestamps µs 배열, {채널: float64 배열})
+        live 테이블의 timestamp__gte / __lt 조회와 같은 의미
+        """
+        fields = fields or self.fields
+        lo, hi = to_us([start, end])
+        parts_t, parts = [], {f: [] for f in fields}
+        for day in self.days():
+            if day < start.date() or day > end.date():
+                continue
+            loaded = self.load(day)
+            if loaded is None:
+                continue
+            ts, cols = loaded
+            mask = (ts >= lo) & (ts < hi)
+            if not mask.any():
+                continue
+            parts_t.append(ts[mask])
+            for f in fields:
+                parts[f].append(cols[f][mask].astype(np.float64))
+        if not parts_t:
+            return np.empty(0, np.int64), {f: np.empty(0) for f in fields}
+        return np.concatenate(parts_t), {f: np.concatenate(parts[f]) for f in fields}
+
+    def query_buckets(self, fields, start, end, size):
+        """ downsample.query_buckets 와 같은 모양의 버킷 집계 (정수 초 기준 버킷 번호) """
+        ts, cols = self.query_range(start, end, fields)
+        seconds = ts // US_PER_SEC
+        keys = seconds - to_us([start])[0] // US_PER_SEC
+        keys //= size
+        buckets, inverse = np.unique(keys, return_inverse=True)
+        result = {}
+        for field in fields:
+            values = cols[field]
+            valid = ~np.isnan(values)
+            count = np.zeros(len(buckets))
+            total = np.zeros(len(buckets))
+            low = np.full(len(buckets), np.nan)
+            high = np.full(len(buckets), np.nan)
+            np.add.at(count, inverse, valid)
+            np.add.at(total, inverse, np.where(valid, values, 0.0))
+            np.fmin.at(low, inverse, values)
+            np.fmax.at(high, inverse, values)
+            result[field] = {'count': count, 'sum': total, 'min': low, 'max': high}
+        return buckets.astype(np.int64), result
+
+
+def query_range(model, start, end, fields=None, directory=ARCHIVE_DIR):
+    """
+    live 테이블과 보관 파일을 합친 [start, end) 조회
+    (timestamps datetime 목록, {채널: float64 배열}) — 시간 순
+    """
+    archive = DayArchive(model, directory)
+    fields = fields or archive.fields
+    old_ts, old_cols = archive.query_range(start, end, fields)
+    rows = list(model.objects.filter(timestamp__gte=start, timestamp__lt=end)
+                .order_by('timestamp').values_list('timestamp', *fields).iterator(chunk_size=10000))
+    live_ts = to_us([row[0] for row in rows])
+    live = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(fields))
+
+    timestamps = np.concatenate([old_ts, live_ts])
+    order = np.argsort(timestamps, kind='stable')
+    columns = {f: np.concatenate([old_cols[f], live[:, i]])[order] for i, f in enumerate(fields)}
+    return from_us(timestamps[order]), columns
+
+
+def query_buckets(queryset, fields, start, end, size, directory=ARCHIVE_DIR):
+    """ downsample.query_buckets (live 테이블) + 보관 파일 버킷을 합친 결과 """
+    live = downsample.query_buckets(queryset, fields, start, end, size)
+    archived = DayArchive(queryset.model, directory).query_buckets(fields, start, end, size)
+    return downsample.merge_buckets(live, archived, fields)
+
+
+def archive_day(model, day, archive, chunk_size=10000):
+    """
+    하루치 행을 보관 파일에 쓰고 (fsync 후) DB에서 지움, 옮긴 행 수 반환
+    행을 chunk_size개씩 읽어서 미리 잡아둔 NumPy 배열에 바로 채움 (하루치 튜플 목록을 만들지 않음)
+    """
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    qs = model.objects.filter(timestamp__gte=start, timestamp__lt=end)
+
+    # 읽기 시작할 때의 마지막 id까지만 옮김
+    # 그 뒤에 들어온 행 (스풀 복구 등) 은 id가 더 크므로 세지도 지우지도 않음 (다음 실행 때 합쳐짐)
+    last_id = qs.order_by('-id').values_list('id', flat=True).first()
+    if last_id is None:
+        return 0
+    qs = qs.filter(id__lte=last_id)
+    count = qs.count()
+
+    timestamps = np.empty(count, dtype=np.int64)
+    values = np.empty((count, len(archive.fields)), dtype=np.float32)
+    rows = qs.order_by('timestamp').values_list('timestamp', *archive.fields).iterator(chunk_size=chunk_size)
+    filled = 0
+    while filled < count:
+        chunk = list(islice(rows, min(chunk_size, count - filled)))
+        if not chunk:
+            break
+        n = len(chunk)
+        timestamps[filled:filled + n] = to_us([row[0] for row in chunk])
+        values[filled:filled + n] = np.array([row[1:] for row in chunk], dtype=np.float64).reshape(n, len(archive.fields))
+        filled += n
+    if not filled:
+        return 0
+    columns = {field: values[:filled, i] for i, field in enumerate(archive.fields)}
+    archive.save(day, timestamps[:filled], columns)
+
+    # 파일이 디스크에 남은 뒤에만 지움 (중간에 죽으면 다음 실행 때 같은 날짜 파일에 합쳐짐)
+    with transaction.atomic():
+        deleted, _ = qs.delete()
+    return deleted
+
+
+def archive_older_than(days=RETENTION_DAYS, models=ARCHIVED_MODELS, directory=ARCHIVE_DIR, vacuum=False):
+    """ days일보다 오래된 날짜를 하루씩 보관 파일로 옮김 (오늘 기준 자정 단위) """
+    cutoff = (datetime.now() - timedelta(days=days)).date()
+    for model in models:
+        archive = DayArchive(model, directory)
+        first = model.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if first is None:
+            continue
+        day = first.date()
+        moved = 0
+        while day < cutoff:
+            count = archive_day(model, day, archive)
+            if count:
+                print(f"[Archive] {model._meta.model_name} {day}: {count}행 보관")
+            moved += count
+            day += timedelta(days=1)
+        print(f"[Archive] {model._meta.model_name}: {cutoff} 이전 {moved}행 보관 완료")
+
+    # SQLite는 지운 공간을 재사용하지만 파일 크기를 줄이려면 VACUUM 필요
+    if vacuum and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오래된 RawData / FinalData를 날짜별 압축 파일로 옮기고 DB에서 삭제")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="DB에 남겨둘 일수")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help="보관 파일 폴더")
+    parser.add_argument("--vacuum", action="store_true", help="끝난 뒤 SQLite VACUUM")
+    args = parser.parse_args()
+    archive_older_than(days=args.days, directory=args.dir, vacuum=args.vacuum)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import time
+import queue
+import threading
+from collections import deque
+
+from django.db import connection, transaction, DatabaseError, DataError, IntegrityError, InterfaceError, OperationalError
+
+
+class BatchWriter:
+    """
+    모델 인스턴스를 모아 두었다가 한 트랜잭션 안에서 bulk_create로 저장하는 쓰기 스레드
+
+    - max_rows 개가 모이거나 첫 행이 들어온 지 max_delay 초가 지나면 flush
+    - DB 연결은 쓰기 스레드가 계속 열어두고, flush 전에 is_usable()로 상태 확인 후 필요하면 재연결
+    - DB 오류 시 버퍼를 유지한 채 backoff 후 재시도, max_buffer를 넘으면 가장 오래된 행부터 버림
+      spool이 있으면 재시도 대신 스풀 파일에 바로 옮겨 적음 (SpoolReplayer가 나중에 DB로 복구)
+    - 제약 위반 (IntegrityError / DataError) 은 다시 해도 실패하므로 스풀하지 않고 한 행씩 다시 저장해서 문제 행만 버림
+    - stop() 은 남은 행을 모두 flush 한 뒤 종료
+    """
+
+    def __init__(self, model, max_rows=100, max_delay=1.0, max_buffer=100000, max_backoff=30.0, name="Writer",
+                 spool=None):
+        self.model = model
+        self.spool = spool
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.max_buffer = max_buffer
+        self.max_backoff = max_backoff
+        self.name = name
+
+        self.queue = queue.Queue()
+        self.buffer = deque()
+        self.thread = None
+        self.running = False
+        self.on_flush = []  # flush 성공 후 호출할 콜백 (저장된 행 리스트를 받음)
+
+        # 통계
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.dropped = 0
+        self.spooled = 0
+        self.reconnects = 0
+        self.last_flush_time = None
+
+        # 장애 중에는 DB를 다시 시도하지 않고 바로 스풀에 기록 (monotonic 시각)
+        self.outage_until = None
+        self.outage_backoff = 1.0
+
+    def put(self, row):
+        self.queue.put(row)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10.0):
+        """ 쓰기 스레드를 멈추고 남은 행을 모두 저장 """
+        if not self.running:
+            return
+        self.running = False
+        self.queue.put(None)
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+
+    def _collect(self, item):
+        self.buffer.append(item)
+        overflow = len(self.buffer) - self.max_buffer
+        for _ in range(max(0, overflow)):
+            self.buffer.popleft()
+            self.dropped += 1
+
+    def _ensure_connection(self):
+        """ 끊기거나 망가진 연결은 닫아서 다음 쿼리 때 새로 연결되게 함 """
+        if connection.connection is not None and not connection.is_usable():
+            print(f"[{self.name}] DB 연결 재설정")
+            connection.close()
+            self.reconnects += 1
+
+    def flush(self):
+        """ 버퍼 전체를 한 트랜잭션으로 저장, 성공하면 True """
+        if not self.buffer:
+            return True
+        rows = list(self.buffer)
+        buffered = len(rows)
+        started = time.monotonic()
+        if self.spool is not None and self.outage_until is not None and started < self.outage_until:
+            self._spool(rows)
+            return True
+        try:
+            self._ensure_connection()
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create(rows, batch_size=500)
+            except (IntegrityError, DataError) as e:
+                self.errors += 1
+                print(f"[{self.name}] 제약 위반 ({len(rows)}행 중 문제 행만 버림): {e}")
+                rows = self._save_each(rows)
+        except (OperationalError, InterfaceError) as e:
+            self.errors += 1
+            connection.close()
+            if self.spool is None:
+                print(f"[{self.name}] 저장 실패 ({len(rows)}행 보류): {e}")
+                return False
+            print(f"[{self.name}] 저장 실패 ({len(rows)}행 스풀에 기록, {self.outage_backoff:.0f}초간 스풀만 사용): {e}")
+            self.outage_until = time.monotonic() + self.outage_backoff
+            self.outage_backoff = min(self.outage_backoff * 2, self.max_backoff)
+            self._spool(rows)
+            return True
+        except DatabaseError as e:
+            # 연결 문제도 제약 위반도 아닌 오류 (테이블 없음 등): 스풀하지 않고 버퍼에 둔 채 재시도
+            self.errors += 1
+            print(f"[{self.name}] 저장 실패 ({len(rows)}행 보류): {e}")
+            return False
+
+        self.outage_until = None
+        self.outage_backoff = 1.0
+        for _ in range(buffered):
+            self.buffer.popleft()
+        self.written += len(rows)
+        self.flushes += 1
+        self.last_flush_time = time.monotonic() - started
+        for callback in self.on_flush:
+            try:
+                callback(rows)
+            except Exception as e:
+                print(f"[{self.name}] flush 콜백 오류: {e}")
+        return True
+
+    def _save_each(self, rows):
+        """ 한 행씩 (각자 savepoint) 저장하고 저장된 행 리스트를 반환, 실패한 행은 로그 후 버림 """
+        saved = []
+        with transaction.atomic():
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        row.save(force_insert=True)
+                except (IntegrityError, DataError) as e:
+                    self.dropped += 1
+                    print(f"[{self.name}] 행 버림 ({getattr(row, 'timestamp', None)}): {e}")
+                    continue
+                saved.append(row)
+        return saved
+
+    def _spool(self, rows):
+        self.spool.append(rows)
+        self.buffer.clear()
+        self.spooled += len(rows)
+
+    def run(self):
+        first_at = None   # 버퍼에 첫 행이 들어온 시각
+        retry_at = None   # 저장 실패 후 재시도 시각
+        backoff = 1.0
+
+        while True:
+            now = time.monotonic()
+            deadline = retry_at if retry_at is not None else (first_at + self.max_delay if first_at is not None else None)
+            wait = None if deadline is None else max(0.0, deadline - now)
+
+            try:
+                item = self.queue.get(timeout=wait)
+            except queue.Empty:
+                item = False
+
+            stopping = item is None
+            if item:
+                self._collect(item)
+                if first_at is None:
+                    first_at = time.monotonic()
+                # 한꺼번에 들어온 행은 같이 처리
+                while len(self.buffer) < self.max_rows:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    self._collect(item)
+
+            now = time.monotonic()
+            due = first_at is not None and (len(self.buffer) >= self.max_rows or now - first_at >= self.max_delay)
+            if retry_at is not None and now < retry_at and not stopping:
+                continue
+
+            if stopping or due or retry_at is not None:
+                if self.flush():
+                    first_at = None
+                    retry_at = None
+                    backoff = 1.0
+                elif not stopping:
+                    retry_at = time.monotonic() + backoff
+                    backoff = min(backoff * 2, self.max_backoff)
+
+            if stopping:
+                if self.buffer:
+                    print(f"[{self.name}] 종료: 저장하지 못한 {len(self.buffer)}행")
+                if self.spool is not None:
+                    self.spool.close()
+                connection.close()
+                break
@@ -0,0 +1,136 @@
+import os
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from django.db import transaction
+from django.db.models import F
+
+from omnitor.models import CalibrationSettings
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+# 보정 설정이 바뀔 때마다 새 버전을 적는 파일 — 프로세스들은 이 파일의 stat만 보고 다시 읽을지 판단
+VERSION_PATH = os.environ.get("OMNITOR_CALIBRATION_VERSION_PATH", os.path.join(root_dir, "var", "calibration.version"))
+
+PREFIXES = ('weight', 'ph', 'ec')
+
+
+@dataclass(frozen=True)
+class CalibrationCoefficients:
+    """ 보정 계수 스냅샷 (CalibrationSettings와 같은 속성 이름이라 calc_final_data에 그대로 넘길 수 있음) """
+    version: int = 0
+    weight_slope: float = 0.0
+    weight_intercept: float = 0.0
+    ph_slope: float = 0.0
+    ph_intercept: float = 0.0
+    ec_slope: float = 0.0
+    ec_intercept: float = 0.0
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            version=settings.version,
+            **{f"{prefix}_{name}": getattr(settings, f"{prefix}_{name}")
+               for prefix in PREFIXES for name in ('slope', 'intercept')}
+        )
+
+
+def _marker_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _write_marker(version, path=VERSION_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(str(version))
+    os.replace(tmp, path)
+
+
+class CalibrationCache:
+    """
+    프로세스마다 하나씩 두는 보정 계수 캐시
+
+    - get()은 버전 파일을 stat 한 번 해보고 바뀌지 않았으면 메모리의 계수를 그대로 반환 (쿼리 없음)
+    - 보정 값을 저장하면 (save_calibration) DB의 version이 1 오르고 커밋 후 버전 파일이 갱신되므로
+      웹 워커와 수집 프로세스 모두 다음 get()에서 정확히 한 번 다시 읽음
+    - 버전 파일을 거치지 않은 변경 (관리자 화면 등) 대비로 verify_every초마다 version 값만 조회
+    """
+
+    def __init__(self, path=VERSION_PATH, verify_every=60.0):
+        self.path = path
+        self.verify_every = verify_every
+        self.lock = Lock()
+        self.coefficients = None
+        self.stamp = None
+        self.verified_at = None
+        self.loads = 0
+
+    def is_stale(self):
+        """ 다시 읽어야 하면 True (stat 한 번, 쿼리 없음) """
+        if self.coefficients is None or _marker_stamp(self.path) != self.stamp:
+            return True
+        return self.verify_every is not None and time.monotonic() - self.verified_at >= self.verify_every
+
+    def get(self):
+        if not self.is_stale():
+            return self.coefficients
+        with self.lock:
+            stamp = _marker_stamp(self.path)
+            if self.coefficients is not None and stamp == self.stamp:
+                # 버전 파일은 그대로, 주기적 확인만 필요한 경우
+                version = CalibrationSettings.objects.filter(id=1).values_list('version', flat=True).first()
+                self.verified_at = time.monotonic()
+                if version == self.coefficients.version:
+                    return self.coefficients
+            self._load(stamp)
+            return self.coefficients
+
+    def _load(self, stamp):
+        settings, _ = CalibrationSettings.objects.get_or_create(id=1)
+        self.coefficients = CalibrationCoefficients.from_settings(settings)
+        self.stamp = stamp
+        self.verified_at = time.monotonic()
+        self.loads += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.coefficients = None
+
+
+class CalibrationCacheSingleton:
+    _instance = None
+    _lock = Lock()
+
+    @classmethod
+    def instance(cls) -> CalibrationCache:
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = CalibrationCache()
+            return cls._instance
+
+
+def get_coefficients():
+    """ 현재 프로세스의 보정 계수 (바뀌지 않았으면 쿼리 없음) """
+    return CalibrationCacheSingleton.instance().get()
+
+
+def save_calibration(**fields):
+    """
+    보정 설정 (id=1) 을 한 번의 UPDATE로 저장하고 version을 올림
+    커밋된 뒤 버전 파일을 갱신해서 다른 프로세스의 캐시가 다시 읽도록 함, 새 version 반환
+    """
+    with transaction.atomic():
+        CalibrationSettings.objects.get_or_create(id=1)
+        CalibrationSettings.objects.filter(id=1).update(version=F('version') + 1, **fields)
+        version = CalibrationSettings.objects.values_list('version', flat=True).get(id=1)
+        transaction.on_commit(lambda: _write_marker(version))
+    return version
@@ -0,0 +1,68 @@
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+from devices.arduino import (
+    SerialSingleton,
+    CMD_CAMERA_UNLOCK,
+    CMD_CAMERA_LOCK,
+    CMD_ROTATE_LEFT,
+    CMD_ROTATE_RIGHT,
+)
+from devices.camera import capture_image, save_path
+
+# 스테퍼 90도 회전: 600스텝 * 20ms + 1초 대기 ≈ 13초
+ROTATE_TIMEOUT = 20.0
+LOCK_TIMEOUT = 3.0
+
+
+# ACK 타임아웃 / 재전송으로 끝나야 할 시간보다 이만큼 더 기다려도 결과가 없으면 포기
+RESULT_MARGIN = 5.0
+
+
+def run_script(arduino, script):
+    """ 모션 스크립트를 한 번에 보내고 마지막 명령의 ACK까지 기다림 (실패 시 예외) """
+    if not arduino.running:
+        # start() 가 연결에 실패했으면 write 스레드가 없어서 타임아웃 처리도 되지 않음
+        raise RuntimeError("Arduino 연결이 없음")
+    futures = arduino.command_batch(script)
+    # 명령마다 (재전송 포함) 최대 timeout * (retries + 1)
+    limit = sum(
+        timeout * ((arduino.command_retries if retries is None else retries) + 1)
+        for _, timeout, retries in script
+    )
+    futures[-1].result(timeout=limit + RESULT_MARGIN)
+
+
+def capture_journal_image(save_dir=save_path):
+    """
+    중앙(C) -> 왼쪽(L) -> 오른쪽(R) 사진을 찍고 카메라를 중앙에 고정
+    고정 sleep 대신 아두이노 ACK가 올 때까지만 기다림
+    """
+    arduino = SerialSingleton.instance()
+    rotate_left = (CMD_ROTATE_LEFT, ROTATE_TIMEOUT, None)
+    rotate_right = (CMD_ROTATE_RIGHT, ROTATE_TIMEOUT, None)
+
+    capture_image(save_dir, "_C")
+    try:
+        run_script(arduino, [(CMD_CAMERA_UNLOCK, LOCK_TIMEOUT, None), rotate_left])
+        capture_image(save_dir, "_L")
+
+        run_script(arduino, [rotate_right, rotate_right])
+        capture_image(save_dir, "_R")
+
+        run_script(arduino, [rotate_left, (CMD_CAMERA_LOCK, LOCK_TIMEOUT, None)])
+        return True
+    except Exception as e:
+        print(f"[Capture] 회전 시퀀스 실패: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    SerialSingleton.instance().start()
+    capture_journal_image()
+    SerialSingleton.instance().stop()
@@ -0,0 +1,96 @@
+import json
+import struct
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# 브라우저가 Accept 에 이 타입을 넣으면 (또는 format=columns) JSON 대신 이 형식으로 응답
+CONTENT_TYPE = "application/vnd.omnitor.columns"
+
+# 응답 = 표 하나 이상을 이어 붙인 것 (export는 chunk마다, lttb는 채널마다 표 하나)
+# 표 하나 (모두 little-endian, 각 부분이 4바이트 경계에서 시작하므로 브라우저가 복사 없이 typed array로 감쌀 수 있음)
+#   HEADER (28 바이트): magic, version, flags, 채널 수, 행 수, 기준 시각 (ms), 시각 단위 (ms), meta 길이
+#   meta: UTF-8 JSON {"channels": [...], ...} (공백으로 4바이트 배수까지 채움)
+#   timestamps: int32[행 수] — 이전 행과의 차이 (unit 단위), 첫 값은 기준 시각과의 차이
+#   채널마다 float32[행 수] (값 없음은 NaN)
+# 시각은 naive 로컬 시각을 UTC인 것처럼 1970-01-01 부터 센 ms (JSON 응답의 isoformat 과 같은 값)
+#
+# 브라우저 쪽:
+#   const deltas = new Int32Array(buf, off + 28 + metaLen, rows)   // 누적합 * unit + base
+#   const values = new Float32Array(buf, off + 28 + metaLen + 4 * rows * (1 + i), rows)
+MAGIC = b"OMTS"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIqII")
+
+EPOCH = datetime(1970, 1, 1)
+INT32_MAX = 2 ** 31 - 1
+
+
+def to_ms(timestamps):
+    return np.array([(ts - EPOCH) // timedelta(milliseconds=1) for ts in timestamps], dtype=np.int64)
+
+
+def _table(ms, columns, meta, unit):
+    base = int(ms[0]) if len(ms) else 0
+    deltas = np.diff((ms - base) // unit, prepend=0)
+
+    body = dict(meta or {})
+    body['channels'] = list(columns)
+    meta_bytes = json.dumps(body, ensure_ascii=False).encode()
+    meta_bytes += b" " * (-len(meta_bytes) % 4)
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, 0, len(columns), len(ms), base, unit, len(meta_bytes)),
+        meta_bytes,
+        deltas.astype("<i4").tobytes(),
+    ]
+    for values in columns.values():
+        parts.append(values.astype("<f4").tobytes())
+    return b"".join(parts)
+
+
+def encode_table(ms, columns, meta=None, unit=1):
+    """
+    ms: 시각 (int64 ms 배열), columns: {채널: 값 배열} (순서 유지) -> 표 바이트
+    unit: 시각 차이의 단위 (ms) — 버킷처럼 간격이 일정하면 버킷 크기를 주면 차이가 작은 정수가 됨
+    기록이 비어서 차이가 int32를 넘는 곳 (ms 단위로 약 24일) 에서는 표를 나눔
+    """
+    ms = np.asarray(ms, dtype=np.int64)
+    columns = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+    gaps = np.flatnonzero(np.diff(ms) // unit > INT32_MAX) + 1
+    bounds = [0, *gaps.tolist(), len(ms)]
+    return b"".join(
+        _table(ms[lo:hi], {name: values[lo:hi] for name, values in columns.items()}, meta, unit)
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    )
+
+
+def decode(data):
+    """ encode_table 로 만든 표들을 [(ms int64 배열, {채널: float32 배열}, meta)] 로 (벤치마크 / 확인용) """
+    tables = []
+    offset = 0
+    view = memoryview(data)
+    while offset < len(data):
+        magic, version, _, n, rows, base, unit, meta_len = HEADER.unpack_from(view, offset)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not an omnitor columns payload")
+        offset += HEADER.size
+        meta = json.loads(bytes(view[offset:offset + meta_len]))
+        offset += meta_len
+        deltas = np.frombuffer(view, dtype="<i4", count=rows, offset=offset)
+        offset += 4 * rows
+        ms = base + np.cumsum(deltas, dtype=np.int64) * unit
+        columns = {}
+        for name in meta['channels'][:n]:
+            columns[name] = np.frombuffer(view, dtype="<f4", count=rows, offset=offset)
+            offset += 4 * rows
+        tables.append((ms, columns, meta))
+    return tables
+
+
+def wants_columns(request):
+    """ format=columns 이거나 Accept 에 CONTENT_TYPE 이 있으면 True (없으면 JSON) """
+    fmt = request.GET.get('format')
+    if fmt:
+        return fmt == 'columns'
+    return CONTENT_TYPE in request.headers.get('Accept', '')
@@ -0,0 +1,34 @@
+import os
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+# 이미 저장된 기간의 FinalData를 다시 쓸 때마다 (재계산, 스풀 복구) 새 값을 적는 파일
+# 기간 조회 응답의 ETag에 들어가서, 다시 쓴 뒤에는 끝난 기간의 응답도 새로 만들어짐
+REVISION_PATH = os.environ.get("OMNITOR_DATA_REVISION_PATH", os.path.join(root_dir, "var", "data.revision"))
+
+
+def current(path=REVISION_PATH):
+    """ 현재 revision 문자열 (한 번도 다시 쓴 적이 없으면 None) """
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def bump(path=REVISION_PATH):
+    """
+    새 revision을 적음 (데이터를 다시 쓴 트랜잭션이 커밋된 뒤 호출)
+    여러 프로세스가 동시에 올려도 값이 겹치지 않도록 +1 대신 시각 (ns) + pid
+    """
+    revision = f"{time.time_ns()}-{os.getpid()}"
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(revision)
+    os.replace(tmp, path)
+    return revision
@@ -0,0 +1,144 @@
+import math
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.expressions import RawSQL
+
+# 응답 한 번에 돌려줄 최대 점 수 (요청한 기간과 상관없이 응답 크기 / 처리 시간 상한)
+MAX_POINTS = 5000
+
+# LTTB는 DB에서 목표 점 수의 이 배수만큼 버킷 평균을 뽑은 뒤 그 위에서 고름
+LTTB_OVERSAMPLE = 8
+
+
+# 버킷 크기 후보 (초) — 그래프 눈금과 맞고, 분/시간/일 롤업으로 나누어 떨어지도록
+NICE_BUCKETS = [
+    1, 2, 5, 10, 15, 30,
+    60, 120, 300, 600, 900, 1800,
+    3600, 7200, 10800, 21600, 43200,
+    86400, 2 * 86400, 7 * 86400, 14 * 86400, 30 * 86400,
+]
+
+
+def bucket_seconds(start, end, points):
+    """ start ~ end 를 points개 이하로 나누는 가장 작은 NICE_BUCKETS 크기 (초) """
+    span = (end - start).total_seconds()
+    needed = max(1, math.ceil(span / max(1, points)))
+    for size in NICE_BUCKETS:
+        if size >= needed:
+            return size
+    return math.ceil(needed / NICE_BUCKETS[-1]) * NICE_BUCKETS[-1]
+
+
+def _bucket_sql(column, vendor):
+    """ timestamp 컬럼을 start 기준 버킷 번호로 바꾸는 SQL (파라미터: start, 버킷 크기) """
+    if vendor == 'sqlite':
+        # 정수 초끼리 정수 나눗셈 (julianday 실수 연산은 경계 시각이 앞 버킷으로 떨어질 수 있음)
+        return f"(CAST(strftime('%%s', {column}) AS INTEGER) - CAST(strftime('%%s', %s) AS INTEGER)) / %s"
+    if vendor == 'postgresql':
+        return f"FLOOR(EXTRACT(EPOCH FROM ({column} - %s)) / %s)::bigint"
+    if vendor == 'mysql':
+        return f"FLOOR(TIMESTAMPDIFF(MICROSECOND, %s, {column}) / 1000000 / %s)"
+    raise NotImplementedError(f"버킷 집계를 지원하지 않는 DB: {vendor}")
+
+
+def query_buckets(queryset, fields, start, end, size, rollup=False):
+    """
+    [start, end) 구간을 size초 버킷으로 나눠 DB에서 GROUP BY 로 집계
+    rollup=True 면 queryset은 롤업 모델 (FinalDataMinute 등) 이고 <필드>_count/_sum/_min/_max 를 다시 합침
+
+    반환: (버킷 번호 배열, {필드: {'count', 'sum', 'min', 'max': 배열}}) — 값이 없는 버킷은 빠짐
+    count/sum 을 그대로 돌려주므로 롤업 테이블 등 다른 출처의 버킷과 합칠 수 있음
+    """
+    column = connection.ops.quote_name(queryset.model._meta.get_field('timestamp').column)
+    bucket = RawSQL(_bucket_sql(column, connection.vendor), (connection.ops.adapt_datetimefield_value(start), size))
+
+    aggregates = {}
+    for i, field in enumerate(fields):
+        # 모델 필드 이름과 겹치지 않는 별칭
+        if rollup:
+            aggregates[f'agg{i}_count'] = Sum(f'{field}_count')
+            aggregates[f'agg{i}_sum'] = Sum(f'{field}_sum')
+            aggregates[f'agg{i}_min'] = Min(f'{field}_min')
+            aggregates[f'agg{i}_max'] = Max(f'{field}_max')
+        else:
+            aggregates[f'agg{i}_count'] = Count(field)
+            aggregates[f'agg{i}_sum'] = Sum(field)
+            aggregates[f'agg{i}_min'] = Min(field)
+            aggregates[f'agg{i}_max'] = Max(field)
+
+    rows = list(
+        queryset.filter(timestamp__gte=start, timestamp__lt=end)
+        .annotate(bucket=bucket).values('bucket').annotate(**aggregates).order_by('bucket')
+        .values_list('bucket', *aggregates.keys())
+    )
+
+    buckets = np.array([row[0] for row in rows], dtype=np.int64)
+    columns = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(aggregates))
+    result = {}
+    for i, field in enumerate(fields):
+        result[field] = {
+            'count': columns[:, 4 * i],
+            'sum': columns[:, 4 * i + 1],
+            'min': columns[:, 4 * i + 2],
+            'max': columns[:, 4 * i + 3],
+        }
+    return buckets, result
+
+
+def merge_buckets(a, b, fields):
+    """ 같은 start / 버킷 크기로 만든 두 query_buckets 결과를 합침 (live 테이블 + 보관 파일 등) """
+    if not len(b[0]):
+        return a
+    if not len(a[0]):
+        return b
+    buckets, inverse = np.unique(np.concatenate([a[0], b[0]]), return_inverse=True)
+    result = {}
+    for field in fields:
+        merged = {}
+        for kind, init, ufunc in (('count', 0.0, np.add), ('sum', 0.0, np.add), ('min', np.nan, np.fmin), ('max', np.nan, np.fmax)):
+            values = np.concatenate([a[1][field][kind], b[1][field][kind]])
+            if kind == 'sum':
+                values = np.nan_to_num(values)  # 값이 없는 버킷의 SUM은 NULL
+            merged[kind] = np.full(len(buckets), init)
+            ufunc.at(merged[kind], inverse, values)
+        result[field] = merged
+    return buckets, result
+
+
+def bucket_times(start, size, buckets):
+    """ 버킷 번호 -> 버킷 시작 시각 목록 """
+    return [start + timedelta(seconds=int(b) * size) for b in buckets]
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링, 선택한 점의 인덱스 배열을 반환
+    x는 오름차순, NaN 점은 미리 빼고 넘길 것
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # 처음/마지막 점을 뺀 나머지를 threshold-2개 구간으로
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 구간의 평균점 (마지막 구간이면 마지막 점)
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        # 직전 선택점 a, 후보 점, 다음 구간 평균점이 만드는 삼각형 넓이가 가장 큰 점
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
@@ -0,0 +1,156 @@
+import io
+import os
+import sys
+import csv
+import json
+import zlib
+import argparse
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
+    django.setup()
+
+from omnitor.models import RawData, FinalData
+from services.archive import DayArchive, channels, from_us, to_us
+from services import columnar
+
+MODELS = {
+    'raw': RawData,
+    'final': FinalData,
+}
+
+CHUNK_SIZE = 2000
+
+
+def iter_chunks(model, start, end, fields=None, chunk_size=CHUNK_SIZE):
+    """
+    [start, end) 의 행을 시간 순으로 chunk_size개씩 [(timestamp, 값...), ...] 로 돌려주는 제너레이터
+    보관 파일로 옮긴 날짜는 파일에서, 나머지는 DB에서 .iterator(chunk_size) 로 읽으므로
+    기간이 길어도 메모리에는 chunk 하나만 있음
+    """
+    fields = fields or channels(model)
+
+    # 1. 보관 파일 (하루씩)
+    archive = DayArchive(model)
+    lo, hi = to_us([start, end])
+    for day in archive.days():
+        if day < start.date() or day > end.date():
+            continue
+        ts, cols = archive.load(day)
+        mask = (ts >= lo) & (ts < hi)
+        ts = ts[mask]
+        cols = {f: cols[f][mask] for f in fields}
+        for i in range(0, len(ts), chunk_size):
+            times = from_us(ts[i:i + chunk_size])
+            # float32 값은 유효 숫자 7자리로 (20.12345695495605 대신 20.12346)
+            values = [[None if v != v else float(f"{v:.7g}") for v in cols[f][i:i + chunk_size].tolist()] for f in fields]
+            yield list(zip(times, *values))
+
+    # 2. live 테이블
+    rows = (model.objects.filter(timestamp__gte=start, timestamp__lt=end)
+            .order_by('timestamp').values_list('timestamp', *fields).iterator(chunk_size=chunk_size))
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def csv_stream(chunks, fields):
+    """ 헤더 + chunk마다 CSV 문자열 하나 """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['timestamp'] + list(fields))
+    yield buffer.getvalue()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((ts.isoformat(sep=' '), *row) for ts, *row in chunk)
+        yield buffer.getvalue()
+
+
+def ndjson_stream(chunks, fields):
+    """ 한 줄에 JSON 객체 하나 (chunk마다 문자열 하나) """
+    keys = ['timestamp'] + list(fields)
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(dict(zip(keys, (row[0].isoformat(), *row[1:]))), ensure_ascii=False) + "\n"
+            for row in chunk
+        )
+
+
+def columns_stream(chunks, fields):
+    """ chunk마다 바이너리 컬럼 표 하나 (services/columnar.py, 받은 쪽은 표들을 이어서 읽음) """
+    for chunk in chunks:
+        timestamps, *values = zip(*chunk)
+        yield columnar.encode_table(columnar.to_ms(timestamps), dict(zip(fields, values)))
+
+
+FORMATS = {
+    'csv': (csv_stream, 'text/csv'),
+    'ndjson': (ndjson_stream, 'application/x-ndjson'),
+    'columns': (columns_stream, columnar.CONTENT_TYPE),
+}
+
+
+def _bytes(part):
+    return part.encode() if isinstance(part, str) else part
+
+
+def gzip_stream(parts, level=6):
+    """ 문자열 / 바이트 조각들을 gzip 바이트 조각들로 (스트리밍, 전체를 메모리에 모으지 않음) """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip 헤더
+    for part in parts:
+        data = compressor.compress(_bytes(part))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(model, start, end, fields=None, fmt='csv', compress=False, chunk_size=CHUNK_SIZE):
+    """ 내보내기 바이트 조각 제너레이터 (HTTP 응답과 명령행이 같이 씀) """
+    fields = fields or channels(model)
+    stream, _ = FORMATS[fmt]
+    parts = stream(iter_chunks(model, start, end, fields, chunk_size), fields)
+    if compress:
+        return gzip_stream(parts)
+    return (_bytes(part) for part in parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="센서 기록을 CSV / NDJSON / 바이너리 컬럼으로 내보내기")
+    parser.add_argument("--model", choices=sorted(MODELS), default='final')
+    parser.add_argument("--start", required=True, help="시작 (YYYY-MM-DD[THH:MM:SS], 포함)")
+    parser.add_argument("--end", help="끝 (YYYY-MM-DD[THH:MM:SS], 제외, 기본: 지금)")
+    parser.add_argument("--fields", help="쉼표로 구분한 채널 (기본: 전부)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default='csv')
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", "-o", help="저장할 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    model = MODELS[args.model]
+    start = datetime.fromisoformat(args.start)
+    end = datetime.fromisoformat(args.end) if args.end else datetime.now()
+    fields = args.fields.split(',') if args.fields else None
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for part in export(model, start, end, fields, args.format, args.gzip):
+            out.write(part)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,13 @@
 
 window_size = 5
 
+import json
+import time
 from collections import deque
+from datetime import datetime
+from threading import Lock
+
+import numpy as np
 
 from omnitor.models import RawData
 
@@ -11,8 +17,8 @@ data = [
     'co2',
     'insolation',
     'weight_raw',
-    'ph_voltage',
-    'ec_voltage',
+    'ph_raw',
+    'ec_raw',
     'water_temperature',
     'tip_count',
     'soil_temperature',
@@ -21,43 +27,177 @@ data = [
     'soil_ph'
 ]
 
-def moving_avg_filter(window_size=5):
+class MovingAverageState:
     """
-    호출되는 순간 DB에서 최신 window_size개를 가져와 평균을 계산하여 반환
+    채널별 deque + 누적합으로 유지하는 이동 평균 상태 (샘플당 O(채널 수), 조회는 O(1))
+
+    - 수집 경로가 update()로 샘플을 넣을 때마다 갱신, DB를 다시 읽지 않음
+    - None은 창에 넣지 않으므로 채널마다 최근 window_size개의 "유효한" 값으로 평균을 냄
+      (주기가 다른 센서가 한 행에 섞여도 토양 값이 None으로 희석되지 않음)
+    - 마지막 유효 값이 max_age초보다 오래된 채널은 None (센서가 죽었는데 옛 평균이 남지 않도록)
+    - 시작할 때만 seed_from_db()로 최근 행을 읽어서 채움
     """
-    # DB에서 가장 최신 데이터 N개를 가져옴
-    latest_records = list(RawData.objects.all().order_by('-created_at').values(*data)[:window_size])
 
-    # 데이터가 하나도 없으면 빈 딕셔너리 반환
-    if not latest_records:
-        return {key: None for key in data}
+    # 누적합의 부동소수점 오차가 쌓이지 않도록 가끔 창 전체로 다시 계산
+    RESUM_EVERY = 1000
+
+    def __init__(self, window_size=window_size, keys=data, max_age=30.0):
+        self.window_size = window_size
+        self.keys = list(keys)
+        self.max_age = max_age
+        self.windows = {key: deque() for key in self.keys}
+        self.sums = {key: 0.0 for key in self.keys}
+        self.last_seen = {key: None for key in self.keys}
+        self.averages = {key: None for key in self.keys}
+        self.updates = 0
+
+    def update(self, record, timestamp=None):
+        """ record: dict 또는 모델 인스턴스, timestamp: epoch 초 (기본 현재 시각) """
+        if timestamp is None:
+            timestamp = time.time()
+        get = record.get if isinstance(record, dict) else lambda key: getattr(record, key, None)
+
+        for key in self.keys:
+            value = get(key)
+            if value is None:
+                continue
+            window = self.windows[key]
+            window.append(value)
+            self.sums[key] += value
+            if len(window) > self.window_size:
+                self.sums[key] -= window.popleft()
+            self.averages[key] = self.sums[key] / len(window)
+            self.last_seen[key] = timestamp
+
+        self.updates += 1
+        if self.updates % self.RESUM_EVERY == 0:
+            for key, window in self.windows.items():
+                self.sums[key] = float(sum(window))
+
+    def current(self, now=None):
+        """ 채널별 현재 이동 평균 {key: value or None} """
+        if self.max_age is None:
+            return dict(self.averages)
+        if now is None:
+            now = time.time()
+        result = {}
+        for key in self.keys:
+            seen = self.last_seen[key]
+            result[key] = self.averages[key] if seen is not None and now - seen <= self.max_age else None
+        return result
+
+    def process_batch(self, values, timestamps):
+        """
+        행마다 update(record, timestamp) 후 current(now=timestamp) 를 한 것과 같은 결과를 배열 연산으로 (재계산용)
+        values: (샘플 수, 채널 수) 배열 (열 순서 = keys, None은 NaN), timestamps: epoch 초 배열
+        -> (샘플 수, 채널 수) 이동 평균 (None은 NaN), 끝나면 상태도 마지막 행까지 넣은 것과 같음
+        """
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        out = np.full(values.shape, np.nan)
+        for j, key in enumerate(self.keys):
+            valid = ~np.isnan(values[:, j])
+            fresh = values[valid, j]
+            window = self.windows[key]
+
+            # 이전 창 + 새 유효 값의 누적합으로 행마다 최근 window_size개 유효 값의 평균
+            sums = np.concatenate([[0.0], np.cumsum(np.concatenate([np.array(window, dtype=np.float64), fresh]))])
+            seen_count = np.cumsum(valid)
+            count = len(window) + seen_count
+            low = np.maximum(count - self.window_size, 0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                averages = (sums[count] - sums[low]) / (count - low)
+
+            # 행마다 마지막 유효 값의 시각 (없으면 NaN -> 결과도 NaN)
+            last_seen = np.nan if self.last_seen[key] is None else self.last_seen[key]
+            seen = np.concatenate([[last_seen], timestamps[valid]])[seen_count]
+            if self.max_age is None:
+                out[:, j] = averages
+            else:
+                with np.errstate(invalid='ignore'):
+                    out[:, j] = np.where(timestamps - seen <= self.max_age, averages, np.nan)
 
-    filtered_result = {}
+            if len(fresh):
+                window.extend(fresh[-self.window_size:].tolist())
+                while len(window) > self.window_size:
+                    window.popleft()
+                self.sums[key] = float(sum(window))
+                self.averages[key] = self.sums[key] / len(window)
+                self.last_seen[key] = float(timestamps[valid][-1])
 
-    # 각 센서 항목별로 평균 계산
-    for key in data:
-        # None이 아닌 값들만 필터링
-        valid_values = [
-            record[key] for record in latest_records 
-            if record.get(key) is not None
-        ]
+        self.updates += len(values)
+        return out
+
+    def seed(self, records):
+        """ 오래된 것부터 정렬된 (timestamp epoch, record) 목록으로 상태를 채움 """
+        for timestamp, record in records:
+            self.update(record, timestamp)
+
+    def seed_from_db(self, rows=None):
+        """ DB의 최근 rows개(기본 window_size * 20) 행으로 시작 상태를 채움 """
+        rows = rows or self.window_size * 20
+        latest = list(RawData.objects.order_by('-timestamp').values('timestamp', *self.keys)[:rows])
+        latest.reverse()
+        self.seed((record.pop('timestamp').timestamp(), record) for record in latest)
+
+
+class FilterStateSingleton:
+    _instance = None
+    _lock = Lock()
+
+    @classmethod
+    def instance(cls) -> MovingAverageState:
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = MovingAverageState()
+                try:
+                    cls._instance.seed_from_db()
+                except Exception as e:
+                    print(f"[Filter] 초기 상태 로드 실패: {e}")
+            return cls._instance
+
+
+def moving_avg_filter(timeout=2.0):
+    """
+    웹 워커 (보정 화면 등) 용 현재 이동 평균 {key: value or None}
+    이동 평균 상태는 수집 파이프라인 프로세스에만 있으므로 여기서 따로 만들지 않음
+    - 라이브 피드 (services/live_feed.py) 의 최신 스냅샷에 실린 'filtered' 값을 그대로 씀
+      (기다리지 않음, 연결 직후 아직 스냅샷을 받지 못했을 때만 timeout초까지 기다림)
+    - 파이프라인이 돌고 있지 않거나 스냅샷이 max_age보다 오래됐으면 DB의 최근 RawData로
+      같은 MovingAverageState 규칙 (채널별 최근 유효 값) 으로 계산
+    """
+    from services.live_feed import LiveFeedClientSingleton
 
-        if valid_values:
-            # 평균 계산
-            filtered_result[key] = sum(valid_values) / len(valid_values)
-        else:
-            # 유효한 값이 없으면 None
-            filtered_result[key] = None
+    state = MovingAverageState()
+    latest = LiveFeedClientSingleton.instance().peek(timeout=timeout)
+    if latest is not None:
+        snapshot = json.loads(latest)
+        filtered = snapshot.get('filtered')
+        taken = snapshot.get('timestamp')
+        if filtered is not None and taken and time.time() - datetime.fromisoformat(taken).timestamp() <= state.max_age:
+            return {key: filtered.get(key) for key in state.keys}
 
-    return filtered_result
+    state.seed_from_db()
+    return state.current()
 
 
-def high_pass_filter():
+def high_pass_filter(values, thresholds):
     """
     min threshold 이상인 값만 통과시키는 필터
+    values: {key: value}, thresholds: {key: min} — 기준 미만이면 None
+    여러 샘플을 한꺼번에 거를 때는 services.filter_bank.FilterBank 의 threshold 단계를 사용
     """
+    return {
+        key: (None if value is not None and key in thresholds and value < thresholds[key] else value)
+        for key, value in values.items()
+    }
 
-def low_pass_filter():
+def low_pass_filter(values, thresholds):
     """
     max threshold 이하인 값만 통과시키는 필터
+    values: {key: value}, thresholds: {key: max} — 기준 초과면 None
     """
+    return {
+        key: (None if value is not None and key in thresholds and value > thresholds[key] else value)
+        for key, value in values.items()
+    }
@@ -0,0 +1,254 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.filter import data as CHANNELS
+
+NAN = np.nan
+
+# 채널별 물리적으로 가능한 범위 (min, max) — 벗어나면 센서 오류로 보고 버림
+DEFAULT_THRESHOLDS = {
+    'air_temperature': (-40.0, 80.0),
+    'air_humidity': (0.0, 100.0),
+    'co2': (0.0, 10000.0),
+    'insolation': (0.0, 2000.0),
+    'weight_raw': (-8388608.0, 8388607.0),  # HX711 24bit
+    'ph_raw': (0.0, 5.0),                   # 아날로그 전압
+    'ec_raw': (0.0, 5.0),
+    'water_temperature': (-10.0, 60.0),
+    'tip_count': (0.0, None),
+    'soil_temperature': (-40.0, 80.0),
+    'soil_humidity': (0.0, 100.0),
+    'soil_ec': (0.0, 20000.0),
+    'soil_ph': (0.0, 14.0),
+}
+
+# 범위 밖 값 제거 -> 로드셀/EC 스파이크 제거 -> 이동 평균
+DEFAULT_CHAIN = [
+    ('threshold', {'limits': DEFAULT_THRESHOLDS}),
+    ('hampel', {'window': 7, 'n_sigmas': 3.0}),
+    ('moving_average', {'window': 5}),
+]
+
+# 수집 경로 (pipeline.py) 와 재계산 (recalibrate.py) 에서 이동 평균 전에 샘플 단위로 거는 체인
+# 로드셀 / EC 채널만: 범위 밖 값 제거 -> 스파이크 제거 (평균은 MovingAverageState가 채널별 유효 값으로 냄)
+INGEST_CHANNELS = ['weight_raw', 'ec_raw']
+INGEST_CHAIN = [
+    ('threshold', {'limits': DEFAULT_THRESHOLDS}),
+    ('hampel', {'window': 7, 'n_sigmas': 3.0}),
+]
+
+
+def to_array(records, channels=CHANNELS):
+    """ dict 또는 모델 인스턴스 목록을 (샘플 수, 채널 수) float64 배열로, None은 NaN """
+    out = np.full((len(records), len(channels)), NAN)
+    for i, record in enumerate(records):
+        get = record.get if isinstance(record, dict) else (lambda key, r=record: getattr(r, key, None))
+        for j, key in enumerate(channels):
+            value = get(key)
+            if value is not None:
+                out[i, j] = value
+    return out
+
+
+def nanmedian_last(windows):
+    """
+    마지막 축의 NaN 무시 중앙값 (전부 NaN이면 NaN)
+    np.nanmedian은 작은 창이 많을 때 축마다 파이썬 루프로 처리해서 느리므로 정렬 + 인덱싱으로 계산
+    """
+    ordered = np.sort(windows, axis=-1)  # NaN은 뒤로 정렬됨
+    count = np.count_nonzero(~np.isnan(ordered), axis=-1)
+    lo = np.maximum((count - 1) // 2, 0)
+    hi = np.maximum(count // 2, 0)
+    a = np.take_along_axis(ordered, lo[..., None], axis=-1)[..., 0]
+    b = np.take_along_axis(ordered, hi[..., None], axis=-1)[..., 0]
+    return np.where(count > 0, (a + b) / 2, NAN)
+
+
+def to_dict(row, channels=CHANNELS):
+    """ 1차원 배열 한 행을 {채널: 값 또는 None} 으로 """
+    return {key: (None if np.isnan(value) else float(value)) for key, value in zip(channels, row)}
+
+
+class _WindowStage:
+    """
+    최근 window개 샘플(현재 포함)에 대한 인과(causal) 창 연산의 공통 부분
+    이전 호출의 마지막 window-1개 행을 이어 붙여서, 나눠서 넣어도 한 번에 넣은 것과 결과가 같음
+    """
+
+    def __init__(self, n_channels, window):
+        self.window = window
+        self.history = np.full((window - 1, n_channels), NAN)
+
+    def _windows(self, x):
+        padded = np.concatenate([self.history, x])
+        if self.window > 1:
+            self.history = padded[-(self.window - 1):].copy()
+        # (샘플 수, 채널 수, window)
+        return sliding_window_view(padded, self.window, axis=0)
+
+    def reset(self):
+        self.history[:] = NAN
+
+
+class MovingAverage(_WindowStage):
+    def process_batch(self, x):
+        windows = self._windows(x)
+        valid = ~np.isnan(windows)
+        total = np.where(valid, windows, 0.0).sum(axis=2)
+        count = valid.sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / count, NAN)
+
+
+class Median(_WindowStage):
+    def process_batch(self, x):
+        return nanmedian_last(self._windows(x))
+
+
+class Hampel(_WindowStage):
+    """ 창의 중앙값에서 n_sigmas * 1.4826 * MAD 이상 벗어난 값을 중앙값으로 바꿈 """
+
+    def __init__(self, n_channels, window=7, n_sigmas=3.0):
+        super().__init__(n_channels, window)
+        self.n_sigmas = n_sigmas
+
+    def process_batch(self, x):
+        windows = self._windows(x)
+        median = nanmedian_last(windows)
+        mad = nanmedian_last(np.abs(windows - median[..., None]))
+        outlier = np.abs(x - median) > self.n_sigmas * 1.4826 * mad
+        return np.where(outlier, median, x)
+
+
+class ExponentialMovingAverage:
+    """
+    y_t = alpha * x_t + (1 - alpha) * y_{t-1}, 빠진 샘플(NaN)은 직전 유효 값으로 간주
+    block 단위로 하삼각 가중치 행렬 곱을 써서 시간 방향 파이썬 루프 없이 계산
+    """
+
+    def __init__(self, n_channels, alpha=0.3, block=256):
+        self.alpha = alpha
+        self.block = block
+        self.y = np.full(n_channels, NAN)       # 직전 출력
+        self.last_x = np.full(n_channels, NAN)  # 직전 유효 입력
+        decay = 1.0 - alpha
+        t = np.arange(block)
+        lags = t[:, None] - t[None, :]
+        self.weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+        self.carry = decay ** (t + 1)
+
+    def reset(self):
+        self.y[:] = NAN
+        self.last_x[:] = NAN
+
+    def _ffill(self, x):
+        """ 채널별로 NaN을 직전 유효 값(블록 이전 값 포함)으로 채움 """
+        filled = np.vstack([self.last_x, x])
+        valid = ~np.isnan(filled)
+        idx = np.where(valid, np.arange(len(filled))[:, None], 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        filled = filled[idx, np.arange(filled.shape[1])]
+        return filled[1:]
+
+    def process_batch(self, x):
+        out = np.empty_like(x)
+        for start in range(0, len(x), self.block):
+            chunk = self._ffill(x[start:start + self.block])
+            n = len(chunk)
+
+            y_prev = self.y.copy()
+            started = np.isnan(y_prev)
+            valid = ~np.isnan(chunk)
+            first = np.where(valid.any(axis=0), valid.argmax(axis=0), n)
+            if started.any():
+                # 아직 출력이 없던 채널은 첫 유효 값에서 시작, 그 전 구간은 NaN
+                cols = np.nonzero(started & (first < n))[0]
+                y_prev[cols] = chunk[first[cols], cols]
+                chunk = chunk.copy()
+                for col in cols:
+                    chunk[:first[col], col] = chunk[first[col], col]
+
+            y = self.weights[:n, :n] @ np.nan_to_num(chunk) + self.carry[:n, None] * np.nan_to_num(y_prev)
+            if started.any():
+                rows = np.arange(n)[:, None]
+                y = np.where(started & (rows < first[None, :]), NAN, y)
+
+            out[start:start + n] = y
+            self.y = y[-1].copy()
+            self.last_x = chunk[-1].copy()
+        return out
+
+
+class Threshold:
+    """
+    채널별 (min, max) 범위, None은 제한 없음
+    mode='reject': 범위 밖 값을 NaN으로 (filter.high_pass_filter / low_pass_filter 와 같은 의미)
+    mode='clip': 범위 경계 값으로 자름
+    """
+
+    def __init__(self, n_channels, limits=None, channels=CHANNELS, mode='reject'):
+        self.low = np.full(n_channels, -np.inf)
+        self.high = np.full(n_channels, np.inf)
+        for j, key in enumerate(channels):
+            lo, hi = (limits or {}).get(key, (None, None))
+            if lo is not None:
+                self.low[j] = lo
+            if hi is not None:
+                self.high[j] = hi
+        self.mode = mode
+
+    def reset(self):
+        pass
+
+    def process_batch(self, x):
+        if self.mode == 'clip':
+            return np.where(x < self.low, self.low, np.where(x > self.high, self.high, x))
+        return np.where((x < self.low) | (x > self.high), NAN, x)
+
+
+STAGES = {
+    'threshold': Threshold,
+    'hampel': Hampel,
+    'median': Median,
+    'moving_average': MovingAverage,
+    'ema': ExponentialMovingAverage,
+}
+
+
+class FilterBank:
+    """
+    filter.data 의 13개 채널을 (샘플 수, 13) 배열 하나로 묶어 필터 체인을 벡터 연산으로 적용
+
+    chain: [(단계 이름, 옵션 dict), ...] — threshold, hampel, median, moving_average, ema
+    - process(sample): 샘플 하나 (dict / 모델 / 1차원 배열) 씩 넣는 스트리밍 API
+    - process_batch(array): 과거 데이터 배열을 한 번에 처리, 상태가 이어지므로 나눠 넣어도 결과 동일
+    """
+
+    def __init__(self, chain=None, channels=CHANNELS):
+        self.channels = list(channels)
+        self.chain = chain if chain is not None else DEFAULT_CHAIN
+        n = len(self.channels)
+        self.stages = []
+        for name, options in self.chain:
+            options = dict(options)
+            if name == 'threshold':
+                options.setdefault('channels', self.channels)
+            self.stages.append(STAGES[name](n, **options))
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def process_batch(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        for stage in self.stages:
+            x = stage.process_batch(x)
+        return x
+
+    def process(self, sample):
+        """ 샘플 하나를 필터링해서 {채널: 값 또는 None} 반환 """
+        if isinstance(sample, np.ndarray):
+            row = sample.reshape(1, -1)
+        else:
+            row = to_array([sample], self.channels)
+        return to_dict(self.process_batch(row)[0], self.channels)
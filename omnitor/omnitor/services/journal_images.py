@@ -0,0 +1,110 @@
+import os
+import re
+import time
+from datetime import datetime, date
+from threading import Lock
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+# 카메라가 일지 사진을 저장하는 곳 (devices/camera.py 의 save_path 와 같음)
+IMAGE_FILES_DIRECTORY = os.environ.get(
+    "OMNITOR_JOURNAL_IMAGES", os.path.join(root_dir, "static", "omnitor", "journal_images")
+)
+
+# 사진 이름: YYYY-MM-DD_L.jpg / _C / _R (capture_journal.py), 예전 이름 YYYY-MM-DD.jpg 는 가운데로
+POSITIONS = ('L', 'C', 'R')
+NAME_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:_([LCR]))?\.jpg$")
+
+
+def scan(directory):
+    """ 폴더를 한 번 훑어서 {날짜: {위치: (파일 이름, mtime)}} """
+    index = {}
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return index
+    for entry in entries:
+        match = NAME_PATTERN.match(entry.name)
+        if match is None:
+            continue
+        try:
+            day = date.fromisoformat(match.group(1))
+            mtime = entry.stat().st_mtime
+        except (ValueError, OSError):
+            continue
+        index.setdefault(day, {})[match.group(2) or 'C'] = (entry.name, mtime)
+    return index
+
+
+class ImageIndex:
+    """
+    일지 사진 폴더의 메모리 색인 (웹 워커 프로세스마다 하나)
+
+    - 요청마다 파일을 stat 하지 않음: 폴더 mtime이 바뀌었거나 (사진 추가 / 삭제) max_age초가 지나면
+      (같은 이름으로 다시 찍어서 덮어쓴 경우) 폴더를 한 번 다시 훑음
+    - 폴더 mtime 확인도 check_every초에 한 번만
+    - version: 내용이 바뀔 때마다 1 증가 (응답 ETag 용)
+    """
+
+    def __init__(self, directory=IMAGE_FILES_DIRECTORY, check_every=2.0, max_age=60.0):
+        self.directory = directory
+        self.check_every = check_every
+        self.max_age = max_age
+        self.lock = Lock()
+        self.index = {}
+        self.version = 0
+        self.dir_mtime = None
+        self.scanned_at = None
+        self.checked_at = None
+        self.scans = 0
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and self.checked_at is not None and now - self.checked_at < self.check_every:
+            return
+        with self.lock:
+            self.checked_at = now
+            dir_mtime = self._dir_mtime()
+            if (not force and self.scanned_at is not None and dir_mtime == self.dir_mtime
+                    and now - self.scanned_at < self.max_age):
+                return
+            index = scan(self.directory)
+            self.dir_mtime = dir_mtime
+            self.scanned_at = now
+            self.scans += 1
+            if index != self.index:
+                self.index = index
+                self.version += 1
+
+    def get(self, day):
+        """ {위치: (파일 이름, mtime)} (사진이 없으면 빈 dict) """
+        self.refresh()
+        return self.index.get(day, {})
+
+    def between(self, start, end):
+        """ start ~ end (둘 다 포함) 날짜의 {날짜: {위치: (파일 이름, mtime)}} """
+        self.refresh()
+        return {day: shots for day, shots in self.index.items() if start <= day <= end}
+
+
+class ImageIndexSingleton:
+    _instance = None
+    _lock = Lock()
+
+    @classmethod
+    def instance(cls) -> ImageIndex:
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ImageIndex()
+            return cls._instance
+
+
+def capture_time(mtime):
+    return datetime.fromtimestamp(mtime).strftime('%H:%M:%S')
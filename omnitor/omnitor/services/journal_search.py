@@ -0,0 +1,187 @@
+import os
+import sys
+import argparse
+from datetime import date
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
+    django.setup()
+
+from threading import Lock
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from omnitor.models import FarmJournal
+
+SEARCH_FIELDS = ['farm_work', 'pesticide', 'fertilizer', 'harvest', 'notes']
+
+JOURNAL_TABLE = FarmJournal._meta.db_table
+FTS_TABLE = f"{JOURNAL_TABLE}_fts"
+
+# 검색 결과 조각에서 맞은 단어를 감싸는 표시 (HTML이 아니므로 화면에서 바꿔서 강조)
+HIGHLIGHT = ('[', ']')
+
+# FTS 행 id = 날짜의 율리우스일 (정수) — 날짜 범위 조건이 rowid 범위 조회가 됨
+# 일지 테이블은 date가 기본 키라 SQLite rowid가 VACUUM 때 바뀔 수 있으므로 rowid 대신 사용
+_ROWID = "CAST(julianday({}) AS INTEGER)"
+
+# 일지 테이블이 바뀌면 SQLite 트리거가 FTS 색인을 같이 바꿈
+# (update_or_create, 관리자 화면, QuerySet.update 등 어떤 경로로 저장해도 동기화됨)
+# 여러 웹 워커가 동시에 처음 실행해도 오류가 나지 않도록 모두 IF NOT EXISTS
+TRIGGERS = [f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au"]
+
+SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {', '.join(SEARCH_FIELDS)},
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '1 2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {JOURNAL_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)})
+        VALUES ({_ROWID.format('new.date')}, {', '.join(f'new.{f}' for f in SEARCH_FIELDS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {JOURNAL_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = {_ROWID.format('old.date')};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {JOURNAL_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = {_ROWID.format('old.date')};
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)})
+        VALUES ({_ROWID.format('new.date')}, {', '.join(f'new.{f}' for f in SEARCH_FIELDS)});
+    END""",
+]
+
+REBUILD_SQL = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"""INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)})
+        SELECT {_ROWID.format('date')}, {', '.join(SEARCH_FIELDS)} FROM {JOURNAL_TABLE}""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')",
+]
+
+_ready = False
+_ready_lock = Lock()
+
+
+def rebuild_index():
+    """ FTS 색인을 일지 테이블에서 다시 만듦 """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in REBUILD_SQL:
+            cursor.execute(sql)
+
+
+def ensure_index():
+    """
+    FTS 테이블 / 트리거 중 하나라도 없으면 만들고 기존 일지로 채움 (프로세스마다 처음 한 번만 확인)
+    트리거가 빠져 있던 동안의 변경은 색인에 없으므로 다시 채움
+    """
+    global _ready
+    if _ready or connection.vendor != 'sqlite':
+        return
+    with _ready_lock:
+        if _ready:
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            names = [FTS_TABLE, *TRIGGERS]
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name IN ({', '.join(['%s'] * len(names))})",
+                names,
+            )
+            missing = set(names) - {name for name, in cursor.fetchall()}
+            if missing:
+                for sql in SCHEMA:
+                    cursor.execute(sql)
+                rebuild_index()
+                print(f"[JournalSearch] {FTS_TABLE} 색인 생성 ({', '.join(sorted(missing))} 없음)")
+        _ready = True
+
+
+def match_expression(query):
+    """
+    사용자 입력 -> FTS5 MATCH 식 (단어마다 따옴표로 감싸서 FTS 문법 문자를 그대로 검색)
+    - 공백으로 나눈 단어는 모두 포함해야 함 (AND)
+    - '농약*' 처럼 끝에 * 를 붙이면 그 글자로 시작하는 단어 (접두어 검색, '농약을', '농약살포' 등)
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    if not terms:
+        raise ValueError("Search query is empty.")
+    return " ".join(terms)
+
+
+def search(query, start=None, end=None, limit=50):
+    """
+    일지 전문 검색, 관련도 (bm25) 순 -> [{'date', 'score', 'snippet'}, ...]
+    start / end: 날짜 범위 (둘 다 포함, 없으면 전체)
+    """
+    expression = match_expression(query)
+    if connection.vendor != 'sqlite':
+        return _search_fallback(query, start, end, limit)
+
+    ensure_index()
+    low = (start or date.min).isoformat()
+    high = (end or date.max).isoformat()
+    sql = f"""
+        SELECT date(rowid + 0.5), rank, snippet({FTS_TABLE}, -1, %s, %s, '…', 12)
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s
+          AND rowid BETWEEN {_ROWID.format('%s')} AND {_ROWID.format('%s')}
+        ORDER BY rank
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*HIGHLIGHT, expression, low, high, limit])
+        rows = cursor.fetchall()
+    # bm25는 작을수록 관련도가 높으므로 부호를 바꿔서 돌려줌
+    return [{'date': day, 'score': round(-rank, 4), 'snippet': snippet} for day, rank, snippet in rows]
+
+
+def _search_fallback(query, start, end, limit):
+    """ SQLite가 아닌 DB: 색인 없이 icontains 로 (최근 날짜 순, 관련도 없음) """
+    qs = FarmJournal.objects.all()
+    for word in query.split():
+        word = word.rstrip('*')
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": word})
+        qs = qs.filter(condition)
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    return [
+        {'date': row['date'].isoformat(), 'score': None,
+         'snippet': next((row[f] for f in SEARCH_FIELDS if row[f]), '')[:80]}
+        for row in qs.order_by('-date').values('date', *SEARCH_FIELDS)[:limit]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="농장 일지 전문 검색 (SQLite FTS5)")
+    parser.add_argument("query", nargs="?", help="검색어 (접두어 검색은 끝에 *)")
+    parser.add_argument("--start", type=date.fromisoformat, help="시작 날짜 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--end", type=date.fromisoformat, help="끝 날짜 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--rebuild", action="store_true", help="색인을 일지 테이블에서 다시 만듦")
+    args = parser.parse_args()
+
+    ensure_index()
+    if args.rebuild:
+        rebuild_index()
+        print("[JournalSearch] 색인 재생성 완료")
+    if args.query:
+        for hit in search(args.query, args.start, args.end, args.limit):
+            print(f"{hit['date']}  {hit['score']}  {hit['snippet']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import threading
+from threading import Lock
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+# 수집 파이프라인이 최신 FinalData를 뿌리는 로컬 소켓
+SOCKET_PATH = os.environ.get("OMNITOR_LIVE_SOCKET", os.path.join(root_dir, "var", "live.sock"))
+
+# 구독자가 이 바이트 이상 못 읽고 밀리면 끊음 (느린 클라이언트가 파이프라인을 막지 않도록)
+MAX_BACKLOG = 256 * 1024
+
+
+def snapshot(final, seq, filtered=None):
+    """
+    FinalData 한 행을 한 줄 JSON 바이트로 (구독자 수와 상관없이 샘플당 한 번만 직렬화)
+    filtered: 같은 샘플의 raw 채널 이동 평균 (보정 화면의 moving_avg_filter 용, 'filtered' 키)
+    """
+    data = {'seq': seq, 'timestamp': final.timestamp.isoformat() if final.timestamp else None}
+    for field in final._meta.fields:
+        if field.get_internal_type() == 'FloatField':
+            data[field.name] = getattr(final, field.name)
+    if filtered is not None:
+        data['filtered'] = filtered
+    return json.dumps(data, ensure_ascii=False).encode() + b"\n"
+
+
+class LiveFeedServer:
+    """
+    수집 파이프라인 쪽: 유닉스 소켓으로 붙은 구독자(웹 워커, LCD 등)에게 최신 스냅샷을 한 줄씩 보냄
+    - 새 구독자에게는 접속 즉시 마지막 스냅샷을 보냄
+    - publish()는 이벤트 루프 스레드에서 호출 (SensorPipeline의 publish 단계), 블록하지 않음
+    """
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self.server = None
+        self.clients = set()
+        self.latest = None
+        self.seq = 0
+
+        # 통계
+        self.published = 0
+        self.dropped_clients = 0
+
+    async def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            os.unlink(self.path)  # 이전 실행이 남긴 소켓 파일
+        except FileNotFoundError:
+            pass
+        self.server = await asyncio.start_unix_server(self._on_connect, path=self.path)
+        print(f"[LiveFeed] {self.path} 에서 대기")
+
+    async def _on_connect(self, reader, writer):
+        self.clients.add(writer)
+        if self.latest is not None:
+            writer.write(self.latest)
+        try:
+            # 구독자는 보내는 것이 없음, 끊길 때까지 기다림
+            await reader.read()
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def publish(self, final, filtered=None):
+        self.seq += 1
+        self.latest = snapshot(final, self.seq, filtered)
+        self.published += 1
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                self.clients.discard(writer)
+                writer.transport.abort()
+                self.dropped_clients += 1
+                continue
+            writer.write(self.latest)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.clients):
+                writer.transport.abort()
+            await self.server.wait_closed()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class LiveFeedClient:
+    """
+    웹 워커 쪽: 프로세스당 소켓 연결 하나로 스냅샷을 받아서 latest에 두고 기다리는 스레드들을 깨움
+    브라우저 탭이 몇 개든 샘플당 계산 / DB 조회 없이 같은 바이트를 나눠 씀
+    """
+
+    def __init__(self, path=SOCKET_PATH, max_backoff=10.0):
+        self.path = path
+        self.max_backoff = max_backoff
+        self.condition = threading.Condition()
+        self.latest = None      # 마지막 스냅샷 (JSON 바이트, 줄바꿈 없음)
+        self.seq = 0            # 마지막 스냅샷의 seq (LiveFeedServer가 매긴 번호라 어느 웹 워커에서나 같음)
+        self.connected = False
+        self.tried = threading.Event()  # 첫 연결 시도가 끝났는지 (성공 / 실패)
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        backoff = 1.0
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.path)
+                    self.connected = True
+                    self.tried.set()
+                    backoff = 1.0
+                    for line in sock.makefile("rb"):
+                        self._receive(line.rstrip(b"\n"))
+            except OSError:
+                pass
+            with self.condition:
+                self.connected = False
+                self.condition.notify_all()
+            self.tried.set()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _receive(self, data):
+        try:
+            seq = json.loads(data)['seq']
+        except (ValueError, KeyError, TypeError):
+            return
+        with self.condition:
+            self.latest = data
+            self.seq = seq
+            self.condition.notify_all()
+
+    def peek(self, timeout=None):
+        """
+        지금 가진 최신 스냅샷 (없으면 None) — 보통 기다리지 않음
+        연결은 됐는데 아직 한 번도 받지 못한 경우에만 첫 스냅샷을 timeout초까지 기다림
+        소켓이 없으면 (파이프라인이 돌고 있지 않음) 첫 연결 시도가 끝나는 대로 바로 None
+        """
+        self.tried.wait(timeout)
+        with self.condition:
+            if self.latest is None and self.connected:
+                self.condition.wait_for(lambda: self.latest is not None or not self.connected, timeout=timeout)
+            return self.latest
+
+    def wait(self, after=0, timeout=None):
+        """ seq가 after보다 큰 스냅샷이 올 때까지 기다림 -> (seq, 데이터) 또는 시간 초과 시 (after, None) """
+        with self.condition:
+            if after > self.seq:
+                after = 0  # 수집 파이프라인이 다시 시작돼서 seq가 처음부터 다시 셈
+            if self.condition.wait_for(lambda: self.seq > after, timeout=timeout):
+                return self.seq, self.latest
+            return after, None
+
+
+class LiveFeedClientSingleton:
+    _instance = None
+    _lock = Lock()
+
+    @classmethod
+    def instance(cls) -> LiveFeedClient:
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = LiveFeedClient()
+                cls._instance.start()
+            return cls._instance
@@ -0,0 +1,276 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+from dataclasses import dataclass
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
+    django.setup()
+
+from omnitor.models import RawData, FinalData
+from services.batch_writer import BatchWriter
+from services.filter import FilterStateSingleton
+from services.filter_bank import FilterBank, INGEST_CHAIN, INGEST_CHANNELS
+from services.live_feed import LiveFeedServer
+from services.rollup import update_rollups
+from services.calibration_cache import CalibrationCacheSingleton
+from services.save_finaldata import calc_final_data
+from services.rows import SPOOL_PATH, build_row, merge_packets
+from services.scheduler import RateScheduler
+from services.spool import SampleSpool, SpoolReplayer
+
+# DB 장애 중 계산한 FinalData를 보관할 스풀 (RawData 스풀과 같은 폴더)
+FINAL_SPOOL_PATH = os.environ.get(
+    "OMNITOR_FINAL_SPOOL_PATH", os.path.join(os.path.dirname(SPOOL_PATH), "finaldata.spool")
+)
+
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int = 0
+    dropped: int = 0       # 큐가 가득 차서 버린 항목 (acquire -> filter 구간만)
+    max_depth: int = 0     # 입력 큐 최대 길이
+    busy: float = 0.0      # 처리에 쓴 시간 합 (초)
+    blocked: float = 0.0   # 다음 큐가 가득 차서 기다린 시간 합 (초)
+    merged: int = 0        # 한 tick에 여러 개 들어와서 평균으로 합친 추가 패킷 (acquire 구간만)
+
+    def snapshot(self, depth):
+        return {
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'avg_ms': self.busy * 1000 / self.processed if self.processed else 0.0,
+            'blocked_s': round(self.blocked, 3),
+            'merged': self.merged,
+        }
+
+
+class SensorPipeline:
+    """
+    acquire -> filter -> calibrate -> persist -> publish 를 크기 제한 큐로 잇는 asyncio 파이프라인
+
+    - acquire: RateScheduler 스레드가 tick마다 센서 값을 모아 filter 큐에 넣음 (절대 블록하지 않음)
+      filter 큐가 가득 차면 가장 오래된 tick을 버리고 dropped로 집계
+    - filter: 로드셀 / EC 범위 밖 값과 스파이크 제거 (FilterBank 스트리밍, spike_chain) 후
+      채널별 이동 평균 상태(MovingAverageState)를 O(1)로 갱신 (DB 조회 없음), 저장하는 RawData는 원래 값
+    - calibrate: 캐시된 보정 계수를 적용해 FinalData 생성 (보정 값이 바뀐 경우에만 executor에서 다시 읽음)
+    - persist: RawData / FinalData 를 BatchWriter 쓰기 스레드로 넘김
+    - publish: 구독자 콜백 호출, latest 갱신 (LiveFeedServer가 웹 워커 / LCD 로 전달)
+    그 외 단계 사이는 await put()으로 backpressure가 걸리고 blocked 시간으로 보임
+    """
+
+    STAGES = ('acquire', 'filter', 'calibrate', 'persist', 'publish')
+
+    def __init__(self, arduino, soil, arduino_rate_hz=10, soil_rate_hz=0.2,
+                 queue_size=256, stats_interval=60.0, spool_path=SPOOL_PATH, final_spool_path=FINAL_SPOOL_PATH,
+                 spike_chain=INGEST_CHAIN):
+        self.arduino = arduino
+        self.soil = soil
+        self.arduino_rate_hz = arduino_rate_hz
+        self.soil_rate_hz = soil_rate_hz
+        self.filter_state = None
+        # recalibrate.py 도 같은 체인을 배열로 적용하므로 재계산 결과가 실시간 값과 같음 (None이면 사용 안 함)
+        self.spike_filter = FilterBank(spike_chain, channels=INGEST_CHANNELS) if spike_chain else None
+        self.queue_size = queue_size
+        self.stats_interval = stats_interval
+
+        self.scheduler = RateScheduler(name="Pipeline Scheduler")
+        self.spool = SampleSpool(spool_path)
+        self.replayer = SpoolReplayer(self.spool)
+        self.raw_writer = BatchWriter(RawData, max_rows=100, max_delay=5.0, name="RawData Writer", spool=self.spool)
+        # FinalData도 장애 중에는 스풀에 적었다가 복구 (RawData만 복구하면 그 기간의 FinalData / 롤업이 비어 있게 됨)
+        self.final_spool = SampleSpool(final_spool_path, model=FinalData)
+        self.final_replayer = SpoolReplayer(self.final_spool)
+        self.final_writer = BatchWriter(FinalData, max_rows=100, max_delay=5.0, name="FinalData Writer", spool=self.final_spool)
+        # 그래프용 분/시간/일 롤업은 FinalData가 저장되거나 스풀에서 복구될 때마다 갱신
+        self.final_writer.on_flush.append(update_rollups)
+        self.final_spool.on_replay.append(update_rollups)
+        self.subscribers = []
+        self.latest = None
+        # 대시보드 / LCD 는 이 소켓으로 최신 값을 받음 (샘플당 한 번 직렬화)
+        # (raw 채널 이동 평균도 같이 실어서 웹 워커의 moving_avg_filter가 파이프라인과 같은 값을 씀)
+        self.live_feed = LiveFeedServer()
+
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        self.queues = {}
+        self.loop = None
+        self.calibration = CalibrationCacheSingleton.instance()
+        self.settings = None
+
+    def subscribe(self, callback):
+        """ callback(final: FinalData) — publish 단계에서 호출 (이벤트 루프 스레드) """
+        self.subscribers.append(callback)
+
+    # ----- acquire (스케줄러 스레드) -----
+
+    def _sample_arduino(self, tick_ns):
+        # 지난 tick 이후 들어온 패킷을 모두 합침 (버리지 않음)
+        samples = self.arduino.drain()
+        if len(samples) > 1:
+            self.stats['acquire'].merged += len(samples) - 1
+        return merge_packets(samples)
+
+    def _sample_soil(self, tick_ns):
+        return self.soil.read()
+
+    def _on_tick(self, tick):
+        self.stats['acquire'].processed += 1
+        self.loop.call_soon_threadsafe(self._enqueue_tick, tick)
+
+    def _enqueue_tick(self, tick):
+        q = self.queues['filter']
+        if q.full():
+            q.get_nowait()
+            self.stats['acquire'].dropped += 1
+        q.put_nowait(tick)
+
+    # ----- 단계 처리 함수 -----
+
+    async def _filter(self, tick):
+        raw = build_row(tick)
+        ts = raw.timestamp.timestamp()
+        if self.spike_filter is not None:
+            sample = {key: getattr(raw, key) for key in self.filter_state.keys}
+            sample.update(self.spike_filter.process(raw))
+            self.filter_state.update(sample, ts)
+        else:
+            self.filter_state.update(raw, ts)
+        return raw, self.filter_state.current(now=ts)
+
+    async def _calibrate(self, item):
+        raw, filtered = item
+        # 평소에는 버전 파일 stat 한 번, 보정 값이 바뀌었을 때만 DB에서 다시 읽음
+        if self.settings is None or self.calibration.is_stale():
+            self.settings = await self.loop.run_in_executor(None, self.calibration.get)
+        return raw, calc_final_data(filtered, self.settings, timestamp=raw.timestamp), filtered
+
+    async def _persist(self, item):
+        raw, final, filtered = item
+        self.raw_writer.put(raw)
+        self.final_writer.put(final)
+        return final, filtered
+
+    async def _publish(self, item):
+        final, filtered = item
+        self.latest = final
+        self.live_feed.publish(final, filtered)
+        for callback in self.subscribers:
+            try:
+                callback(final)
+            except Exception as e:
+                print(f"[Pipeline] publish 오류: {e}")
+        return None
+
+    async def _stage(self, name, func, inbox, outbox):
+        stats = self.stats[name]
+        while True:
+            item = await inbox.get()
+            started = time.perf_counter()
+            try:
+                result = await func(item)
+            except Exception as e:
+                print(f"[Pipeline] {name} 오류: {e}")
+                continue
+            finally:
+                stats.busy += time.perf_counter() - started
+                inbox.task_done()
+            stats.processed += 1
+            stats.max_depth = max(stats.max_depth, inbox.qsize() + 1)
+
+            if outbox is not None and result is not None:
+                waited = time.perf_counter()
+                await outbox.put(result)
+                stats.blocked += time.perf_counter() - waited
+
+    def stage_stats(self):
+        result = {}
+        for name in self.STAGES:
+            q = self.queues.get(name)
+            result[name] = self.stats[name].snapshot(q.qsize() if q else 0)
+        result['scheduler'] = self.scheduler.stats()
+        return result
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            print(f"[Pipeline] {self.stage_stats()}")
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in self.STAGES[1:]}
+
+        # 필터 상태는 시작할 때만 DB에서 채움, 시리얼 연결 (초기화 대기 포함) 도 executor에서
+        self.filter_state = await self.loop.run_in_executor(None, FilterStateSingleton.instance)
+        await self.loop.run_in_executor(None, self.arduino.start)
+        self.soil.start()
+        self.raw_writer.start()
+        self.final_writer.start()
+        self.replayer.start()
+        self.final_replayer.start()
+        await self.live_feed.start()
+
+        q = self.queues
+        tasks = [
+            asyncio.create_task(self._stage('filter', self._filter, q['filter'], q['calibrate'])),
+            asyncio.create_task(self._stage('calibrate', self._calibrate, q['calibrate'], q['persist'])),
+            asyncio.create_task(self._stage('persist', self._persist, q['persist'], q['publish'])),
+            asyncio.create_task(self._stage('publish', self._publish, q['publish'], None)),
+            asyncio.create_task(self._report()),
+        ]
+
+        self.scheduler.add('arduino', self.arduino_rate_hz, self._sample_arduino)
+        self.scheduler.add('soil', self.soil_rate_hz, self._sample_soil)
+        acquire = threading.Thread(target=self.scheduler.run, args=(self._on_tick,), daemon=True)
+        acquire.start()
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.scheduler.stop()
+            for task in tasks:
+                task.cancel()
+            await self.live_feed.close()
+            await self.loop.run_in_executor(None, self.shutdown)
+
+    def shutdown(self):
+        print(f"[Pipeline] 종료: {self.stage_stats()}")
+        self.arduino.stop()
+        self.soil.stop()
+        self.raw_writer.stop()
+        self.final_writer.stop()
+        self.replayer.stop()
+        self.final_replayer.stop()
+
+
+def main():
+    from devices.arduino import SerialSingleton
+    from devices.soil import SoilSensorSingleton
+
+    pipeline = SensorPipeline(SerialSingleton.instance(), SoilSensorSingleton.instance())
+
+    async def runner():
+        task = asyncio.create_task(pipeline.run())
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(runner())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timedelta
+from itertools import islice
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
+    django.setup()
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Q
+
+from omnitor.models import RawData, FinalData
+from services import data_revision
+from services.calibration_cache import get_coefficients
+from services.filter import MovingAverageState, data as CHANNELS
+from services.filter_bank import FilterBank, INGEST_CHAIN, INGEST_CHANNELS
+from services.rollup import rebuild as rebuild_rollups
+from services.save_finaldata import PASSTHROUGH_FIELDS, CALIBRATED_FIELDS
+
+# 어디까지 다시 계산했는지 기록하는 파일 (중단 후 --resume 으로 이어서 실행)
+CHECKPOINT_PATH = os.environ.get("OMNITOR_RECALIBRATE_CHECKPOINT", os.path.join(root_dir, "var", "recalibrate.checkpoint"))
+
+FINAL_FIELDS = PASSTHROUGH_FIELDS + [final_field for _, final_field, _ in CALIBRATED_FIELDS]
+COLUMN = {key: i for i, key in enumerate(CHANNELS)}
+
+INSERT_SQL = "INSERT INTO {table} ({columns}) VALUES ({params})".format(
+    table=FinalData._meta.db_table,
+    columns=", ".join(FinalData._meta.get_field(name).column for name in ['timestamp'] + FINAL_FIELDS),
+    params=", ".join(["%s"] * (len(FINAL_FIELDS) + 1)),
+)
+
+
+def calibrate_array(filtered, coefficients):
+    """
+    (샘플 수, 채널 수) 필터 결과에 보정 계수를 적용해서 {FinalData 항목: 1차원 배열} 반환
+    calc_final_data와 같은 규칙: 아직 보정하지 않은 항목(slope == 0)은 NaN
+    """
+    columns = {field: filtered[:, COLUMN[field]] for field in PASSTHROUGH_FIELDS}
+    for raw_field, final_field, prefix in CALIBRATED_FIELDS:
+        slope = getattr(coefficients, f"{prefix}_slope")
+        intercept = getattr(coefficients, f"{prefix}_intercept")
+        if slope:
+            columns[final_field] = slope * filtered[:, COLUMN[raw_field]] + intercept
+        else:
+            columns[final_field] = np.full(len(filtered), np.nan)
+    return columns
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_checkpoint(state, path=CHECKPOINT_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Recalibrator:
+    """
+    RawData를 시간 순으로 chunk_size개씩 읽어서 (서버 측 iterator) 이동 평균 + 보정 계수를
+    배열 연산으로 적용하고 FinalData를 다시 씀
+
+    - 이동 평균 전 스파이크 제거 (spike_chain, FilterBank 배열 처리) 와 이동 평균 (MovingAverageState 규칙:
+      채널별 최근 유효 값, max_age) 모두 수집 경로 (pipeline.py) 와 같아서 다시 계산한 행이 실시간으로 저장됐을 행과 같음
+    - chunk가 덮는 시간 구간의 FinalData를 지우고 새로 계산한 값을 넣음 (chunk마다 한 트랜잭션)
+    - chunk를 커밋할 때마다 마지막 (timestamp, id) 를 체크포인트에 기록, resume 시 그 다음부터
+      필터 상태는 시작 위치 (start 또는 체크포인트) 직전 warmup개 행을 다시 흘려서 복원 (저장은 하지 않음)
+    - 끝나면 다시 쓴 구간의 분/시간/일 롤업을 재계산
+    """
+
+    def __init__(self, start=None, end=None, chunk_size=10000, warmup=100, checkpoint_path=CHECKPOINT_PATH,
+                 spike_chain=INGEST_CHAIN):
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self.warmup = warmup
+        self.checkpoint_path = checkpoint_path
+        self.state = MovingAverageState(keys=CHANNELS)
+        self.spike_filter = FilterBank(spike_chain, channels=INGEST_CHANNELS) if spike_chain else None
+        self.coefficients = None
+
+        # 통계
+        self.rows = 0
+        self.created = 0
+        self.replaced = 0
+
+    def _queryset(self):
+        qs = RawData.objects.all()
+        if self.start is not None:
+            qs = qs.filter(timestamp__gte=self.start)
+        if self.end is not None:
+            qs = qs.filter(timestamp__lt=self.end)
+        return qs
+
+    def _chunks(self, qs):
+        rows = qs.order_by('timestamp', 'id').values_list('id', 'timestamp', *CHANNELS).iterator(chunk_size=self.chunk_size)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _warm_up(self, last_timestamp, last_id=None):
+        """ 시작 위치 직전 행들로 필터 상태를 다시 만듦 (last_id가 없으면 last_timestamp 이전 행) """
+        if not self.warmup:
+            return
+        condition = Q(timestamp__lt=last_timestamp)
+        if last_id is not None:
+            condition |= Q(timestamp=last_timestamp, id__lte=last_id)
+        before = RawData.objects.filter(condition).order_by('-timestamp', '-id').values_list('timestamp', *CHANNELS)
+        history = list(before[:self.warmup])
+        history.reverse()
+        if history:
+            timestamps, *channels = zip(*history)
+            self._filter(np.array(channels, dtype=np.float64).T, timestamps)
+
+    def _filter(self, raw, timestamps):
+        """ (샘플 수, 채널 수) raw 배열 -> 스파이크 제거 -> 이동 평균 (상태는 다음 chunk로 이어짐) """
+        if self.spike_filter is not None:
+            raw = raw.copy()
+            columns = [COLUMN[key] for key in INGEST_CHANNELS]
+            raw[:, columns] = self.spike_filter.process_batch(raw[:, columns])
+        return self.state.process_batch(raw, [ts.timestamp() for ts in timestamps])
+
+    def _write(self, timestamps, columns, after=None):
+        """
+        after < timestamp <= 마지막 timestamp 구간의 FinalData를 지우고 다시 넣음 (한 트랜잭션)
+        FinalData는 RawData에서 파생된 값이라 갈아끼워도 잃는 것이 없고, SQLite에서 bulk_update의
+        CASE WHEN 갱신은 수백 행/초 수준이라 구간 삭제 + executemany INSERT로 처리
+        """
+        existing = FinalData.objects.filter(timestamp__lte=timestamps[-1])
+        existing = existing.filter(timestamp__gt=after) if after is not None else existing.filter(timestamp__gte=timestamps[0])
+
+        adapt = connection.ops.adapt_datetimefield_value
+        # NaN -> None 변환을 채널 단위로 한 번에
+        values = [[None if v != v else v for v in columns[field].tolist()] for field in FINAL_FIELDS]
+        params = list(zip([adapt(ts) for ts in timestamps], *values))
+
+        with transaction.atomic():
+            replaced, _ = existing.delete()
+            with connection.cursor() as cursor:
+                cursor.executemany(INSERT_SQL, params)
+        self.replaced += replaced
+        self.created += len(params)
+        # 이 구간을 이미 받아간 응답 (캐시 / ETag) 이 다시 만들어지도록
+        data_revision.bump()
+
+    def run(self, resume=False):
+        self.coefficients = get_coefficients()
+        qs = self._queryset()
+
+        state = load_checkpoint(self.checkpoint_path) if resume else None
+        if state and state.get('version') != self.coefficients.version:
+            print(f"[Recalibrate] 보정 설정이 바뀌어서 (v{state.get('version')} -> v{self.coefficients.version}) 처음부터 다시 계산")
+            state = None
+        if state:
+            last_timestamp = datetime.fromisoformat(state['timestamp'])
+            last_id = state['id']
+            self.rows = state.get('rows', 0)
+            self._warm_up(last_timestamp, last_id)
+            qs = qs.filter(Q(timestamp__gt=last_timestamp) | Q(timestamp=last_timestamp, id__gt=last_id))
+            print(f"[Recalibrate] {last_timestamp} 이후부터 이어서 실행")
+        elif self.start is not None:
+            self._warm_up(self.start)
+
+        after = last_timestamp if state else None
+        first_timestamp = datetime.fromisoformat(state['first']) if state and state.get('first') else None
+        started = time.monotonic()
+        for chunk in self._chunks(qs):
+            ids, timestamps, *channels = zip(*chunk)
+            raw = np.array(channels, dtype=np.float64).T  # (샘플 수, 채널 수), None -> NaN
+            filtered = self._filter(raw, timestamps)
+            self._write(timestamps, calibrate_array(filtered, self.coefficients), after)
+            after = timestamps[-1]
+            if first_timestamp is None:
+                first_timestamp = timestamps[0]
+
+            self.rows += len(chunk)
+            save_checkpoint({
+                'version': self.coefficients.version,
+                'timestamp': timestamps[-1].isoformat(),
+                'id': ids[-1],
+                'rows': self.rows,
+                'first': first_timestamp.isoformat(),
+            }, self.checkpoint_path)
+            elapsed = time.monotonic() - started
+            print(f"[Recalibrate] {self.rows}행 (~{timestamps[-1]:%Y-%m-%d %H:%M}), {len(chunk) / max(elapsed, 1e-9):.0f}행/초")
+            started = time.monotonic()
+
+        # 다시 쓴 구간의 그래프 롤업도 새 값으로
+        if first_timestamp is not None:
+            rebuild_rollups(first_timestamp, after + timedelta(seconds=1))
+            data_revision.bump()
+
+        # 끝까지 처리했으면 체크포인트 삭제
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+        print(f"[Recalibrate] 완료: {self.rows}행 (기존 {self.replaced}행 교체, {self.created}행 저장)")
+        return self.rows
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="현재 보정 설정으로 RawData에서 FinalData를 다시 계산")
+    parser.add_argument("--start", help="시작 시각 (YYYY-MM-DD[THH:MM:SS], 포함)")
+    parser.add_argument("--end", help="끝 시각 (YYYY-MM-DD[THH:MM:SS], 제외)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--resume", action="store_true", help="체크포인트부터 이어서 실행")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--no-spike-filter", action="store_true",
+                        help="로드셀 / EC 스파이크 제거 없이 이동 평균만 (수집 경로에서 끈 경우)")
+    args = parser.parse_args()
+
+    Recalibrator(
+        start=_parse_date(args.start), end=_parse_date(args.end),
+        chunk_size=args.chunk_size, checkpoint_path=args.checkpoint,
+        spike_chain=None if args.no_spike_filter else INGEST_CHAIN,
+    ).run(resume=args.resume)
+
+
+if __name__ == '__main__':
+    main()
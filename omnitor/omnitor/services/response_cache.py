@@ -0,0 +1,118 @@
+import os
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+# 웹 워커 프로세스마다 직렬화된 응답을 이 개수 / 바이트까지 보관 (오래 안 쓴 것부터 버림)
+MAX_ENTRIES = int(os.environ.get("OMNITOR_RESPONSE_CACHE_ENTRIES", "256"))
+MAX_BYTES = int(os.environ.get("OMNITOR_RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# 기간 조회 / 수정할 수 있는 일지: 매번 ETag로 확인 (바뀌지 않았으면 304)
+# 끝난 기간도 재계산 / 스풀 복구로 다시 쓸 수 있으므로 immutable은 쓰지 않음
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts):
+    """ 응답을 결정하는 값들 -> 강한 ETag ("...") """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+class ResponseCache:
+    """ 직렬화된 응답 본문의 LRU (키: 요청 + ETag, 값: (본문 바이트, Content-Type)) """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, content, content_type):
+        if len(content) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self.entries[key] = (content, content_type)
+            self.size += len(content)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, (dropped, _) = self.entries.popitem(last=False)
+                self.size -= len(dropped)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class ResponseCacheSingleton:
+    _instance = None
+    _lock = Lock()
+
+    @classmethod
+    def instance(cls) -> ResponseCache:
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ResponseCache()
+            return cls._instance
+
+
+def _set_headers(response, etag, last_modified, cache_control, vary):
+    response['ETag'] = etag
+    if vary:
+        patch_vary_headers(response, vary)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = cache_control
+    return response
+
+
+def cached_response(request, key, validator, build, last_modified=None, cache_control=REVALIDATE, vary=()):
+    """
+    조건부 GET + 프로세스 내 LRU
+
+    - key: 응답을 구분하는 값 (보통 경로 + 쿼리), validator: 데이터가 바뀌면 달라지는 값 (버전, 마지막 행 등)
+    - If-None-Match / If-Modified-Since 가 맞으면 쿼리 / 직렬화 없이 304
+    - 아니면 LRU에서 본문을 찾고, 없을 때만 build() 로 만듦 (200 응답만 캐시)
+    - vary: 응답이 달라지는 요청 헤더 (key 에도 반영되어 있어야 함)
+    """
+    etag = make_etag(key, validator)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+    not_modified = get_conditional_response(
+        request, etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified is not None else None,
+    )
+    if not_modified is not None:
+        return _set_headers(not_modified, etag, last_modified, cache_control, vary)
+
+    cache = ResponseCacheSingleton.instance()
+    entry = cache.get((key, etag))
+    if entry is not None:
+        response = HttpResponse(entry[0], content_type=entry[1])
+    else:
+        response = build()
+        if response.status_code != 200:
+            return response
+        cache.put((key, etag), response.content, response['Content-Type'])
+    return _set_headers(response, etag, last_modified, cache_control, vary)
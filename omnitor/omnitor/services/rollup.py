@@ -0,0 +1,182 @@
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+sys.path.append(root_dir)
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
+    django.setup()
+
+import numpy as np
+from django.db import transaction
+
+from omnitor.models import FinalData, FinalDataMinute, FinalDataHour, FinalDataDay, ROLLUP_FIELDS
+from services import archive
+from services.downsample import query_buckets
+
+# 가는 것부터 (원본 FinalData 다음 단계부터)
+LEVELS = [FinalDataMinute, FinalDataHour, FinalDataDay]
+
+# 버킷 번호 기준 시각 (naive 로컬 시각, 일 버킷이 자정에 맞도록)
+EPOCH = datetime(2000, 1, 1)
+
+AGG_FIELDS = [f"{field}_{kind}" for field in ROLLUP_FIELDS for kind in ('count', 'sum', 'min', 'max')]
+
+
+def _seconds(timestamps):
+    return np.array([(ts - EPOCH).total_seconds() for ts in timestamps], dtype=np.float64)
+
+
+def _aggregate(keys, values):
+    """
+    keys: 행별 버킷 번호, values: (행 수, 채널 수) NaN 배열
+    -> (버킷 번호 배열, count, sum, min, max (버킷 수, 채널 수))
+    """
+    buckets, inverse = np.unique(keys, return_inverse=True)
+    shape = (len(buckets), values.shape[1])
+    valid = ~np.isnan(values)
+
+    count = np.zeros(shape)
+    total = np.zeros(shape)
+    low = np.full(shape, np.nan)
+    high = np.full(shape, np.nan)
+    np.add.at(count, inverse, valid)
+    np.add.at(total, inverse, np.where(valid, values, 0.0))
+    np.fmin.at(low, inverse, values)   # fmin / fmax는 NaN을 무시
+    np.fmax.at(high, inverse, values)
+    return buckets, count, total, low, high
+
+
+def _none(v):
+    return None if v != v else v
+
+
+def merge_into(model, buckets, count, total, low, high):
+    """ 버킷별 부분 집계를 롤업 테이블의 기존 값과 합쳐서 upsert (한 트랜잭션) """
+    times = [EPOCH + timedelta(seconds=int(b) * model.resolution) for b in buckets]
+    with transaction.atomic():
+        existing = {
+            row[0]: row[1:]
+            for row in model.objects.filter(timestamp__in=times).values_list('timestamp', *AGG_FIELDS)
+        }
+        objs = []
+        for i, ts in enumerate(times):
+            values = {}
+            old = existing.get(ts)
+            for j, field in enumerate(ROLLUP_FIELDS):
+                c, s, lo, hi = count[i, j], total[i, j], low[i, j], high[i, j]
+                if old is not None:
+                    oc, os_, olo, ohi = old[4 * j:4 * j + 4]
+                    c += oc
+                    s += os_
+                    lo = np.fmin(lo, np.nan if olo is None else olo)
+                    hi = np.fmax(hi, np.nan if ohi is None else ohi)
+                values[f"{field}_count"] = int(c)
+                values[f"{field}_sum"] = float(s)
+                values[f"{field}_min"] = _none(float(lo))
+                values[f"{field}_max"] = _none(float(hi))
+            objs.append(model(timestamp=ts, **values))
+        model.objects.bulk_create(
+            objs, batch_size=500,
+            update_conflicts=True, unique_fields=['timestamp'], update_fields=AGG_FIELDS,
+        )
+
+
+def update_rollups(rows):
+    """
+    새로 저장한 FinalData 행들을 분/시간/일 롤업에 더함
+    BatchWriter(FinalData).on_flush 콜백으로 등록 — flush마다 몇 개 버킷만 upsert
+    """
+    if not rows:
+        return
+    seconds = _seconds([row.timestamp for row in rows])
+    values = np.array([[getattr(row, field) for field in ROLLUP_FIELDS] for row in rows], dtype=np.float64)
+    # 세 단계를 한 트랜잭션으로 (커밋 / fsync 한 번)
+    with transaction.atomic():
+        for model in LEVELS:
+            keys = np.floor(seconds / model.resolution).astype(np.int64)
+            merge_into(model, *_aggregate(keys, values))
+
+
+def _floor(ts, resolution):
+    return EPOCH + timedelta(seconds=(ts - EPOCH).total_seconds() // resolution * resolution)
+
+
+def rebuild(start, end, window=timedelta(days=1)):
+    """
+    [start, end) 를 덮는 롤업 버킷을 지우고 다시 계산
+    분 롤업은 FinalData (+ 보관 파일) 에서 DB GROUP BY로, 시간은 분 롤업에서, 일은 시간 롤업에서 만듦
+    window 단위로 나눠서 처리하므로 기간이 길어도 메모리 사용량은 일정
+    """
+    start = _floor(start, FinalDataDay.resolution)
+    source, rollup = FinalData, False
+    for model in LEVELS:
+        total = 0
+        cursor = start
+        while cursor < end:
+            upto = min(cursor + window, _floor(end, model.resolution) + timedelta(seconds=model.resolution))
+            if rollup:
+                buckets, columns = query_buckets(source.objects.all(), ROLLUP_FIELDS, cursor, upto, model.resolution, rollup=True)
+            else:
+                # 보관 파일로 옮겨진 기간도 분 롤업이 비지 않도록 함께 집계
+                buckets, columns = archive.query_buckets(source.objects.all(), ROLLUP_FIELDS, cursor, upto, model.resolution)
+            times = [cursor + timedelta(seconds=int(b) * model.resolution) for b in buckets]
+            objs = []
+            for i, ts in enumerate(times):
+                values = {}
+                for field in ROLLUP_FIELDS:
+                    c = columns[field]
+                    values[f"{field}_count"] = int(c['count'][i])
+                    values[f"{field}_sum"] = float(np.nan_to_num(c['sum'][i]))
+                    values[f"{field}_min"] = _none(float(c['min'][i]))
+                    values[f"{field}_max"] = _none(float(c['max'][i]))
+                objs.append(model(timestamp=ts, **values))
+            with transaction.atomic():
+                model.objects.filter(timestamp__gte=cursor, timestamp__lt=upto).delete()
+                model.objects.bulk_create(objs, batch_size=500)
+            total += len(objs)
+            cursor = upto
+        print(f"[Rollup] {model._meta.verbose_name}: {total}개 버킷 재계산")
+        source, rollup = model, True
+
+
+def pick_source(start, end, size):
+    """
+    size초 버킷으로 [start, end) 를 집계할 때 쓸 가장 거친 출처 (모델, 롤업 여부)
+    버킷 크기가 롤업 해상도의 배수이고 start / end 가 그 해상도에 맞아야 함
+    (end가 현재 이후면 end 뒤의 값이 있을 수 없으므로 맞지 않아도 됨)
+    """
+    now = datetime.now()
+    for model in reversed(LEVELS):
+        res = model.resolution
+        if size % res == 0 and _floor(start, res) == start and (end >= now or _floor(end, res) == end):
+            return model, True
+    return FinalData, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinalData 분/시간/일 롤업 재계산")
+    parser.add_argument("--start", help="시작 날짜 (YYYY-MM-DD, 기본: FinalData 첫 행)")
+    parser.add_argument("--end", help="끝 날짜 (YYYY-MM-DD, 제외, 기본: 지금)")
+    args = parser.parse_args()
+
+    if args.start:
+        start = datetime.fromisoformat(args.start)
+    else:
+        first = FinalData.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if first is None:
+            print("[Rollup] FinalData가 비어 있음")
+            return
+        start = first
+    end = datetime.fromisoformat(args.end) if args.end else datetime.now()
+    rebuild(start, end)
+
+
+if __name__ == '__main__':
+    main()
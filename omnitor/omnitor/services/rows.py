@@ -0,0 +1,51 @@
+import os
+from dataclasses import fields
+
+from omnitor.models import RawData
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
+root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
+
+# DB에 못 쓴 샘플을 보관할 스풀 파일
+SPOOL_PATH = os.environ.get("OMNITOR_SPOOL_PATH", os.path.join(root_dir, "spool", "rawdata.spool"))
+
+
+def merge_packets(samples):
+    """
+    아두이노 drain() 결과 [(monotonic_ts, DataPacket), ...] -> tick 하나의 값 (새 패킷이 없으면 None)
+    tick 사이에 패킷이 여러 개 들어왔으면 버리지 않고 항목별 평균 (tip_count는 누적 카운터라 마지막 값)
+    """
+    if not samples:
+        return None
+    packets = [packet for _, packet in samples]
+    if len(packets) == 1:
+        return packets[0]
+    merged = {f.name: sum(getattr(p, f.name) for p in packets) / len(packets) for f in fields(packets[0])}
+    merged['tip_count'] = packets[-1].tip_count
+    return type(packets[0])(**merged)
+
+
+def build_row(tick):
+    """ 같은 tick 경계에서 수집한 센서 값들을 RawData 한 행으로 """
+    row = RawData(timestamp=tick.timestamp)
+
+    arduino_data = tick.values.get('arduino')
+    if arduino_data:
+        row.air_temperature = arduino_data.air_temperature
+        row.air_humidity = arduino_data.air_humidity
+        row.co2 = int(arduino_data.co2)
+        row.insolation = arduino_data.insolation
+        row.weight_raw = int(arduino_data.weight_raw)
+        row.ph_raw = arduino_data.ph_voltage
+        row.ec_raw = arduino_data.ec_voltage
+        row.water_temperature = arduino_data.water_temperature
+        row.tip_count = int(arduino_data.tip_count)
+
+    soil_data = tick.values.get('soil')
+    if soil_data:
+        row.soil_temperature = soil_data.soil_temperature
+        row.soil_humidity = soil_data.soil_humidity
+        row.soil_ec = soil_data.soil_ec
+        row.soil_ph = soil_data.soil_ph
+
+    return row
@@ -1,6 +1,6 @@
 # 여기선 보정 계산만 해주고, 실제 언제 호출하고 저장하는지는 views에서 처리함
 
-from models import RawData, FinalData, CalibrationSettings
+from services.calibration_cache import save_calibration
 
 
 
@@ -11,12 +11,14 @@ def calibrate_weight(weight_real1, weight_real2, weight_filtered1, weight_filter
         weight_slope = (weight_real2 - weight_real1) / (weight_filtered2 - weight_filtered1)
         weight_intercept = weight_real1 - weight_slope * weight_filtered1
 
-        CalibrationSettings.objects.update_or_create(
-            id=1,
-            defaults={
-                'weight_slope': weight_slope,
-                'weight_intercept': weight_intercept
-            }
+        # 한 번의 UPDATE로 저장 + version 증가 (각 프로세스의 보정 계수 캐시가 다시 읽음)
+        save_calibration(
+            weight_real1=weight_real1,
+            weight_real2=weight_real2,
+            weight_filtered1=weight_filtered1,
+            weight_filtered2=weight_filtered2,
+            weight_slope=weight_slope,
+            weight_intercept=weight_intercept,
         )
     except ZeroDivisionError:
         return None, None
@@ -44,12 +46,13 @@ def calibrate_ph(ph_real1, ph_real2, ph_filtered1, ph_filtered2, temperature1, t
         ph_slope = (ph_temp2 - ph_temp1) / (ph_filtered2 - ph_filtered1)
         ph_intercept = ph_real1 - ph_slope * ph_filtered1
 
-        CalibrationSettings.objects.update_or_create(
-            id=1,
-            defaults={
-                'ph_slope': ph_slope,
-                'ph_intercept': ph_intercept
-            }
+        save_calibration(
+            ph_real1=ph_real1,
+            ph_real2=ph_real2,
+            ph_filtered1=ph_filtered1,
+            ph_filtered2=ph_filtered2,
+            ph_slope=ph_slope,
+            ph_intercept=ph_intercept,
         )
     except ZeroDivisionError:
         return None, None
@@ -78,12 +81,13 @@ def calibrate_ec(ec_real1, ec_real2, ec_filtered1, ec_filtered2, temperature1, t
         ec_intercept = ec_real1 - ec_slope * ec_filtered1
 
         # DB에 저장
-        CalibrationSettings.objects.update_or_create(
-            id=1,
-            defaults={
-                'ec_slope': ec_slope,
-                'ec_intercept': ec_intercept
-            }
+        save_calibration(
+            ec_real1=ec_real1,
+            ec_real2=ec_real2,
+            ec_filtered1=ec_filtered1,
+            ec_filtered2=ec_filtered2,
+            ec_slope=ec_slope,
+            ec_intercept=ec_intercept,
         )
 
     except ZeroDivisionError:
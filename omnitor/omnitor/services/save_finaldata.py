@@ -1,4 +1,58 @@
-from models import CalibrationSettings, FinalData
+from omnitor.models import FinalData
+from services.calibration_cache import get_coefficients
+
+# 보정 없이 그대로 옮기는 항목
+PASSTHROUGH_FIELDS = [
+    'air_temperature',
+    'air_humidity',
+    'co2',
+    'insolation',
+    'water_temperature',
+    'soil_temperature',
+    'soil_humidity',
+    'soil_ec',
+    'soil_ph',
+]
+
+# (필터링된 raw 항목, 최종 항목, 보정 계수 접두사)
+CALIBRATED_FIELDS = [
+    ('weight_raw', 'weight_final', 'weight'),
+    ('ph_raw', 'ph_final', 'ph'),
+    ('ec_raw', 'ec_final', 'ec'),
+]
+
+
+def load_calibration_settings():
+    """
+    현재 보정 계수 (CalibrationCoefficients) — 프로세스 캐시에서 가져오므로 보정 값이 바뀌었을 때만 DB 조회
+    """
+    return get_coefficients()
+
+
+def calc_final_data(filtered_data, settings, timestamp=None):
+    """
+    필터링 된 데이터에 보정 설정을 적용한 FinalData 인스턴스를 만듦 (저장은 하지 않음)
+    final = slope * filtered + intercept, 아직 보정하지 않은 항목(slope == 0)은 None
+    settings: CalibrationCoefficients 또는 CalibrationSettings (같은 속성 이름)
+    """
+    final = FinalData()
+    if timestamp is not None:
+        final.timestamp = timestamp
+
+    for field in PASSTHROUGH_FIELDS:
+        setattr(final, field, filtered_data.get(field))
+
+    for raw_field, final_field, prefix in CALIBRATED_FIELDS:
+        value = filtered_data.get(raw_field)
+        slope = getattr(settings, f"{prefix}_slope")
+        intercept = getattr(settings, f"{prefix}_intercept")
+        if value is None or not slope:
+            setattr(final, final_field, None)
+        else:
+            setattr(final, final_field, slope * value + intercept)
+
+    return final
+
 
 def calc_and_save_final_data(filtered_data):
     """
@@ -7,6 +61,8 @@ def calc_and_save_final_data(filtered_data):
 
     if not filtered_data:
         return None
-    
-    settings = CalibrationSettings.load()
-    
+
+    settings = load_calibration_settings()
+    final = calc_final_data(filtered_data, settings)
+    final.save()
+    return final
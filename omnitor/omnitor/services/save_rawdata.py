@@ -1,9 +1,9 @@
 import os
 import sys
 import time
+import signal
 import django
 import threading
-from datetime import datetime
 
 current_dir = os.path.dirname(os.path.abspath(__file__)) # service 폴더
 root_dir = os.path.dirname(current_dir) # 한 단계 위 dir
@@ -14,11 +14,35 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "omnitor.settings")
 django.setup()
 
 from omnitor.models import RawData # DB 모델
-from django.db import connection   # DB 연결 관리용
 from devices.arduino import SerialSingleton
 from devices.soil import SoilSensorSingleton
+from services.batch_writer import BatchWriter
+from services.rows import SPOOL_PATH, build_row, merge_packets
+from services.scheduler import RateScheduler
+from services.spool import SampleSpool, SpoolReplayer
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    # SIGTERM(systemctl stop 등)도 Ctrl+C와 같은 종료 경로를 타도록
+    raise KeyboardInterrupt
+
+
+# 센서별 수집 주기 (Hz)
+ARDUINO_RATE_HZ = 10    # 로드셀 등 아두이노 패킷
+SOIL_RATE_HZ = 0.2      # 토양 센서
+
 
 def sensor_loop():
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+
+    # 행마다 create + connection.close() 대신 모아서 bulk_create (연결 유지)
+    # DB가 잠기거나 죽어 있으면 스풀 파일에 적고, 복구되면 replayer가 옮김
+    spool = SampleSpool(SPOOL_PATH)
+    writer = BatchWriter(RawData, max_rows=100, max_delay=5.0, name="RawData Writer", spool=spool)
+    writer.start()
+    replayer = SpoolReplayer(spool)
+    replayer.start()
+
     arduino = SerialSingleton.instance()
 
     arduino.start()
@@ -26,43 +50,28 @@ def sensor_loop():
     soil = SoilSensorSingleton.instance()
     soil.start()
 
+    def sample_arduino(tick_ns):
+        # 지난 tick 이후 들어온 패킷을 모두 합친 값 (새 패킷이 없으면 이번 tick은 생략)
+        return merge_packets(arduino.drain())
+
+    def sample_soil(tick_ns):
+        return soil.read()
+
+    # sleep(1) 누적 드리프트 대신 monotonic 마감 시각 기준, tick 경계에 맞춘 timestamp
+    scheduler = RateScheduler(name="Sensor Scheduler")
+    scheduler.add('arduino', ARDUINO_RATE_HZ, sample_arduino)
+    scheduler.add('soil', SOIL_RATE_HZ, sample_soil)
 
-    while True:
-        try:
-            arduino_data = arduino.get_current_data()
-            soil_data = soil.read()
-
-            if arduino_data and soil_data:
-                RawData.objects.create(
-                    timestamp=datetime.now(),
-                    air_temperature=arduino_data.air_temperature,
-                    air_humidity=arduino_data.air_humidity,
-                    co2=int(arduino_data.co2),
-                    insolation=arduino_data.insolation,
-                    weight_raw=int(arduino_data.weight_raw),
-                    ph_voltage=arduino_data.ph_voltage,
-                    ec_voltage=arduino_data.ec_voltage,
-                    water_temperature=arduino_data.water_temperature,
-                    tip_count=int(arduino_data.tip_count),
-                    soil_temperature=soil_data.soil_temperature,
-                    soil_humidity=soil_data.soil_humidity,
-                    soil_ec=soil_data.soil_ec,
-                    soil_ph=soil_data.soil_ph
-                )
-
-                connection.close()
-            else:
-                pass
-            time.sleep(1)
-        
-        except Exception as e:
-            print(f"[Arduino Service] 오류 발생: {e}")
-            time.sleep(1)
-
-        except KeyboardInterrupt:
-            break
-    arduino.stop()
-    soil.stop()
+    try:
+        scheduler.run(lambda tick: writer.put(build_row(tick)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[Arduino Service] 종료: {scheduler.stats()}")
+        arduino.stop()
+        soil.stop()
+        writer.stop()
+        replayer.stop()
 
 if __name__ == '__main__':
     sensor_loop()
@@ -0,0 +1,121 @@
+import math
+import time
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+NS_PER_SEC = 1_000_000_000
+
+
+@dataclass
+class ScheduledTask:
+    name: str
+    period_ns: int
+    callback: object
+    next_tick: int = 0  # 다음 실행 시각 (monotonic ns)
+
+    # 통계
+    runs: int = 0
+    skipped: int = 0
+    errors: int = 0
+
+
+@dataclass
+class Tick:
+    """ 한 tick 경계에서 실행된 결과 """
+    timestamp: datetime           # tick 경계에 정렬된 실제 시각
+    monotonic_ns: int             # tick 경계의 monotonic 시각
+    values: dict = field(default_factory=dict)  # {task 이름: callback 반환값}
+
+
+class RateScheduler:
+    """
+    monotonic 기준 마감 시각으로 여러 주기의 작업을 돌리는 스케줄러 (sleep 누적 드리프트 없음)
+
+    - 작업마다 rate_hz 를 따로 지정, k번째 실행 시각은 anchor + k * period (정수 ns)
+    - anchor는 다음 정각 초에 맞추므로 tick 시각이 항상 12:00:00.000, .100, ... 처럼 정렬됨
+    - 같은 경계에 걸린 작업들은 한 Tick으로 묶여 on_tick에 전달
+    - 처리 시간이 다음 경계를 넘기면 overruns 증가, 한 주기 이상 밀린 슬롯은 실행하지 않고 skipped 로 집계
+    """
+
+    def __init__(self, name="Scheduler"):
+        self.name = name
+        self.tasks = []
+        self.stop_event = threading.Event()
+        self.anchor_ns = None
+        self.anchor_wall = None
+
+        # 통계
+        self.ticks = 0
+        self.overruns = 0
+
+    def add(self, name, rate_hz, callback):
+        """ callback(tick_monotonic_ns) 의 반환값이 Tick.values[name] 에 들어감 (None이면 생략) """
+        self.tasks.append(ScheduledTask(name=name, period_ns=round(NS_PER_SEC / rate_hz), callback=callback))
+
+    def _start_anchor(self):
+        wall_now = time.time()
+        mono_now = time.monotonic_ns()
+        anchor_wall = math.ceil(wall_now)
+        self.anchor_wall = anchor_wall
+        self.anchor_ns = mono_now + round((anchor_wall - wall_now) * NS_PER_SEC)
+        for task in self.tasks:
+            task.next_tick = self.anchor_ns
+
+    def wall_time(self, monotonic_ns):
+        """ tick 경계의 monotonic 시각을 실제 시각으로 변환 """
+        return datetime.fromtimestamp(self.anchor_wall + (monotonic_ns - self.anchor_ns) / NS_PER_SEC)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, on_tick):
+        """ stop() 또는 KeyboardInterrupt 까지 반복 """
+        if not self.tasks:
+            return
+        self.stop_event.clear()
+        self._start_anchor()
+
+        while not self.stop_event.is_set():
+            due_ns = min(task.next_tick for task in self.tasks)
+            wait = (due_ns - time.monotonic_ns()) / NS_PER_SEC
+            if wait > 0 and self.stop_event.wait(wait):
+                break
+
+            # 한 주기 이상 밀린 슬롯은 건너뛰고, 마지막으로 지난 경계에서 실행
+            now = time.monotonic_ns()
+            for task in self.tasks:
+                missed = (now - task.next_tick) // task.period_ns
+                if missed > 0:
+                    task.next_tick += missed * task.period_ns
+                    task.skipped += missed
+            due_ns = min(task.next_tick for task in self.tasks)
+
+            tick = Tick(timestamp=self.wall_time(due_ns), monotonic_ns=due_ns)
+            for task in self.tasks:
+                if task.next_tick != due_ns:
+                    continue
+                task.next_tick += task.period_ns
+                task.runs += 1
+                try:
+                    value = task.callback(due_ns)
+                except Exception as e:
+                    task.errors += 1
+                    print(f"[{self.name}] {task.name} 오류: {e}")
+                    continue
+                if value is not None:
+                    tick.values[task.name] = value
+
+            self.ticks += 1
+            if tick.values:
+                on_tick(tick)
+
+            if time.monotonic_ns() > min(task.next_tick for task in self.tasks):
+                self.overruns += 1
+
+    def stats(self):
+        return {
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'tasks': {t.name: {'runs': t.runs, 'skipped': t.skipped, 'errors': t.errors} for t in self.tasks},
+        }
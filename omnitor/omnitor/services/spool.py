@@ -0,0 +1,240 @@
+import os
+import math
+import time
+import zlib
+import struct
+import threading
+from datetime import datetime
+
+from django.db import connection, transaction, DatabaseError
+
+from omnitor.models import RawData
+from services import data_revision
+from services.filter import data as CHANNELS
+
+# 레코드: timestamp(float64, epoch 초) + 채널별 float32 (None은 NaN) + CRC32
+RECORD_BODY = struct.Struct("<d" + "f" * len(CHANNELS))
+RECORD_CRC = struct.Struct("<I")
+RECORD_SIZE = RECORD_BODY.size + RECORD_CRC.size
+
+NAN = float("nan")
+
+
+def float_channels(model):
+    """ 모델의 실수 값 필드 (RawData는 기존 스풀 파일과 같은 순서인 filter.data) """
+    if model is RawData:
+        return list(CHANNELS)
+    return [f.name for f in model._meta.fields if f.get_internal_type() == 'FloatField']
+
+
+def pack_row(row, channels=CHANNELS, body=RECORD_BODY):
+    values = [getattr(row, key) for key in channels]
+    packed = body.pack(row.timestamp.timestamp(), *[NAN if v is None else v for v in values])
+    return packed + RECORD_CRC.pack(zlib.crc32(packed))
+
+
+def unpack_record(record, model=RawData, channels=CHANNELS, body=RECORD_BODY):
+    """ 레코드 하나를 모델 인스턴스로, CRC가 맞지 않으면 None """
+    packed = record[:body.size]
+    (crc,) = RECORD_CRC.unpack_from(record, body.size)
+    if zlib.crc32(packed) != crc:
+        return None
+    ts, *values = body.unpack(packed)
+    row = model(timestamp=datetime.fromtimestamp(ts))
+    for key, value in zip(channels, values):
+        setattr(row, key, None if math.isnan(value) else value)
+    return row
+
+
+class SampleSpool:
+    """
+    DB에 쓰지 못한 행 (기본 RawData, FinalData 등 timestamp + 실수 필드 모델) 을 고정 크기 레코드로 이어 붙이는 로컬 스풀 파일
+
+    - append는 struct.pack + 버퍼 write 뿐이라 수 µs, flush_every개마다 OS로 flush
+    - 레코드마다 CRC32가 있어서 전원이 꺼져 잘린 마지막 레코드나 깨진 레코드는 건너뜀
+    - 어디까지 DB에 넣었는지는 <path>.offset 파일에 기록 (os.replace로 원자적 갱신)
+    """
+
+    def __init__(self, path, flush_every=16, model=RawData):
+        self.path = path
+        self.model = model
+        self.channels = float_channels(model)
+        self.body = struct.Struct("<d" + "f" * len(self.channels))
+        self.record_size = self.body.size + RECORD_CRC.size
+        self.on_replay = []  # 복구한 행 리스트를 받는 콜백 (커밋 후, 롤업 갱신 등)
+        self.offset_path = f"{path}.offset"
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.file = None
+        self.unflushed = 0
+
+        # 통계
+        self.appended = 0
+        self.replayed = 0
+        self.duplicates = 0
+        self.corrupt = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.path, "ab")
+
+    def append(self, rows):
+        with self.lock:
+            self._open()
+            for row in rows:
+                self.file.write(pack_row(row, self.channels, self.body))
+            self.appended += len(rows)
+            self.unflushed += len(rows)
+            if self.unflushed >= self.flush_every:
+                self.file.flush()
+                self.unflushed = 0
+
+    def flush(self, sync=False):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+                if sync:
+                    os.fsync(self.file.fileno())
+            self.unflushed = 0
+
+    def close(self):
+        self.flush(sync=True)
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def read_offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def write_offset(self, offset):
+        tmp = f"{self.offset_path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.offset_path)
+
+    def pending(self):
+        """ 아직 DB에 넣지 않은 바이트 수 """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        return max(0, size - self.read_offset())
+
+    def read_batch(self, offset, max_records):
+        """ offset부터 완전한 레코드만 읽어서 (rows, 다음 offset) 반환 """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(max_records * self.record_size)
+        except FileNotFoundError:
+            return [], offset
+
+        whole = len(chunk) - len(chunk) % self.record_size
+        rows = []
+        for pos in range(0, whole, self.record_size):
+            row = unpack_record(chunk[pos:pos + self.record_size], self.model, self.channels, self.body)
+            if row is None:
+                self.corrupt += 1
+                continue
+            rows.append(row)
+        return rows, offset + whole
+
+    def replay(self, batch_size=1000):
+        """
+        스풀된 레코드를 모델 테이블에 bulk_create (이미 같은 timestamp 행이 있으면 건너뜀)
+        DB 오류 시 offset을 그대로 두고 예외를 올림, 넣은 행 수를 반환
+        """
+        self.flush()
+        offset = self.read_offset()
+        total = 0
+        while True:
+            rows, next_offset = self.read_batch(offset, batch_size)
+            if next_offset == offset:
+                break
+
+            if rows:
+                # offset 기록 전에 죽었다가 다시 돌아도 중복 저장되지 않도록 timestamp로 확인
+                existing = set(self.model.objects.filter(
+                    timestamp__gte=min(r.timestamp for r in rows),
+                    timestamp__lte=max(r.timestamp for r in rows),
+                ).values_list("timestamp", flat=True))
+                fresh = [r for r in rows if r.timestamp not in existing]
+                self.duplicates += len(rows) - len(fresh)
+                with transaction.atomic():
+                    self.model.objects.bulk_create(fresh, batch_size=500)
+                total += len(fresh)
+                for callback in self.on_replay:
+                    try:
+                        callback(fresh)
+                    except Exception as e:
+                        print(f"[Spool] 복구 콜백 오류: {e}")
+
+            self.write_offset(next_offset)
+            offset = next_offset
+
+        self.replayed += total
+        if total:
+            # 이미 응답한 (끝난) 기간에 행이 들어갔을 수 있으므로 기간 조회 캐시를 무효화
+            data_revision.bump()
+        self._truncate_if_done()
+        return total
+
+    def _truncate_if_done(self):
+        """ 모두 DB에 넣었으면 파일을 비움 (append와 겹치지 않도록 lock 안에서) """
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                return
+            if size and self.read_offset() >= size - size % self.record_size:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                os.truncate(self.path, 0)
+                self.write_offset(0)
+
+
+class SpoolReplayer:
+    """ DB가 다시 쓸 수 있게 되면 스풀 내용을 DB로 옮기는 백그라운드 스레드 """
+
+    def __init__(self, spool, interval=30.0):
+        self.spool = spool
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.spool.pending():
+                try:
+                    count = self.spool.replay()
+                    if count:
+                        print(f"[Spool] {count}행 DB로 복구")
+                except DatabaseError as e:
+                    print(f"[Spool] DB 아직 사용 불가: {e}")
+                    connection.close()
+            self.stop_event.wait(self.interval)
+        connection.close()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # tests 폴더
+root_dir = os.path.dirname(current_dir) # omnitor 앱 폴더 ('devices', 'services', 'bench')
+
+repo_dir = os.path.dirname(os.path.dirname(root_dir)) # 저장소 최상위
+
+# 저장소 최상위에서 python -m pytest 로 실행하면 그 폴더가 sys.path에 들어가서
+# 'omnitor' 가 두 폴더에 걸친 namespace 패키지가 되므로 (Django가 앱 경로를 정하지 못함) 뺌
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != repo_dir]
+sys.path.append(os.path.join(root_dir, "bench"))
+
+import django_env
+
+# 서비스 모듈들이 import 할 때 모델을 쓰므로 테스트 모듈을 모으기 전에 임시 SQLite DB로 Django 설정
+django_env.setup()
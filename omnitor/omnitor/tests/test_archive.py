@@ -0,0 +1,43 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.db import transaction
+
+from omnitor.models import FinalData
+from services import downsample
+from services.archive import DayArchive, archive_day, to_us
+
+DAY = date(2025, 1, 1)
+START = datetime(2025, 1, 1)
+
+
+def test_save_merges_and_replaces_same_timestamps(tmp_path):
+    archive = DayArchive(FinalData, str(tmp_path))
+    first = to_us([START + timedelta(seconds=s) for s in (0, 10, 20)])
+    archive.save(DAY, first, {f: np.array([1.0, 2.0, 3.0]) for f in archive.fields})
+    second = to_us([START + timedelta(seconds=s) for s in (5, 20)])
+    archive.save(DAY, second, {f: np.array([4.0, 9.0]) for f in archive.fields})
+
+    timestamps, columns = archive.load(DAY)
+    np.testing.assert_array_equal(timestamps, to_us([START + timedelta(seconds=s) for s in (0, 5, 10, 20)]))
+    np.testing.assert_array_equal(columns['co2'], [1.0, 4.0, 2.0, 9.0])
+
+
+def test_archive_day_moves_rows_and_buckets_match(tmp_path):
+    with transaction.atomic():
+        FinalData.objects.bulk_create([
+            FinalData(timestamp=START + timedelta(seconds=7 * i), co2=(None if i % 5 == 0 else 400.0 + i))
+            for i in range(3000)
+        ])
+    fields = ['co2']
+    end = START + timedelta(days=1)
+    live = downsample.query_buckets(FinalData.objects.all(), fields, START, end, 600)
+
+    archive = DayArchive(FinalData, str(tmp_path))
+    assert archive_day(FinalData, DAY, archive, chunk_size=256) == 3000
+    assert not FinalData.objects.filter(timestamp__gte=START, timestamp__lt=end).exists()
+
+    archived = archive.query_buckets(fields, START, end, 600)
+    np.testing.assert_array_equal(archived[0], live[0])
+    for kind in ('count', 'sum', 'min', 'max'):
+        np.testing.assert_allclose(archived[1]['co2'][kind], live[1]['co2'][kind], rtol=1e-5)
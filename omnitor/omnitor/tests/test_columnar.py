@@ -0,0 +1,31 @@
+import numpy as np
+
+from services import columnar
+
+
+def test_encode_decode_roundtrip():
+    ms = np.array([0, 1000, 2000, 5000], dtype=np.int64) + 1_700_000_000_000
+    columns = {'co2': [400.0, np.nan, 410.5, 420.0], 'ph_final': [6.5, 6.6, 6.7, 6.8]}
+    tables = columnar.decode(columnar.encode_table(ms, columns, meta={'bucket': 1}))
+    assert len(tables) == 1
+    decoded_ms, decoded, meta = tables[0]
+    np.testing.assert_array_equal(decoded_ms, ms)
+    assert meta['channels'] == ['co2', 'ph_final'] and meta['bucket'] == 1
+    for name, values in columns.items():
+        np.testing.assert_allclose(decoded[name], np.asarray(values, dtype=np.float32), equal_nan=True)
+
+
+def test_unit_scales_deltas():
+    ms = np.arange(5, dtype=np.int64) * 60_000
+    data = columnar.encode_table(ms, {'x': np.arange(5.0)}, unit=60_000)
+    decoded_ms, _, _ = columnar.decode(data)[0]
+    np.testing.assert_array_equal(decoded_ms, ms)
+
+
+def test_large_gap_splits_tables():
+    gap = (columnar.INT32_MAX + 1) * 2
+    ms = np.array([0, 10, gap, gap + 10], dtype=np.int64)
+    tables = columnar.decode(columnar.encode_table(ms, {'x': [1.0, 2.0, 3.0, 4.0]}))
+    assert len(tables) == 2
+    np.testing.assert_array_equal(np.concatenate([t[0] for t in tables]), ms)
+    np.testing.assert_array_equal(np.concatenate([t[1]['x'] for t in tables]), [1.0, 2.0, 3.0, 4.0])
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from services.downsample import NICE_BUCKETS, bucket_seconds, bucket_times, lttb, merge_buckets
+
+
+def test_bucket_seconds_is_smallest_nice_size():
+    start = datetime(2025, 1, 1)
+    assert bucket_seconds(start, start + timedelta(hours=1), 3600) == 1
+    assert bucket_seconds(start, start + timedelta(hours=1), 500) == 10
+    assert bucket_seconds(start, start + timedelta(days=1), 500) == 300
+    for points in (7, 100, 1000):
+        size = bucket_seconds(start, start + timedelta(days=3), points)
+        assert size in NICE_BUCKETS
+        assert 3 * 86400 / size <= points
+
+
+def test_bucket_times():
+    start = datetime(2025, 1, 1)
+    assert bucket_times(start, 60, np.array([0, 2])) == [start, start + timedelta(minutes=2)]
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    y[437] = 10.0
+    selected = lttb(x, y, 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+    assert 437 in selected
+
+
+def test_lttb_returns_all_when_below_threshold():
+    x = np.arange(10, dtype=np.float64)
+    np.testing.assert_array_equal(lttb(x, x, 20), np.arange(10))
+
+
+def test_merge_buckets():
+    def part(buckets, count, total, low, high):
+        return np.array(buckets), {'x': {'count': np.array(count, float), 'sum': np.array(total, float),
+                                         'min': np.array(low, float), 'max': np.array(high, float)}}
+
+    a = part([0, 2], [2, 1], [3.0, 5.0], [1.0, 5.0], [2.0, 5.0])
+    b = part([2, 3], [1, 0], [1.0, np.nan], [1.0, np.nan], [1.0, np.nan])
+    buckets, merged = merge_buckets(a, b, ['x'])
+    np.testing.assert_array_equal(buckets, [0, 2, 3])
+    np.testing.assert_array_equal(merged['x']['count'], [2, 2, 0])
+    np.testing.assert_array_equal(merged['x']['sum'], [3.0, 6.0, 0.0])
+    np.testing.assert_array_equal(merged['x']['min'][:2], [1.0, 1.0])
+    np.testing.assert_array_equal(merged['x']['max'][:2], [2.0, 5.0])
+    assert np.isnan(merged['x']['min'][2])
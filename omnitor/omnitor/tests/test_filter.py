@@ -0,0 +1,73 @@
+import numpy as np
+
+from services.filter import MovingAverageState
+from services.filter_bank import DEFAULT_CHAIN, INGEST_CHAIN, INGEST_CHANNELS, FilterBank, to_dict
+
+KEYS = ['a', 'b', 'soil']
+
+
+def sparse_samples(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n, len(KEYS)))
+    values[rng.random(values.shape) < 0.5] = np.nan
+    values[:, 2] = np.nan
+    values[::10, 2] = 5.0          # 주기가 느린 센서
+    values[200:300, 1] = np.nan    # max_age보다 긴 공백
+    timestamps = 1.7e9 + np.arange(n) * 0.5
+    return values, timestamps
+
+
+def streamed(values, timestamps):
+    state = MovingAverageState(keys=KEYS)
+    out = []
+    for row, ts in zip(values, timestamps):
+        state.update({key: (None if np.isnan(v) else v) for key, v in zip(KEYS, row)}, ts)
+        out.append([np.nan if v is None else v for v in state.current(now=ts).values()])
+    return np.array(out), state
+
+
+def test_process_batch_matches_update_current():
+    values, timestamps = sparse_samples()
+    expected, live = streamed(values, timestamps)
+
+    state = MovingAverageState(keys=KEYS)
+    out = np.concatenate([
+        state.process_batch(values[lo:lo + 97], timestamps[lo:lo + 97]) for lo in range(0, len(values), 97)
+    ])
+    np.testing.assert_allclose(out, expected, equal_nan=True)
+    # 끝난 뒤 상태도 같아서 이어서 update() 해도 같은 값
+    for key in KEYS:
+        assert list(state.windows[key]) == list(live.windows[key])
+        assert state.last_seen[key] == live.last_seen[key]
+
+
+def test_slow_channel_is_not_diluted():
+    values, timestamps = sparse_samples()
+    out, _ = streamed(values, timestamps)
+    assert np.all(out[:, 2] == 5.0)
+    # 공백이 max_age보다 길면 None
+    assert np.isnan(out[290, 1])
+
+
+def test_filter_bank_batch_chunks_match_whole():
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=(500, 13))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    whole = FilterBank(DEFAULT_CHAIN).process_batch(x)
+    bank = FilterBank(DEFAULT_CHAIN)
+    chunked = np.concatenate([bank.process_batch(x[lo:lo + 33]) for lo in range(0, len(x), 33)])
+    np.testing.assert_allclose(chunked, whole, equal_nan=True)
+
+
+def test_filter_bank_streaming_matches_batch():
+    rng = np.random.default_rng(3)
+    x = np.column_stack([82000 + rng.normal(size=300) * 5, 1.2 + rng.normal(size=300) * 0.01])
+    x[rng.random(300) < 0.05, 0] += 500000  # 로드셀 스파이크
+    x[::4] = np.nan                          # 새 패킷이 없던 tick
+
+    batch = FilterBank(INGEST_CHAIN, channels=INGEST_CHANNELS).process_batch(x)
+    bank = FilterBank(INGEST_CHAIN, channels=INGEST_CHANNELS)
+    for row, expected in zip(x, batch):
+        sample = {key: (None if np.isnan(v) else v) for key, v in zip(INGEST_CHANNELS, row)}
+        assert bank.process(sample) == to_dict(expected, INGEST_CHANNELS)
+    assert np.nanmax(batch[:, 0]) < 100000
@@ -0,0 +1,82 @@
+import random
+
+from devices.crc import crc16_modbus
+from devices.framer import PACKET_HEADER, PacketFramer
+
+
+def frame(payload):
+    body = PACKET_HEADER + bytes([len(payload)]) + payload
+    crc = crc16_modbus(body)
+    return body + bytes([crc & 0xFF, crc >> 8])
+
+
+def extract_all(framer):
+    payloads = []
+    while True:
+        payload = framer.extract_packet()
+        if payload is None:
+            return payloads
+        payloads.append(bytes(payload))
+
+
+def test_crc16_modbus_check_value():
+    assert crc16_modbus(b"123456789") == 0x4B37
+
+
+def test_crc16_modbus_is_incremental():
+    data = bytes(range(50))
+    assert crc16_modbus(data[20:], crc16_modbus(data[:20])) == crc16_modbus(data)
+
+
+def test_frames_split_across_feeds():
+    payloads = [bytes([i]) * (i % 40 + 1) for i in range(100)]
+    stream = b"".join(frame(p) for p in payloads)
+    framer = PacketFramer()
+    got = []
+    for i in range(0, len(stream), 7):
+        framer.feed(stream[i:i + 7])
+        got += extract_all(framer)
+    assert got == payloads
+    assert framer.crc_errors == 0
+
+
+def test_resync_after_noise_and_bad_crc():
+    good = [b"first", b"second", b"third"]
+    corrupt = bytearray(frame(b"corrupt"))
+    corrupt[-1] ^= 0xFF
+    stream = b"\x00\x13\xAA" + frame(good[0]) + bytes(corrupt) + b"\x55\xAA" + frame(good[1]) + frame(good[2])
+    framer = PacketFramer()
+    framer.feed(stream)
+    assert extract_all(framer) == good
+    assert framer.crc_errors >= 1
+
+
+def test_header_split_at_chunk_boundary():
+    data = frame(b"payload")
+    framer = PacketFramer()
+    framer.feed(b"\x01\x02" + data[:1])
+    assert framer.extract_packet() is None
+    framer.feed(data[1:])
+    assert extract_all(framer) == [b"payload"]
+
+
+def test_oversized_length_does_not_drop_following_frames():
+    rng = random.Random(0)
+    payloads = []
+    stream = bytearray()
+    for _ in range(500):
+        if rng.random() < 0.2:
+            # 버퍼(64)에 다 들어갈 수 없는 길이를 가진 깨진 헤더
+            stream += PACKET_HEADER + bytes([rng.randrange(60, 256)])
+        payload = bytes(rng.randrange(1, 255) for _ in range(20))
+        payloads.append(payload)
+        stream += frame(payload)
+
+    framer = PacketFramer(capacity=64)
+    got = []
+    for i in range(0, len(stream), 7):
+        framer.feed(stream[i:i + 7])
+        got += extract_all(framer)
+    assert got == payloads
+    assert framer.overflow_bytes == 0
+    assert framer.length_errors > 0
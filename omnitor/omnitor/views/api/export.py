@@ -0,0 +1,80 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import path
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # api 폴더
+root_dir = os.path.dirname(os.path.dirname(current_dir)) # 'services' 가 보이는 폴더
+
+sys.path.append(root_dir)
+
+from services.archive import channels
+from services.columnar import wants_columns
+from services.export import MODELS, FORMATS, export
+
+# 내보낸 파일 확장자 (format 이름과 다른 것만)
+EXTENSIONS = {
+    'columns': 'omts',
+}
+
+
+def api_setting(request):
+    handlers = {
+        "GET": get_handler,
+    }
+
+    handler = handlers.get(request.method)
+    if handler is None:
+        return HttpResponseBadRequest("Only GET requests are allowed.")
+
+    return handler(request)
+
+api_path = path('export/', api_setting, name='export')
+
+
+def get_handler(request):
+    """
+    GET /export/?model=final&start_date=2025-01-01&end_date=2025-03-31&fields=ph_final,ec_final&format=csv&gzip=1
+    DB / 보관 파일에서 chunk 단위로 읽어서 바로 내보내므로 기간이 길어도 메모리 사용량은 일정
+    """
+    model = MODELS.get(request.GET.get('model', 'final'))
+    if model is None:
+        return HttpResponseBadRequest(f"model must be one of: {', '.join(sorted(MODELS))}")
+
+    # format을 주지 않으면 Accept 로 결정 (바이너리 컬럼을 받겠다고 하면 columns, 아니면 csv)
+    fmt = request.GET.get('format') or ('columns' if wants_columns(request) else 'csv')
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest(f"format must be one of: {', '.join(sorted(FORMATS))}")
+
+    start_str = request.GET.get('start_date')
+    end_str = request.GET.get('end_date')
+    if not start_str:
+        return HttpResponseBadRequest("start_date parameter is required.")
+    try:
+        start = datetime.fromisoformat(start_str)
+        end = datetime.fromisoformat(end_str) if end_str else datetime.now()
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS.")
+    if end_str and len(end_str) == 10:
+        end += timedelta(days=1)  # 날짜만 주면 그날까지 포함
+
+    available = channels(model)
+    fields = [f for f in request.GET.get('fields', '').split(',') if f] or available
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        return HttpResponseBadRequest(f"Unknown fields: {', '.join(unknown)}")
+
+    compress = request.GET.get('gzip') in ('1', 'true')
+    _, content_type = FORMATS[fmt]
+    extension = EXTENSIONS.get(fmt, fmt)
+    filename = f"{model._meta.model_name}_{start:%Y%m%d}_{end:%Y%m%d}.{extension}" + (".gz" if compress else "")
+
+    response = StreamingHttpResponse(export(model, start, end, fields, fmt, compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Vary'] = 'Accept'
+    if compress:
+        # 파일 자체가 .gz 이므로 Content-Encoding은 붙이지 않음 (브라우저가 풀지 않고 그대로 저장)
+        response['Content-Type'] = 'application/gzip'
+    return response
@@ -1,46 +1,88 @@
-import datetime
 import json
 import os
+import sys
+import calendar
+from datetime import datetime, date, timedelta
 
 from django.http import JsonResponse, HttpResponseBadRequest, HttpRequest
 from django.contrib.staticfiles.storage import staticfiles_storage
 
 from django.urls import path
 
+current_dir = os.path.dirname(os.path.abspath(__file__)) # api 폴더
+root_dir = os.path.dirname(os.path.dirname(current_dir)) # 'services' 가 보이는 폴더
+
+sys.path.append(root_dir)
+
+from omnitor.models import FarmJournal
+from services.journal_images import ImageIndexSingleton, capture_time
+from services.response_cache import cached_response
 
 BASE_DIR_GOMOJANG = os.path.expanduser("~/gomojang/omnitor") 
 CONFIG_FILE_PATH = os.path.join(BASE_DIR_GOMOJANG, "camera_config.json")
 
+JOURNAL_FIELDS = ['farm_work', 'pesticide', 'fertilizer', 'harvest', 'notes']
+
+# 달력 조회 한 번에 허용하는 최대 일수
+MAX_RANGE_DAYS = 366
+
 def api_setting(request):
     handlers = {
         "GET": get_handler,
+        "POST": post_handler,
     }
 
     handler = handlers.get(request.method)
     if handler is None:
-        return HttpResponseBadRequest("Only POST requests are allowed.")
+        return HttpResponseBadRequest("Only GET and POST requests are allowed.")
 
     return handler(request)
 
-api_path = path('calibration_api/', api_setting, name='calibration_api')
+api_path = path('journal_entry/', api_setting, name='journal_entry')
+
+def image_info(shots):
+    """ {위치: (파일 이름, mtime)} -> {위치: {'url', 'capture_time'}} (L / C / R) """
+    return {
+        position: {
+            'url': staticfiles_storage.url(os.path.join('omnitor', 'journal_images', name)),
+            'capture_time': capture_time(mtime),
+        }
+        for position, (name, mtime) in sorted(shots.items())
+    }
 
 def get_handler(request):
+    """
+    GET /journal_entry/?date=YYYY-MM-DD : 하루 일지 + 사진 (L / C / R)
+    GET /journal_entry/?month=YYYY-MM (또는 start_date=...&end_date=..., 둘 다 포함) : 달력용 기간 요약
+    사진 정보는 요청마다 stat 하지 않고 ImageIndex (폴더 mtime으로 갱신하는 메모리 색인) 에서 읽음
+    """
+    if request.GET.get('date'):
+        return day_handler(request)
+    return range_handler(request)
+
+def day_handler(request):
     date_str = request.GET.get('date')
-    if not date_str: return HttpResponseBadRequest("Date parameter is required.")
-    image_name = f"{date_str}.jpg"
-    image_relative_path = os.path.join('omnitor', 'journal_images', image_name)
-    image_url = staticfiles_storage.url(image_relative_path)
-    image_capture_time_str = None
     try:
-        full_image_path = os.path.join(IMAGE_FILES_DIRECTORY, image_name)
-        if os.path.exists(full_image_path):
-            mtime = os.path.getmtime(full_image_path)
-            image_capture_time = datetime.fromtimestamp(mtime)
-            image_capture_time_str = image_capture_time.strftime('%H:%M:%S')
-    except Exception as e:
-        print(f"Error getting image mtime for {date_str}: {e}")
+        day = date.fromisoformat(date_str)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
+
+    shots = ImageIndexSingleton.instance().get(day)
+    updated_at = FarmJournal.objects.filter(date=day).values_list('updated_at', flat=True).first()
+    modified = [updated_at] + [datetime.fromtimestamp(mtime) for _, mtime in shots.values()]
+    return cached_response(
+        request, ('journal_entry', day), (updated_at, sorted(shots.items())),
+        lambda: build_entry(day, shots),
+        last_modified=max(filter(None, modified), default=None),
+    )
+
+def build_entry(day, shots):
+    images = image_info(shots)
+    center = images.get('C', {})
+    image_url = center.get('url')
+    image_capture_time_str = center.get('capture_time')
     try:
-        entry = FarmJournal.objects.get(date=date_str)
+        entry = FarmJournal.objects.get(date=day)
         return JsonResponse({
             'status': 'found',
             'farm_work': entry.farm_work,
@@ -49,14 +91,68 @@ def get_handler(request):
             'harvest': entry.harvest,
             'notes': entry.notes,
             'image_url': image_url,
-            'image_capture_time': image_capture_time_str
+            'image_capture_time': image_capture_time_str,
+            'images': images,
         })
     except FarmJournal.DoesNotExist:
-        return JsonResponse({'status': 'not_found', 'image_url': image_url, 'image_capture_time': image_capture_time_str})
+        return JsonResponse({'status': 'not_found', 'image_url': image_url, 'image_capture_time': image_capture_time_str, 'images': images})
     except Exception as e:
-        print(f"Error fetching journal entry for {date_str}: {e}")
+        print(f"Error fetching journal entry for {day}: {e}")
         return JsonResponse({'status': 'error', 'message': 'Failed to retrieve journal entry.'}, status=500)
 
+def parse_days(request):
+    """ month=YYYY-MM 또는 start_date / end_date (YYYY-MM-DD) -> (첫날, 마지막 날) """
+    month_str = request.GET.get('month')
+    if month_str:
+        try:
+            first = datetime.strptime(month_str, '%Y-%m').date()
+        except ValueError:
+            raise ValueError("month must be in YYYY-MM format.") from None
+        return first, first.replace(day=calendar.monthrange(first.year, first.month)[1])
+    start_str = request.GET.get('start_date')
+    end_str = request.GET.get('end_date')
+    if not start_str or not end_str:
+        raise ValueError("date, month or start_date & end_date parameter is required.")
+    try:
+        start, end = date.fromisoformat(start_str), date.fromisoformat(end_str)
+    except ValueError:
+        raise ValueError("start_date and end_date must be in YYYY-MM-DD format.") from None
+    if end < start:
+        raise ValueError("end_date must not be before start_date.")
+    if end - start >= timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f"Range must be at most {MAX_RANGE_DAYS} days.")
+    return start, end
+
+def range_handler(request):
+    try:
+        start, end = parse_days(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    # 기간의 일지 전부를 쿼리 한 번으로 (date가 기본 키라 범위 조회)
+    rows = list(FarmJournal.objects.filter(date__range=(start, end)).order_by('date').values('date', 'updated_at', *JOURNAL_FIELDS))
+    shots = ImageIndexSingleton.instance().between(start, end)
+
+    modified = [row['updated_at'] for row in rows]
+    modified += [datetime.fromtimestamp(mtime) for day_shots in shots.values() for _, mtime in day_shots.values()]
+    validator = ([(row['date'], row['updated_at']) for row in rows], sorted((day, sorted(s.items())) for day, s in shots.items()))
+    return cached_response(
+        request, ('journal_range', start, end), validator,
+        lambda: build_range(start, end, rows, shots),
+        last_modified=max(filter(None, modified), default=None),
+    )
+
+def build_range(start, end, rows, shots):
+    """ 일지나 사진이 있는 날만 {날짜: {'entry': {...} 또는 None, 'images': {...}}} """
+    entries = {row['date']: {field: row[field] for field in JOURNAL_FIELDS} for row in rows}
+    days = {}
+    for day in sorted(set(entries) | set(shots)):
+        days[day.isoformat()] = {
+            'entry': entries.get(day),
+            'images': image_info(shots.get(day, {})),
+        }
+    return JsonResponse({'status': 'success', 'start': start.isoformat(), 'end': end.isoformat(), 'days': days})
+
 def post_handler(request):
     try:
         data = json.loads(request.body)
@@ -69,7 +165,8 @@ def post_handler(request):
         except ValueError:
             return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
 
-        allowed_fields = {'work', 'pesticide', 'fertilizer', 'harvest', 'notes'}
+        # 검색 색인 (services/journal_search.py) 은 SQLite 트리거가 같이 갱신함
+        allowed_fields = set(JOURNAL_FIELDS)
         defaults_data = {k: v for k, v in data.items() if k in allowed_fields}
 
         entry, created = FarmJournal.objects.update_or_create(date=date_str, defaults=defaults_data)
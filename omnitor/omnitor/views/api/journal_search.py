@@ -0,0 +1,60 @@
+import os
+import sys
+from datetime import date
+
+from django.http import JsonResponse, HttpResponseBadRequest
+from django.urls import path
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # api 폴더
+root_dir = os.path.dirname(os.path.dirname(current_dir)) # 'services' 가 보이는 폴더
+
+sys.path.append(root_dir)
+
+from services.journal_search import search
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def api_setting(request):
+    handlers = {
+        "GET": get_handler,
+    }
+
+    handler = handlers.get(request.method)
+    if handler is None:
+        return HttpResponseBadRequest("Only GET requests are allowed.")
+
+    return handler(request)
+
+api_path = path('journal_search/', api_setting, name='journal_search')
+
+
+def get_handler(request):
+    """
+    GET /journal_search/?q=농약*&start_date=2024-01-01&end_date=2025-12-31&limit=50
+    농장 일지 (작업 / 농약 / 비료 / 수확 / 메모) 전문 검색, 관련도 순
+    - 공백으로 나눈 단어는 모두 포함, 끝에 * 를 붙이면 접두어 검색
+    - start_date / end_date 는 둘 다 포함, 생략 가능
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return HttpResponseBadRequest("q parameter is required.")
+    try:
+        start = date.fromisoformat(request.GET['start_date']) if request.GET.get('start_date') else None
+        end = date.fromisoformat(request.GET['end_date']) if request.GET.get('end_date') else None
+        limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid parameters. Dates must be YYYY-MM-DD and limit a number.")
+    if limit < 1:
+        return HttpResponseBadRequest("limit must be positive.")
+
+    try:
+        results = search(query, start, end, limit)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    except Exception as e:
+        print(f"Error searching journal for {query!r}: {e}")
+        return JsonResponse({'status': 'error', 'message': 'Failed to search journal.'}, status=500)
+
+    return JsonResponse({'status': 'success', 'query': query, 'count': len(results), 'results': results})
@@ -0,0 +1,69 @@
+import os
+import sys
+
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import path
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # api 폴더
+root_dir = os.path.dirname(os.path.dirname(current_dir)) # 'services' 가 보이는 폴더
+
+sys.path.append(root_dir)
+
+from services.live_feed import LiveFeedClientSingleton
+
+# 이 시간 동안 새 값이 없으면 SSE는 keepalive 주석을, long-poll은 빈 응답을 보냄
+KEEPALIVE_SECONDS = 15
+MAX_POLL_SECONDS = 30
+
+
+def api_setting(request):
+    handlers = {
+        "GET": get_handler,
+    }
+
+    handler = handlers.get(request.method)
+    if handler is None:
+        return HttpResponseBadRequest("Only GET requests are allowed.")
+
+    return handler(request)
+
+api_path = path('live/', api_setting, name='live')
+
+
+def event_stream(client, after):
+    """ 새 스냅샷마다 SSE 이벤트 하나 (수집 파이프라인이 만든 JSON 바이트를 그대로 보냄) """
+    yield b"retry: 3000\n\n"
+    while True:
+        seq, data = client.wait(after, timeout=KEEPALIVE_SECONDS)
+        if data is None:
+            yield b": keepalive\n\n"
+            continue
+        after = seq
+        yield b"id: %d\ndata: %s\n\n" % (seq, data)
+
+
+def get_handler(request):
+    """
+    GET /live/ : 대시보드용 Server-Sent Events (접속하면 최신 값부터, 이후 샘플마다 한 번)
+    GET /live/?after=<seq>&timeout=25 : SSE를 못 쓰는 곳을 위한 long-poll
+    DB 조회 / 필터 / 보정 없이 수집 파이프라인이 보낸 스냅샷을 모든 탭이 나눠 씀
+    """
+    client = LiveFeedClientSingleton.instance()
+    try:
+        # 브라우저가 다시 연결하면 마지막으로 받은 id를 Last-Event-ID로 보냄
+        # (id는 수집 파이프라인이 매긴 seq라서 다른 웹 워커에 다시 붙어도 이어짐)
+        after = int(request.GET.get('after', request.headers.get('Last-Event-ID', 0)))
+        timeout = min(float(request.GET.get('timeout', MAX_POLL_SECONDS)), MAX_POLL_SECONDS)
+    except ValueError:
+        return HttpResponseBadRequest("after and timeout must be numbers.")
+
+    if 'after' in request.GET:
+        seq, data = client.wait(after, timeout=timeout)
+        if data is None:
+            return HttpResponse(status=204)
+        return HttpResponse(b'{"seq": %d, "data": %s}' % (seq, data), content_type='application/json')
+
+    response = StreamingHttpResponse(event_stream(client, after), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx가 모아서 보내지 않도록
+    return response
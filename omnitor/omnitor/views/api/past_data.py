@@ -0,0 +1,229 @@
+import os
+import sys
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest
+from django.urls import path
+
+current_dir = os.path.dirname(os.path.abspath(__file__)) # api 폴더
+root_dir = os.path.dirname(os.path.dirname(current_dir)) # 'services' 가 보이는 폴더
+
+sys.path.append(root_dir)
+
+from omnitor.models import FinalData
+from services import archive, data_revision
+from services.calibration_cache import get_coefficients
+from services.columnar import CONTENT_TYPE as COLUMNS_CONTENT_TYPE, encode_table, to_ms, wants_columns
+from services.response_cache import REVALIDATE, cached_response
+from services.rollup import pick_source
+from services.downsample import MAX_POINTS, LTTB_OVERSAMPLE, bucket_seconds, bucket_times, lttb, query_buckets
+from services.save_finaldata import PASSTHROUGH_FIELDS, CALIBRATED_FIELDS
+
+# 그래프에 그릴 수 있는 FinalData 항목
+FIELDS = PASSTHROUGH_FIELDS + [final_field for _, final_field, _ in CALIBRATED_FIELDS]
+
+DEFAULT_POINTS = 500
+
+
+def api_setting(request):
+    handlers = {
+        "GET": get_handler,
+    }
+
+    handler = handlers.get(request.method)
+    if handler is None:
+        return HttpResponseBadRequest("Only GET requests are allowed.")
+
+    return handler(request)
+
+api_path = path('past_data/', api_setting, name='past_data')
+
+
+def parse_range(request):
+    """
+    start_date / end_date (YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS) -> [start, end)
+    날짜만 주면 end_date 당일까지 포함
+    """
+    start_str = request.GET.get('start_date')
+    end_str = request.GET.get('end_date')
+    if not start_str:
+        raise ValueError("start_date parameter is required.")
+    start = datetime.fromisoformat(start_str)
+    if end_str:
+        end = datetime.fromisoformat(end_str)
+        if len(end_str) == 10:
+            end += timedelta(days=1)
+    else:
+        end = datetime.now()
+    if end <= start:
+        raise ValueError("end_date must be after start_date.")
+    return start, end
+
+
+def parse_fields(request):
+    fields_str = request.GET.get('fields')
+    if not fields_str:
+        return list(FIELDS)
+    fields = [f.strip() for f in fields_str.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _to_list(array):
+    """ NaN -> None (JSON null) """
+    return [None if v != v else round(v, 4) for v in array.tolist()]
+
+
+def fetch_buckets(start, end, fields, size):
+    """
+    버킷 크기에 맞는 가장 거친 롤업 (분/시간/일) 에서, 맞는 것이 없으면 FinalData + 보관 파일에서 집계
+    """
+    model, rollup = pick_source(start, end, size)
+    if rollup:
+        buckets, columns = query_buckets(model.objects.all(), fields, start, end, size, rollup=True)
+    else:
+        buckets, columns = archive.query_buckets(model.objects.all(), fields, start, end, size)
+    return model._meta.model_name, buckets, columns
+
+
+def bucket_series(start, end, fields, points):
+    """ 버킷별 min / mean / max (모든 채널이 같은 시각 축을 공유) -> (출처, 버킷 크기, 버킷 번호, {채널: (min, mean, max)}) """
+    size = bucket_seconds(start, end, points)
+    source, buckets, columns = fetch_buckets(start, end, fields, size)
+
+    series = {}
+    for field in fields:
+        c = columns[field]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(c['count'] > 0, c['sum'] / c['count'], np.nan)
+        series[field] = (c['min'], mean, c['max'])
+    return source, size, buckets, series
+
+
+def lttb_series(start, end, fields, points):
+    """
+    채널마다 LTTB로 고른 점 (채널마다 시각 축이 다름) -> (출처, 버킷 크기, {채널: (버킷 번호, 값)})
+    원본 전체를 읽지 않도록 DB에서 points * LTTB_OVERSAMPLE 개 버킷 평균을 먼저 뽑고 그 위에서 고름
+    """
+    size = bucket_seconds(start, end, points * LTTB_OVERSAMPLE)
+    source, buckets, columns = fetch_buckets(start, end, fields, size)
+    x = buckets.astype(np.float64)
+
+    series = {}
+    for field in fields:
+        c = columns[field]
+        valid = c['count'] > 0
+        xs, ys = x[valid], c['sum'][valid] / c['count'][valid]
+        keep = lttb(xs, ys, points)
+        series[field] = (buckets[valid][keep], ys[keep])
+    return source, size, series
+
+
+def bucket_response(start, end, fields, points):
+    source, size, buckets, series = bucket_series(start, end, fields, points)
+    return {
+        'mode': 'bucket',
+        'source': source,
+        'bucket_seconds': size,
+        'timestamps': [t.isoformat() for t in bucket_times(start, size, buckets)],
+        'fields': {
+            field: {'min': _to_list(low), 'mean': _to_list(mean), 'max': _to_list(high)}
+            for field, (low, mean, high) in series.items()
+        },
+    }
+
+
+def lttb_response(start, end, fields, points):
+    source, size, series = lttb_series(start, end, fields, points)
+    return {
+        'mode': 'lttb',
+        'source': source,
+        'bucket_seconds': size,
+        'fields': {
+            field: {'timestamps': [t.isoformat() for t in bucket_times(start, size, picked)], 'values': _to_list(values)}
+            for field, (picked, values) in series.items()
+        },
+    }
+
+
+def bucket_columns(start, end, fields, points):
+    """ bucket_response 와 같은 내용의 바이너리 표 하나 (채널 이름: '<채널>.min' / '.mean' / '.max') """
+    source, size, buckets, series = bucket_series(start, end, fields, points)
+    columns = {}
+    for field, (low, mean, high) in series.items():
+        columns.update({f"{field}.min": low, f"{field}.mean": mean, f"{field}.max": high})
+    ms = to_ms([start])[0] + buckets * size * 1000
+    return encode_table(ms, columns, {'mode': 'bucket', 'source': source, 'bucket_seconds': size}, unit=size * 1000)
+
+
+def lttb_columns(start, end, fields, points):
+    """ lttb_response 와 같은 내용의 바이너리 (채널마다 시각 축이 다르므로 채널마다 표 하나) """
+    source, size, series = lttb_series(start, end, fields, points)
+    origin = to_ms([start])[0]
+    meta = {'mode': 'lttb', 'source': source, 'bucket_seconds': size}
+    return b"".join(
+        encode_table(origin + picked * size * 1000, {field: values}, meta, unit=size * 1000)
+        for field, (picked, values) in series.items()
+    )
+
+
+def get_handler(request):
+    """
+    GET /past_data/?start_date=2025-01-01&end_date=2025-03-31&points=500&mode=bucket&fields=ph_final,ec_final
+    기간과 상관없이 최대 points개 (<= MAX_POINTS) 점만 돌려줌
+    - mode=bucket (기본): 버킷별 min / mean / max
+    - mode=lttb: 모양을 살린 대표 점
+    Accept: application/vnd.omnitor.columns (또는 format=columns) 이면 JSON 대신 바이너리 컬럼 (services/columnar.py)
+    """
+    try:
+        start, end = parse_range(request)
+        fields = parse_fields(request)
+        points = min(int(request.GET.get('points', DEFAULT_POINTS)), MAX_POINTS)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    if points < 1:
+        return HttpResponseBadRequest("points must be positive.")
+
+    mode = request.GET.get('mode', 'bucket')
+    builders = {
+        'bucket': (bucket_response, bucket_columns),
+        'lttb': (lttb_response, lttb_columns),
+    }
+    if mode not in builders:
+        return HttpResponseBadRequest("mode must be 'bucket' or 'lttb'.")
+    binary = wants_columns(request)
+    builder = builders[mode][binary]
+
+    def build():
+        try:
+            body = builder(start, end, fields, points)
+        except Exception as e:
+            print(f"Error fetching past data {start} ~ {end}: {e}")
+            return JsonResponse({'status': 'error', 'message': 'Failed to retrieve past data.'}, status=500)
+        if binary:
+            return HttpResponse(body, content_type=COLUMNS_CONTENT_TYPE)
+        body.update({'status': 'success', 'start': start.isoformat(), 'end': end.isoformat()})
+        return JsonResponse(body)
+
+    key = ('past_data', binary, tuple(sorted(request.GET.items())))
+    validator, last_modified, cache_control = data_version(start, end)
+    return cached_response(request, key, validator, build, last_modified, cache_control, vary=('Accept',))
+
+
+def data_version(start, end):
+    """
+    기간의 응답이 바뀌었는지 판단하는 값 -> (validator, Last-Modified, Cache-Control)
+    - 보정 버전 + 데이터 revision (재계산 / 스풀 복구로 저장된 행을 다시 쓸 때마다 바뀜, 파일 하나 읽음)
+    - 오늘 0시 이전에 끝난 기간: 새 행이 들어오지 않으므로 위 두 값만 (쿼리 없음)
+    - 진행 중인 기간: + 마지막 FinalData 행 (id 역순 한 행, 인덱스만 읽음)
+    끝난 기간도 나중에 다시 쓸 수 있으므로 브라우저는 매번 ETag로 확인 (바뀌지 않았으면 304)
+    """
+    version = get_coefficients().version
+    revision = data_revision.current()
+    if end <= datetime.combine(datetime.now().date(), time.min):
+        return (version, revision), None, REVALIDATE
+    latest = FinalData.objects.order_by('-id').values_list('id', 'timestamp').first()
+    return (version, revision, latest), (latest[1] if latest else None), REVALIDATE